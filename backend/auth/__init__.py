@@ -8,8 +8,12 @@ from .utils import (
     create_tokens,
     verify_refresh_token,
     revoke_refresh_token,
-    get_current_user
+    get_current_user,
+    get_current_principal,
+    require_scope,
+    Principal
 )
+from .revocation import revocation_cache, revoke_user_tokens
 
 __all__ = [
     'get_password_hash',
@@ -21,5 +25,10 @@ __all__ = [
     'create_tokens',
     'verify_refresh_token',
     'revoke_refresh_token',
-    'get_current_user'
+    'get_current_user',
+    'get_current_principal',
+    'require_scope',
+    'Principal',
+    'revocation_cache',
+    'revoke_user_tokens'
 ]
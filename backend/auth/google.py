@@ -1,131 +1,201 @@
-from typing import Optional
+import asyncio
+import re
+import time
+from typing import Dict, Optional
+
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 import httpx
 from datetime import datetime
+from jose import JWTError, jwt
+import logging
 
 from models.user import User
 from config import get_settings
 from .utils import create_tokens
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+def _oauth_error(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+def cache_lifetime(cache_control: Optional[str], default: int) -> int:
+    """Seconds a response may be reused according to its ``Cache-Control`` header."""
+    if not cache_control:
+        return default
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE.search(cache_control)
+    return int(match.group(1)) if match else default
+
+class GoogleOAuthClient:
+    """Google OAuth client sharing one pooled HTTP connection and a JWKS cache.
+
+    The ``id_token`` returned by the code exchange is verified locally against
+    the provider's signing keys, so a login costs a single round trip to the
+    token endpoint. The keys are refetched when their ``Cache-Control``
+    lifetime runs out, or once early when a token names an unknown key id
+    (key rotation).
+    """
+
+    def __init__(
+        self,
+        client_id: str = settings.GOOGLE_CLIENT_ID,
+        client_secret: str = settings.GOOGLE_CLIENT_SECRET,
+        token_url: str = settings.GOOGLE_TOKEN_URL,
+        jwks_url: str = settings.GOOGLE_JWKS_URL,
+        userinfo_url: str = settings.GOOGLE_USERINFO_URL,
+        issuers: tuple = tuple(settings.GOOGLE_ISSUERS),
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.jwks_url = jwks_url
+        self.userinfo_url = userinfo_url
+        self.issuers = issuers
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._keys: Dict[str, dict] = {}
+        self._keys_expire_at = 0.0
+        self._keys_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-async def exchange_code_for_token(code: str, redirect_uri: str) -> dict:
-    """Exchange authorization code for access token."""
-    async with httpx.AsyncClient() as client:
+    async def exchange_code(self, code: str, redirect_uri: str) -> dict:
+        """Exchange an authorization code for the token response."""
+        data = {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "code": code,
+            "redirect_uri": redirect_uri,
+            "grant_type": "authorization_code",
+        }
         try:
-            # Log request details for debugging
-            print(f"Exchanging code for token with redirect_uri: {redirect_uri}")
-            print(f"Using client_id: {settings.GOOGLE_CLIENT_ID}")
-            
-            token_url = "https://oauth2.googleapis.com/token"
-            data = {
-                "client_id": settings.GOOGLE_CLIENT_ID,
-                "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                "code": code,
-                "redirect_uri": redirect_uri,
-                "grant_type": "authorization_code"
-            }
-            
-            # Log full request data (except client secret)
-            debug_data = data.copy()
-            debug_data["client_secret"] = "REDACTED"
-            print(f"Token request data: {debug_data}")
-            
-            response = await client.post(token_url, data=data)
-            
-            # Log response for debugging
-            print(f"Token exchange response status: {response.status_code}")
-            if response.status_code != 200:
-                print(f"Token exchange error response: {response.text}")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail=f"Failed to exchange code for token. Status: {response.status_code}, Response: {response.text}"
-                )
-            
-            token_data = response.json()
-            print("Successfully exchanged code for token")
-            return token_data
-            
-        except Exception as e:
-            print(f"Token exchange error: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Failed to exchange code for token: {str(e)}"
+            response = await self.client.post(self.token_url, data=data)
+        except httpx.HTTPError as e:
+            logger.error(f"Token exchange error: {e}")
+            raise _oauth_error("Failed to exchange code for token")
+        if response.status_code != 200:
+            logger.warning(f"Token exchange failed with status {response.status_code}: {response.text}")
+            raise _oauth_error(f"Failed to exchange code for token. Status: {response.status_code}")
+        return response.json()
+
+    async def _signing_keys(self, refresh: bool = False) -> Dict[str, dict]:
+        if not refresh and self._keys and time.monotonic() < self._keys_expire_at:
+            return self._keys
+        async with self._keys_lock:
+            # Another request may have refreshed the keys while we waited
+            if not refresh and self._keys and time.monotonic() < self._keys_expire_at:
+                return self._keys
+            try:
+                response = await self.client.get(self.jwks_url)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                logger.error(f"Failed to fetch Google signing keys: {e}")
+                if self._keys:
+                    return self._keys
+                raise _oauth_error("Failed to fetch signing keys")
+            self._keys = {key["kid"]: key for key in response.json().get("keys", [])}
+            lifetime = cache_lifetime(response.headers.get("cache-control"), settings.GOOGLE_JWKS_DEFAULT_TTL)
+            self._keys_expire_at = time.monotonic() + lifetime
+            return self._keys
+
+    async def verify_id_token(self, token: str, access_token: Optional[str] = None) -> dict:
+        """Verify signature, audience, issuer and expiry of an ``id_token`` and return its claims."""
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except JWTError:
+            raise _oauth_error("Malformed id_token")
+        keys = await self._signing_keys()
+        if kid not in keys:
+            keys = await self._signing_keys(refresh=True)
+        key = keys.get(kid)
+        if key is None:
+            raise _oauth_error("Unknown id_token signing key")
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[key.get("alg", "RS256")],
+                audience=self.client_id,
+                access_token=access_token,
             )
+        except JWTError as e:
+            raise _oauth_error(f"Invalid id_token: {e}")
+        if claims.get("iss") not in self.issuers:
+            raise _oauth_error("Invalid id_token issuer")
+        return claims
 
-async def get_google_user_info(access_token: str) -> dict:
-    """Get user info from Google using access token."""
-    async with httpx.AsyncClient() as client:
+    async def get_user_info(self, access_token: str) -> dict:
+        """Fetch the profile from the userinfo endpoint; only needed without an ``id_token``."""
         try:
-            print(f"Fetching user info with access token")
-            response = await client.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
+            response = await self.client.get(
+                self.userinfo_url,
                 headers={"Authorization": f"Bearer {access_token}"}
             )
-            
-            print(f"User info response status: {response.status_code}")
-            if response.status_code != 200:
-                print(f"User info error response: {response.text}")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail=f"Failed to get user info. Status: {response.status_code}, Response: {response.text}"
-                )
-            
-            user_info = response.json()
-            print(f"Successfully retrieved user info for email: {user_info.get('email')}")
-            return user_info
-            
-        except Exception as e:
-            print(f"User info error: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Failed to get user info: {str(e)}"
-            )
+        except httpx.HTTPError as e:
+            logger.error(f"User info error: {e}")
+            raise _oauth_error("Failed to get user info")
+        if response.status_code != 200:
+            logger.warning(f"User info request failed with status {response.status_code}: {response.text}")
+            raise _oauth_error(f"Failed to get user info. Status: {response.status_code}")
+        return response.json()
+
+    async def fetch_identity(self, code: str, redirect_uri: str) -> dict:
+        """Exchange ``code`` and return the user's ``sub``, ``email`` and ``name``."""
+        token_data = await self.exchange_code(code, redirect_uri)
+        if token_data.get("id_token"):
+            claims = await self.verify_id_token(token_data["id_token"], token_data.get("access_token"))
+        else:
+            claims = await self.get_user_info(token_data["access_token"])
+            claims.setdefault("sub", claims.get("id"))
+        if not claims.get("email"):
+            raise _oauth_error("Google account has no email address")
+        if claims.get("email_verified") is False:
+            raise _oauth_error("Google email address is not verified")
+        return claims
+
+google_client = GoogleOAuthClient()
 
 async def authenticate_google_user(db: Session, code: str, redirect_uri: Optional[str] = None) -> tuple[User, str, str]:
     """Authenticate user with Google OAuth code."""
     # Use the default redirect URI if none provided
     redirect_uri = redirect_uri or settings.GOOGLE_REDIRECT_URI
-    
-    # Exchange code for token
-    token_data = await exchange_code_for_token(code, redirect_uri)
-    
-    # Get user info using access token
-    google_user = await get_google_user_info(token_data["access_token"])
-    
-    # Check if user exists
+    google_user = await google_client.fetch_identity(code, redirect_uri)
+
+    # Users are matched by email; the google_id column was dropped
     user = db.query(User).filter(User.email == google_user["email"]).first()
-    
     if not user:
-        # Create new user if they don't exist
         user = User(
             username=google_user["email"].split("@")[0],  # Use email prefix as username
             email=google_user["email"],
             full_name=google_user.get("name"),
-            google_id=google_user["id"],
-            last_login=datetime.utcnow()
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
-    else:
-        # Update existing user's information
-        update_needed = False
-        if not user.google_id:
-            user.google_id = google_user["id"]
-            update_needed = True
-        if not user.full_name and google_user.get("name"):
-            user.full_name = google_user["name"]
-            update_needed = True
-        user.last_login = datetime.utcnow()
-        update_needed = True
-        
-        if update_needed:
-            db.commit()
-            db.refresh(user)
-    
+    elif not user.full_name and google_user.get("name"):
+        user.full_name = google_user["name"]
+    user.last_login = datetime.utcnow()
+    db.commit()
+    db.refresh(user)
+
     # Create tokens
     access_token, refresh_token, _ = create_tokens(user, db)
-    
+
     return user, access_token, refresh_token
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models.user import User
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationCache:
+    """In-memory view of ``users.token_version`` for every existing user.
+
+    Access tokens carry the user id and the token version they were issued
+    with; a token is revoked once the user's current version is higher, or
+    once the user no longer exists. The map is reloaded from the database at
+    most every ``refresh_interval`` seconds, which bounds how long another
+    worker can keep accepting a revoked token. Users registered since the
+    last reload are looked up one at a time with ``lookup``.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._versions: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_known(self, user_id: int) -> bool:
+        return user_id in self._versions
+
+    def is_revoked(self, user_id: int, token_version: int) -> bool:
+        """Whether the token is revoked; users missing from the map count as deleted."""
+        version = self._versions.get(user_id)
+        return version is None or token_version < version
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_interval
+
+    def load(self, db: Session) -> None:
+        rows = db.query(User.id, User.token_version).all()
+        with self._lock:
+            self._versions = {user_id: version or 0 for user_id, version in rows}
+            self._loaded_at = time.monotonic()
+
+    def lookup(self, db: Session, user_id: int) -> bool:
+        """Add one user missing from the map; returns whether the user exists."""
+        row = db.query(User.token_version).filter(User.id == user_id).first()
+        if row is None:
+            return False
+        self.record(user_id, row.token_version or 0)
+        return True
+
+    def refresh_if_stale(self, db: Session) -> None:
+        if not self.is_stale():
+            return
+        try:
+            self.load(db)
+        except Exception as e:
+            # Keep serving from the previous snapshot rather than failing requests
+            logger.error(f"Failed to refresh token revocation cache: {e}")
+            db.rollback()
+
+    def record(self, user_id: int, token_version: int) -> None:
+        """Apply a version bump made by this process without waiting for a reload."""
+        with self._lock:
+            if token_version >= self._versions.get(user_id, 0):
+                self._versions[user_id] = token_version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versions = {}
+            self._loaded_at = None
+
+
+revocation_cache = TokenRevocationCache(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+
+
+def revoke_user_tokens(db: Session, user: User) -> int:
+    """Invalidate every access token issued to ``user`` so far."""
+    db.query(User).filter(User.id == user.id).update(
+        {User.token_version: User.token_version + 1}, synchronize_session=False
+    )
+    db.commit()
+    db.refresh(user)
+    revocation_cache.record(user.id, user.token_version)
+    return user.token_version
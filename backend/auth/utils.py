@@ -1,5 +1,6 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -11,11 +12,23 @@ from config import get_settings
 from database import get_db
 from models.user import User
 from models.refresh_token import RefreshToken
+from .revocation import revocation_cache
 
 settings = get_settings()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
 
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated caller as described by the access token claims."""
+    id: int
+    username: str
+    token_version: int = 0
+    scopes: Tuple[str, ...] = ()
+
+    def has_scope(self, scope: str) -> bool:
+        return scope in self.scopes
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -57,6 +70,9 @@ def create_tokens(user: User, db: Session) -> Tuple[str, str, datetime]:
     # Create access token
     access_token_data = {
         "sub": user.username,
+        "uid": user.id,
+        "ver": user.token_version or 0,
+        "scopes": list(settings.ACCESS_TOKEN_SCOPES),
     }
     access_token = create_access_token(access_token_data)
     access_token_expires = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -92,24 +108,79 @@ def revoke_refresh_token(refresh_token: str, db: Session) -> bool:
         return True
     return False
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.username == username).first()
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+def _user_from_payload(db: Session, payload: dict) -> User:
+    user = db.query(User).filter(User.username == payload["sub"]).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    if "ver" in payload and payload["ver"] < (user.token_version or 0):
+        raise _credentials_exception()
     return user
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    return _user_from_payload(db, decode_access_token(token))
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Resolve the caller from the token claims without loading the user row.
+
+    Revocation and deleted users are checked against the in-memory token
+    version cache. Tokens issued before the claims were added carry only
+    ``sub``, fall back to a database lookup and keep the default scopes.
+    A plain function, so FastAPI runs it in the threadpool when the cache has
+    to be reloaded.
+    """
+    payload = decode_access_token(token)
+    user_id, version = payload.get("uid"), payload.get("ver")
+    if user_id is None or version is None:
+        user = _user_from_payload(db, payload)
+        return Principal(
+            id=user.id,
+            username=user.username,
+            token_version=user.token_version or 0,
+            scopes=tuple(settings.ACCESS_TOKEN_SCOPES),
+        )
+
+    revocation_cache.refresh_if_stale(db)
+    if not revocation_cache.is_known(user_id):
+        # Registered since the last reload, or deleted
+        revocation_cache.lookup(db, user_id)
+    if revocation_cache.is_revoked(user_id, version):
+        raise _credentials_exception()
+    return Principal(
+        id=user_id,
+        username=payload["sub"],
+        token_version=version,
+        scopes=tuple(payload.get("scopes", ())),
+    )
+
+def require_scope(scope: str) -> Callable[..., Principal]:
+    """Dependency returning the principal if its token grants ``scope`` (403 otherwise)."""
+    def dependency(principal: Principal = Depends(get_current_principal)) -> Principal:
+        if not principal.has_scope(scope):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Token lacks the '{scope}' scope",
+            )
+        return principal
+    return dependency
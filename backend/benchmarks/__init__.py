@@ -0,0 +1,15 @@
+"""HTTP load-testing and micro benchmarks.
+
+Usage (from the ``backend`` directory)::
+
+    python -m benchmarks run --duration 10 --concurrency 8
+    python -m benchmarks compare results/<old>.json results/<new>.json --threshold 10
+
+Micro benchmarks for per-request hot paths use pytest-benchmark; each run is
+saved to ``benchmarks/micro/.history`` and compared with the previous one::
+
+    python -m pytest benchmarks/micro --benchmark-storage=benchmarks/micro/.history \\
+        --benchmark-autosave --benchmark-compare --benchmark-compare-fail=mean:10%
+
+``python -m benchmarks compare`` also accepts two of those saved JSON files.
+"""
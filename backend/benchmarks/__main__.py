@@ -0,0 +1,82 @@
+"""Command line entry point: ``python -m benchmarks {run,compare}``."""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+from .report import compare_micro_results, compare_results, format_comparison, format_micro_comparison, save_results
+from .runner import BACKEND_DIR, RunConfig, run
+from .scenarios import SCENARIOS
+from .seed import SeedConfig
+
+DEFAULT_OUTPUT = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="IPMS HTTP benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Seed a database and run scenarios")
+    run_parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                            help="Scenario to run (repeatable, default: all)")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    run_parser.add_argument("--requests", type=int, help="Fixed number of calls per scenario instead of --duration")
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--users", type=int, default=20)
+    run_parser.add_argument("--tasks-per-user", type=int, default=500)
+    run_parser.add_argument("--database", default=RunConfig.database, help="SQLite file to (re)create")
+    run_parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Directory for JSON results")
+
+    compare_parser = sub.add_parser("compare", help="Compare two result files (HTTP or micro benchmarks)")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="Regression threshold in percent (default: 10)")
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    args = build_parser().parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.candidate) as f:
+            candidate = json.load(f)
+        if "benchmarks" in candidate:
+            # pytest-benchmark output from benchmarks/micro
+            rows = compare_micro_results(baseline, candidate, args.threshold)
+            print(format_micro_comparison(rows))
+        else:
+            rows = compare_results(baseline, candidate, args.threshold)
+            print(format_comparison(rows))
+        return 1 if any(row["regression"] for row in rows) else 0
+
+    config = RunConfig(
+        scenarios=args.scenario or list(SCENARIOS),
+        concurrency=args.concurrency,
+        duration=args.duration,
+        requests=args.requests,
+        warmup=args.warmup,
+        database=args.database,
+        base_url=args.base_url,
+        seed=SeedConfig(seed=args.seed, users=args.users, tasks_per_user=args.tasks_per_user),
+    )
+    results = asyncio.run(run(config))
+    for name, stats in results["scenarios"].items():
+        latency = stats["latency_ms"]
+        print(f"{name:<18} {stats['throughput_rps']:>9.1f} req/s  "
+              f"p50 {latency['p50']:>8.2f}ms  p95 {latency['p95']:>8.2f}ms  "
+              f"p99 {latency['p99']:>8.2f}ms  errors {stats['errors']}")
+    print(f"Results written to {save_results(results, args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
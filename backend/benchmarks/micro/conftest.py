@@ -0,0 +1,87 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+pytest.importorskip("pytest_benchmark")
+
+import models  # noqa: E402,F401
+import models.development  # noqa: E402,F401
+import models.profile  # noqa: E402,F401
+from database import Base  # noqa: E402
+from models import Idea, Task, User  # noqa: E402
+from models.idea import Tag  # noqa: E402
+from models.task import TaskPriority, TaskStatus  # noqa: E402
+
+@pytest.fixture(scope="session")
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+@pytest.fixture
+def user(db):
+    user = db.query(User).filter(User.username == "bench").first()
+    if user is None:
+        user = User(username="bench", email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+    return user
+
+@pytest.fixture(scope="session")
+def tasks():
+    now = datetime(2024, 1, 1)
+    return [
+        Task(
+            id=i,
+            title=f"Task {i}",
+            description="Lorem ipsum dolor sit amet " * 4,
+            status=list(TaskStatus)[i % 3],
+            priority=list(TaskPriority)[i % 3],
+            due_date=now + timedelta(days=i % 30),
+            created_at=now,
+            updated_at=now,
+            user_id=1,
+            project_id=None,
+        )
+        for i in range(1, 501)
+    ]
+
+@pytest.fixture(scope="session")
+def ideas():
+    now = datetime(2024, 1, 1)
+    tags = [Tag(id=i, name=f"tag{i}") for i in range(1, 6)]
+    return [
+        Idea(
+            id=i,
+            title=f"Idea {i}",
+            description="An idea worth exploring " * 6,
+            status="draft",
+            created_at=now,
+            updated_at=now,
+            user_id=1,
+            tags=tags[: i % 5 + 1],
+        )
+        for i in range(1, 201)
+    ]
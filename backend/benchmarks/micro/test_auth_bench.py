@@ -0,0 +1,30 @@
+import asyncio
+
+from jose import jwt
+
+from auth.revocation import revocation_cache
+from auth.utils import create_access_token, create_tokens, get_current_principal, get_current_user, settings
+
+def test_jwt_decode(benchmark):
+    token = create_access_token({"sub": "bench"})
+    payload = benchmark(jwt.decode, token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert payload["sub"] == "bench"
+
+def test_get_current_user(benchmark, db, user):
+    token = create_access_token({"sub": user.username})
+    loop = asyncio.new_event_loop()
+    try:
+        result = benchmark(lambda: loop.run_until_complete(get_current_user(token=token, db=db)))
+    finally:
+        loop.close()
+    assert result.id == user.id
+
+def test_get_current_principal(benchmark, db, user):
+    token = create_access_token({"sub": user.username, "uid": user.id, "ver": 0})
+    revocation_cache.load(db)
+    result = benchmark(get_current_principal, token=token, db=db)
+    assert result.id == user.id
+
+def test_create_tokens(benchmark, db, user):
+    access_token, refresh_token, _ = benchmark(create_tokens, user, db)
+    assert access_token and refresh_token
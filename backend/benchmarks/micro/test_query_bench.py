@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from routers.tasks import build_task_query
+
+def test_build_task_query_all_filters(benchmark, db):
+    def build():
+        query = build_task_query(
+            db,
+            1,
+            status="todo",
+            priority="high",
+            due_date_from=datetime(2024, 1, 1),
+            due_date_to=datetime(2024, 12, 31),
+            search="report",
+            sort_by="due_date",
+            sort_order="desc"
+        )
+        return str(query.statement.compile(db.get_bind()))
+    assert "ORDER BY" in benchmark(build)
+
+def test_build_task_query_default(benchmark, db):
+    def build():
+        return str(build_task_query(db, 1).statement.compile(db.get_bind()))
+    assert "ORDER BY" in benchmark(build)
@@ -0,0 +1,26 @@
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from schemas.idea import IdeaResponse
+from schemas.task import TaskResponse
+
+task_list = TypeAdapter(List[TaskResponse])
+idea_list = TypeAdapter(List[IdeaResponse])
+
+def test_task_response_list_json(benchmark, tasks):
+    def serialize():
+        return task_list.dump_json(task_list.validate_python(tasks, from_attributes=True))
+    assert benchmark(serialize).startswith(b"[")
+
+def test_task_response_list_fastapi(benchmark, tasks):
+    # Mirrors FastAPI's response_model path: validate, then jsonable_encoder
+    def serialize():
+        return jsonable_encoder(task_list.validate_python(tasks, from_attributes=True))
+    assert len(benchmark(serialize)) == len(tasks)
+
+def test_idea_response_list_json(benchmark, ideas):
+    def serialize():
+        return idea_list.dump_json(idea_list.validate_python(ideas, from_attributes=True))
+    assert benchmark(serialize).startswith(b"[")
@@ -0,0 +1,137 @@
+"""Latency statistics, JSON result files and run-to-run comparison."""
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(latencies: List[float], errors: int, duration: float) -> Dict:
+    """Summarize per-call latencies (seconds) into a JSON-friendly dict in milliseconds."""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(count / duration, 2) if duration > 0 else 0.0,
+        "latency_ms": {
+            "min": round(values[0] * 1000, 3) if values else 0.0,
+            "mean": round(sum(values) / count * 1000, 3) if values else 0.0,
+            "p50": round(percentile(values, 50) * 1000, 3),
+            "p95": round(percentile(values, 95) * 1000, 3),
+            "p99": round(percentile(values, 99) * 1000, 3),
+            "max": round(values[-1] * 1000, 3) if values else 0.0,
+        },
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(config: Dict) -> Dict:
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+    }
+
+
+def save_results(results: Dict, output_dir: str) -> str:
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    revision = results.get("meta", {}).get("git_revision") or "unknown"
+    path = os.path.join(output_dir, f"{stamp}-{revision}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def compare_results(baseline: Dict, candidate: Dict, threshold_pct: float = 10.0) -> List[Dict]:
+    """Compare two result files scenario by scenario.
+
+    A scenario regresses when its p95 latency grows, or its throughput drops,
+    by more than ``threshold_pct`` percent.
+    """
+    rows = []
+    for name, new in candidate.get("scenarios", {}).items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        old_p95, new_p95 = old["latency_ms"]["p95"], new["latency_ms"]["p95"]
+        old_rps, new_rps = old["throughput_rps"], new["throughput_rps"]
+        p95_change = (new_p95 - old_p95) / old_p95 * 100 if old_p95 else 0.0
+        rps_change = (new_rps - old_rps) / old_rps * 100 if old_rps else 0.0
+        rows.append({
+            "scenario": name,
+            "p95_ms": (old_p95, new_p95),
+            "p95_change_pct": round(p95_change, 1),
+            "throughput_rps": (old_rps, new_rps),
+            "throughput_change_pct": round(rps_change, 1),
+            "regression": p95_change > threshold_pct or rps_change < -threshold_pct,
+        })
+    return rows
+
+
+def compare_micro_results(baseline: Dict, candidate: Dict, threshold_pct: float = 10.0) -> List[Dict]:
+    """Compare two pytest-benchmark JSON files; a benchmark regresses when its mean grows past the threshold."""
+    old_stats = {bench["fullname"]: bench["stats"] for bench in baseline.get("benchmarks", [])}
+    rows = []
+    for bench in candidate.get("benchmarks", []):
+        old = old_stats.get(bench["fullname"])
+        if old is None:
+            continue
+        old_mean, new_mean = old["mean"] * 1e6, bench["stats"]["mean"] * 1e6
+        change = (new_mean - old_mean) / old_mean * 100 if old_mean else 0.0
+        rows.append({
+            "benchmark": bench["name"],
+            "mean_us": (old_mean, new_mean),
+            "mean_change_pct": round(change, 1),
+            "regression": change > threshold_pct,
+        })
+    return rows
+
+
+def format_micro_comparison(rows: List[Dict]) -> str:
+    lines = [f"{'benchmark':<40} {'mean us (old -> new)':>28} {'Δ%':>7}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['benchmark']:<40} {row['mean_us'][0]:>12.2f} -> {row['mean_us'][1]:<12.2f} "
+            f"{row['mean_change_pct']:>+7.1f}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    lines = [f"{'scenario':<18} {'p95 ms (old -> new)':>26} {'Δ%':>7} {'rps (old -> new)':>24} {'Δ%':>7}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['scenario']:<18} "
+            f"{row['p95_ms'][0]:>11.2f} -> {row['p95_ms'][1]:<11.2f} {row['p95_change_pct']:>+7.1f} "
+            f"{row['throughput_rps'][0]:>10.1f} -> {row['throughput_rps'][1]:<10.1f} "
+            f"{row['throughput_change_pct']:>+7.1f}{flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,112 @@
+"""Drive the API with the benchmark scenarios and collect latency samples."""
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+from .report import run_metadata, summarize
+from .scenarios import SCENARIOS, ScenarioContext, authenticate
+from .seed import SeedConfig, seed_database
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RunConfig:
+    scenarios: List[str] = field(default_factory=lambda: list(SCENARIOS))
+    concurrency: int = 8
+    duration: float = 10.0
+    requests: Optional[int] = None
+    warmup: int = 20
+    database: str = os.path.join(BACKEND_DIR, "benchmarks", "bench.db")
+    base_url: Optional[str] = None
+    seed: SeedConfig = field(default_factory=SeedConfig)
+
+
+def prepare_database(config: RunConfig):
+    """Create a fresh SQLite database, seed it and return ``(app, seed_result)``.
+
+    ``DATABASE_URL`` has to be set before the application modules are imported
+    because the engine is created at import time.
+    """
+    if os.path.exists(config.database):
+        os.remove(config.database)
+    database_url = f"sqlite:///{os.path.abspath(config.database)}"
+    os.environ["DATABASE_URL"] = database_url
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+    started = time.perf_counter()
+    result = seed_database(database_url, config.seed)
+    logger.warning("Seeded %d users in %.1fs", len(result.usernames), time.perf_counter() - started)
+
+    import main
+
+    # The app logs every request at DEBUG; keep that out of the measurements
+    logging.getLogger().setLevel(logging.WARNING)
+    return main.app, result
+
+
+async def run_scenario(client: httpx.AsyncClient, ctx: ScenarioContext, name: str, config: RunConfig) -> Dict:
+    scenario = SCENARIOS[name]
+
+    warmup_rng = random.Random(f"{config.seed.seed}-{name}-warmup")
+    for _ in range(config.warmup):
+        try:
+            await scenario(client, ctx, warmup_rng)
+        except Exception:
+            pass
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = config.requests
+    deadline = time.perf_counter() + config.duration
+
+    async def worker(index: int) -> None:
+        nonlocal errors, remaining
+        rng = random.Random(f"{config.seed.seed}-{name}-{index}")
+        while True:
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+            elif time.perf_counter() >= deadline:
+                return
+            started = time.perf_counter()
+            try:
+                await scenario(client, ctx, rng)
+            except Exception as e:
+                errors += 1
+                logger.debug("%s failed: %s", name, e)
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(config.concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(config: RunConfig) -> Dict:
+    app, seed_result = prepare_database(config)
+    if config.base_url:
+        # The external server must have been started against config.database
+        client = httpx.AsyncClient(base_url=config.base_url, timeout=60)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    results = {"meta": run_metadata({**asdict(config), "database": os.path.basename(config.database)}), "scenarios": {}}
+    async with client:
+        ctx = ScenarioContext(seed=seed_result)
+        await authenticate(client, ctx, seed_result.usernames)
+        for name in config.scenarios:
+            logger.warning("Running %s ...", name)
+            results["scenarios"][name] = await run_scenario(client, ctx, name, config)
+    return results
@@ -0,0 +1,92 @@
+"""Benchmark scenarios.
+
+Each scenario is an async callable ``(client, context, rng)`` performing one
+logical operation; the runner times each call as a single sample.
+"""
+import asyncio
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from .seed import ACTIVITY_TYPES, BENCH_PASSWORD, SeedResult
+
+
+@dataclass
+class ScenarioContext:
+    seed: SeedResult
+    tokens: Dict[str, str] = field(default_factory=dict)
+
+    def headers(self, username: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.tokens[username]}"}
+
+
+def _check(response: httpx.Response) -> None:
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.method} {response.request.url.path} -> {response.status_code}")
+
+
+async def login_burst(client: httpx.AsyncClient, ctx: ScenarioContext, rng: random.Random) -> None:
+    username = rng.choice(ctx.seed.usernames)
+    response = await client.post("/api/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+    _check(response)
+
+
+async def task_search(client: httpx.AsyncClient, ctx: ScenarioContext, rng: random.Random) -> None:
+    username = rng.choice(ctx.seed.usernames)
+    params = {"search": rng.choice(ctx.seed.search_terms), "sort_by": rng.choice(["due_date", "created_at"])}
+    if rng.random() < 0.5:
+        params["status"] = rng.choice(["todo", "in_progress", "done"])
+    response = await client.get("/api/tasks/", params=params, headers=ctx.headers(username))
+    _check(response)
+
+
+async def activity_ingest(client: httpx.AsyncClient, ctx: ScenarioContext, rng: random.Random) -> None:
+    username = rng.choice(ctx.seed.usernames)
+    payload = {
+        "type": rng.choice(ACTIVITY_TYPES),
+        "data": {"value": rng.choice(ctx.seed.search_terms), "duration": rng.randrange(3600)},
+    }
+    response = await client.post("/api/activities/activities", json=payload, headers=ctx.headers(username))
+    _check(response)
+
+
+async def journal_browse(client: httpx.AsyncClient, ctx: ScenarioContext, rng: random.Random) -> None:
+    username = rng.choice(ctx.seed.usernames)
+    params = {"limit": 50}
+    if rng.random() < 0.5:
+        params["from_date"] = datetime(2024, rng.randrange(1, 13), 1).isoformat()
+    response = await client.get("/api/activities/journal", params=params, headers=ctx.headers(username))
+    _check(response)
+
+
+async def project_fanout(client: httpx.AsyncClient, ctx: ScenarioContext, rng: random.Random) -> None:
+    """Opening a project page: the detail view plus its three sub-resources in parallel."""
+    username = rng.choice(ctx.seed.usernames)
+    project_id = rng.choice(ctx.seed.project_ids[ctx.seed.user_ids[username]])
+    headers = ctx.headers(username)
+    responses = await asyncio.gather(*(
+        client.get(f"/api/projects/{project_id}{suffix}", headers=headers)
+        for suffix in ("", "/tasks", "/ideas", "/concepts")
+    ))
+    for response in responses:
+        _check(response)
+
+
+SCENARIOS: Dict[str, Callable[[httpx.AsyncClient, ScenarioContext, random.Random], Awaitable[None]]] = {
+    "login_burst": login_burst,
+    "task_search": task_search,
+    "activity_ingest": activity_ingest,
+    "journal_browse": journal_browse,
+    "project_fanout": project_fanout,
+}
+
+
+async def authenticate(client: httpx.AsyncClient, ctx: ScenarioContext, usernames: List[str]) -> None:
+    """Log every benchmark user in once so authenticated scenarios don't pay for bcrypt."""
+    for username in usernames:
+        response = await client.post("/api/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+        _check(response)
+        ctx.tokens[username] = response.json()["access_token"]
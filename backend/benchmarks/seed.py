@@ -0,0 +1,61 @@
+"""Benchmark fixtures on top of the synthetic data generator."""
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .synthetic import (
+    ACTIVITY_TYPES,
+    SYNTHETIC_PASSWORD,
+    WORDS,
+    SyntheticConfig,
+    first_id,
+    generate,
+)
+
+BENCH_PASSWORD = SYNTHETIC_PASSWORD
+
+
+@dataclass
+class SeedConfig:
+    seed: int = 42
+    users: int = 20
+    tasks_per_user: int = 500
+    jobs: int = 0
+
+    def synthetic(self) -> SyntheticConfig:
+        return SyntheticConfig(
+            seed=self.seed,
+            users=self.users,
+            tasks_per_user=self.tasks_per_user,
+            projects_per_user=5,
+            activities_per_user=500,
+            journal_days=200,
+            progress_per_goal=30,
+            tracking_days=90,
+            ideas_per_user=30,
+        )
+
+
+@dataclass
+class SeedResult:
+    usernames: List[str] = field(default_factory=list)
+    user_ids: Dict[str, int] = field(default_factory=dict)
+    project_ids: Dict[int, List[int]] = field(default_factory=dict)
+    search_terms: List[str] = field(default_factory=lambda: list(WORDS))
+
+
+def seed_database(database_url: str, config: SeedConfig) -> SeedResult:
+    """Populate an empty database. The same config always yields the same data."""
+    synthetic = config.synthetic()
+    generate(database_url, synthetic, jobs=config.jobs)
+
+    result = SeedResult()
+    for u in range(synthetic.users):
+        username, user_id = f"user{u}", u + 1
+        result.usernames.append(username)
+        result.user_ids[username] = user_id
+        project_base = first_id(u, synthetic.projects_per_user)
+        result.project_ids[user_id] = list(range(project_base, project_base + synthetic.projects_per_user))
+    return result
+
+
+__all__ = ["ACTIVITY_TYPES", "BENCH_PASSWORD", "SeedConfig", "SeedResult", "seed_database"]
@@ -0,0 +1,496 @@
+"""Deterministic synthetic data generator for scale testing.
+
+Usage (from the ``backend`` directory)::
+
+    python -m benchmarks.synthetic --database-url sqlite:///./scale.db --preset large --jobs 8
+
+Every row gets an explicit primary key derived from the owning user's index,
+so users can be generated independently (and in parallel) while foreign keys
+stay consistent, and the same seed always produces the same database. Rows are
+generated in worker processes and written with bulk Core ``INSERT``s in one
+transaction per batch of users; secondary indexes are dropped during the load
+and rebuilt at the end.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Sequence
+
+from sqlalchemy import create_engine, event
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+logger = logging.getLogger(__name__)
+
+WORDS = [
+    "report", "review", "plan", "design", "deploy", "refactor", "write", "call",
+    "budget", "meeting", "research", "draft", "fix", "test", "update", "prepare",
+    "garden", "invoice", "workout", "backup", "travel", "read", "email", "learn",
+    "kitchen", "taxes", "renew", "order", "clean", "sketch", "practice", "visit",
+]
+MOODS = ["happy", "calm", "tired", "anxious", "focused", "sad", None]
+ACTIVITY_TYPES = ["music", "web", "app", "location"]
+GOAL_CATEGORIES = ["health", "career", "learning", "finance", "social"]
+HABIT_FREQUENCIES = ["daily", "weekly", "monthly"]
+TAG_VOCABULARY = [f"{a}-{b}" for a in WORDS[:16] for b in WORDS[16:]]
+# Ideas draw tags from TAG_VOCABULARY, journal entries up to this many from WORDS
+JOURNAL_TAGS_MAX = 3
+
+SYNTHETIC_PASSWORD = "synthetic-password"
+EPOCH = datetime(2021, 1, 1)
+
+
+@dataclass
+class SyntheticConfig:
+    seed: int = 1
+    users: int = 10
+    tasks_per_user: int = 1000
+    projects_per_user: int = 10
+    mindmaps_per_project: int = 1
+    mindmap_nodes: int = 50
+    concepts_per_project: int = 5
+    revisions_per_concept: int = 4
+    activities_per_user: int = 1000
+    journal_days: int = 365
+    goals_per_user: int = 5
+    progress_per_goal: int = 100
+    habits_per_user: int = 5
+    tracking_days: int = 365
+    ideas_per_user: int = 50
+    tags_per_idea: int = 3
+
+
+PRESETS: Dict[str, SyntheticConfig] = {
+    "tiny": SyntheticConfig(users=5, tasks_per_user=200, activities_per_user=200, journal_days=60,
+                            progress_per_goal=20, tracking_days=60, ideas_per_user=20),
+    "small": SyntheticConfig(),
+    "medium": SyntheticConfig(users=200, tasks_per_user=5000, activities_per_user=5000, journal_days=730),
+    # Roughly 10 GB on SQLite: 20M tasks, 1M activities, ~2M journal entries
+    "large": SyntheticConfig(users=2000, tasks_per_user=10000, activities_per_user=500, journal_days=1095,
+                             goals_per_user=10, progress_per_goal=365, habits_per_user=5, tracking_days=1095,
+                             ideas_per_user=100, mindmap_nodes=200),
+}
+
+
+def _load_models():
+    """Import every model so ``Base.metadata`` knows all tables."""
+    import models  # noqa: F401
+    import models.development  # noqa: F401
+    import models.profile  # noqa: F401
+    from database import Base
+    return Base.metadata
+
+
+def first_id(user_index: int, per_user: int) -> int:
+    """Primary key of the first row of a per-user entity."""
+    return user_index * per_user + 1
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _mindmap_data(rng: random.Random, nodes: int) -> dict:
+    node_list = [
+        {
+            "id": f"n{i}",
+            "type": "default",
+            "position": {"x": rng.uniform(-2000, 2000), "y": rng.uniform(-2000, 2000)},
+            "data": {"label": _sentence(rng, 2)},
+        }
+        for i in range(nodes)
+    ]
+    edges = [
+        {"id": f"e{i}", "source": f"n{rng.randrange(i)}", "target": f"n{i}"}
+        for i in range(1, nodes)
+    ]
+    return {"nodes": node_list, "edges": edges}
+
+
+def generate_user(config: SyntheticConfig, u: int, hashed_password: str) -> Dict[str, List[dict]]:
+    """All rows owned by user ``u``. Depends only on ``(config, u)``."""
+    from models.idea import IdeaStatus
+    from models.project import ProjectStatus
+    from models.task import PRIORITY_RANKS, TaskPriority, TaskStatus
+    from services.concept_revisions import encode
+    from services.project_stats import STATUS_COLUMNS
+    from services.tagging import bitmap_from_ids, encode_bitmap
+    from utils.sentiment import analyze
+    from utils.summary import excerpt, json_size
+
+    rng = random.Random(f"{config.seed}:{u}")
+    user_id = u + 1
+    joined = EPOCH + timedelta(days=rng.randrange(365))
+    rows: Dict[str, List[dict]] = {}
+    # (tag id, entity type, entity id, tagged at)
+    tagged = []
+
+    rows["users"] = [{
+        "id": user_id,
+        "username": f"user{u}",
+        "email": f"user{u}@example.com",
+        "full_name": f"Synthetic User {u}",
+        "hashed_password": hashed_password,
+        "created_at": joined,
+    }]
+
+    project_base = first_id(u, config.projects_per_user)
+    project_ids = list(range(project_base, project_base + config.projects_per_user))
+    rows["projects"] = [{
+        "id": pid,
+        "title": f"Project {_sentence(rng, 2)}"[:100],
+        "description": _sentence(rng, 15),
+        "status": rng.choice(list(ProjectStatus)),
+        "start_date": joined,
+        "created_at": joined,
+        "updated_at": joined,
+        "owner_id": user_id,
+    } for pid in project_ids]
+
+    per_project = config.mindmaps_per_project
+    mindmap_base = first_id(u, config.projects_per_user * per_project)
+    rows["mindmaps"] = [{
+        "id": mindmap_base + i * per_project + j,
+        "title": f"Map {_sentence(rng, 2)}",
+        "data": _mindmap_data(rng, config.mindmap_nodes),
+        "project_id": pid,
+    } for i, pid in enumerate(project_ids) for j in range(per_project)]
+    # Core inserts skip the models' @validates hooks, so derived columns are set here
+    for mindmap in rows["mindmaps"]:
+        mindmap["size"] = json_size(mindmap["data"])
+        mindmap["node_count"] = len(mindmap["data"]["nodes"])
+
+    per_project = config.concepts_per_project
+    concept_base = first_id(u, config.projects_per_user * per_project)
+    revisions = config.revisions_per_concept
+    revision_base = first_id(u, config.projects_per_user * per_project * revisions)
+    rows["concept_notes"], rows["concept_note_revisions"] = [], []
+    for i, pid in enumerate(project_ids):
+        for j in range(per_project):
+            concept_id = concept_base + i * per_project + j
+            title = _sentence(rng, 3)[:100]
+            # Paragraphs, so later saves are small line deltas as in real use
+            paragraphs = [_sentence(rng, rng.randrange(20, 120)) for _ in range(rng.randrange(2, 12) + revisions)]
+            versions = ["\n".join(paragraphs[:len(paragraphs) - revisions + 1 + n]) for n in range(revisions)]
+            rows["concept_notes"].append({
+                "id": concept_id,
+                "title": title,
+                "content": versions[-1],
+                "excerpt": excerpt(versions[-1]),
+                "size": len(versions[-1]),
+                "created_at": joined,
+                "updated_at": joined,
+                "project_id": pid,
+                "user_id": user_id,
+            })
+            previous, chain_length = None, 0
+            for n, content in enumerate(versions):
+                kind, stored, chain_length = encode(previous, content, chain_length + 1 if n else 0)
+                rows["concept_note_revisions"].append({
+                    "id": revision_base + ((i * per_project + j) * revisions) + n,
+                    "concept_id": concept_id,
+                    "number": n + 1,
+                    "title": title,
+                    "kind": kind,
+                    "content": stored,
+                    "chain_length": chain_length,
+                    "size": len(content),
+                    "user_id": user_id,
+                    "created_at": joined,
+                })
+                previous = content
+
+    task_base = first_id(u, config.tasks_per_user)
+    tasks = []
+    for i in range(config.tasks_per_user):
+        created = joined + timedelta(minutes=rng.randrange(3 * 525600))
+        status = rng.choice(list(TaskStatus))
+        tasks.append({
+            "id": task_base + i,
+            "title": _sentence(rng, 3)[:100],
+            "description": _sentence(rng, rng.randrange(5, 60)),
+            "status": status,
+            "priority": rng.choice(list(TaskPriority)),
+            "due_date": created + timedelta(days=rng.randrange(90)) if rng.random() < 0.8 else None,
+            "created_at": created,
+            "updated_at": created,
+            "completed_at": created + timedelta(days=rng.randrange(30)) if status == TaskStatus.DONE else None,
+            "user_id": user_id,
+            "project_id": rng.choice(project_ids) if rng.random() < 0.6 else None,
+        })
+        tasks[-1]["priority_rank"] = PRIORITY_RANKS[tasks[-1]["priority"]]
+    rows["tasks"] = tasks
+
+    activity_base = first_id(u, config.activities_per_user)
+    rows["activities"] = [{
+        "id": activity_base + i,
+        "user_id": user_id,
+        "type": rng.choice(ACTIVITY_TYPES),
+        "data": {"value": _sentence(rng, 4), "duration": rng.randrange(3600)},
+        "timestamp": joined + timedelta(seconds=rng.randrange(3 * 31536000)),
+    } for i in range(config.activities_per_user)]
+    for activity in rows["activities"]:
+        activity["size"] = json_size(activity["data"])
+
+    journal_base = first_id(u, config.journal_days)
+    journal = []
+    for day in range(config.journal_days):
+        written = joined + timedelta(days=day, hours=rng.randrange(6, 23))
+        journal.append({
+            "id": journal_base + day,
+            "user_id": user_id,
+            "content": _sentence(rng, rng.randrange(30, 400)),
+            "mood": rng.choice(MOODS),
+            "created_at": written,
+            "updated_at": written,
+        })
+        journal[-1]["excerpt"], journal[-1]["size"] = excerpt(journal[-1]["content"]), len(journal[-1]["content"])
+        journal[-1]["word_count"], journal[-1]["sentiment"] = analyze(journal[-1]["content"])
+        for word in rng.sample(WORDS, rng.randrange(0, JOURNAL_TAGS_MAX + 1)):
+            tagged.append((len(TAG_VOCABULARY) + WORDS.index(word) + 1, "journal", journal_base + day, written))
+    rows["journal_entries"] = journal
+    # One entry a day, so one aggregate row each
+    rows["journal_daily_stats"] = [{
+        "user_id": user_id,
+        "day": entry["created_at"].date(),
+        "mood": entry["mood"] or "",
+        "entry_count": 1,
+        "scored_count": 1,
+        "word_count": entry["word_count"],
+        "sentiment_sum": entry["sentiment"],
+    } for entry in journal]
+
+    goal_base = first_id(u, config.goals_per_user)
+    progress_base = first_id(u, config.goals_per_user * config.progress_per_goal)
+    rows["goals"], rows["goal_progress"] = [], []
+    for g in range(config.goals_per_user):
+        goal_id = goal_base + g
+        rows["goals"].append({
+            "id": goal_id,
+            "user_id": user_id,
+            "title": f"Goal {_sentence(rng, 2)}",
+            "description": _sentence(rng, 10),
+            "category": rng.choice(GOAL_CATEGORIES),
+            "status": "active",
+            "target_date": joined + timedelta(days=rng.randrange(365, 1460)),
+            "progress": 0.0,
+            "metrics": {},
+            "created_at": joined,
+            "updated_at": joined,
+        })
+        value = 0.0
+        for p in range(config.progress_per_goal):
+            value = min(100.0, value + rng.random() * 2)
+            rows["goal_progress"].append({
+                "id": progress_base + g * config.progress_per_goal + p,
+                "goal_id": goal_id,
+                "value": round(value, 2),
+                "notes": _sentence(rng, 5) if rng.random() < 0.2 else None,
+                "data": {},
+                "timestamp": joined + timedelta(days=p),
+            })
+        rows["goals"][-1]["progress"] = round(value, 2)
+
+    habit_base = first_id(u, config.habits_per_user)
+    tracking_base = first_id(u, config.habits_per_user * config.tracking_days)
+    rows["habits"], rows["habit_tracking"] = [], []
+    for h in range(config.habits_per_user):
+        habit_id = habit_base + h
+        rows["habits"].append({
+            "id": habit_id,
+            "user_id": user_id,
+            "name": f"Habit {_sentence(rng, 2)}",
+            "frequency": rng.choice(HABIT_FREQUENCIES),
+            "target_days": [],
+            "streak": rng.randrange(30),
+            "created_at": joined,
+        })
+        for d in range(config.tracking_days):
+            rows["habit_tracking"].append({
+                "id": tracking_base + h * config.tracking_days + d,
+                "habit_id": habit_id,
+                "completed": joined + timedelta(days=d, hours=rng.randrange(24)),
+            })
+
+    idea_base = first_id(u, config.ideas_per_user)
+    rows["ideas"], rows["project_ideas"] = [], []
+    for i in range(config.ideas_per_user):
+        idea_id = idea_base + i
+        rows["ideas"].append({
+            "id": idea_id,
+            "title": _sentence(rng, 3)[:100],
+            "description": _sentence(rng, 30),
+            "status": rng.choice(list(IdeaStatus)),
+            "created_at": joined,
+            "updated_at": joined,
+            "user_id": user_id,
+        })
+        for tag_index in rng.sample(range(len(TAG_VOCABULARY)), config.tags_per_idea):
+            tagged.append((tag_index + 1, "idea", idea_id, joined))
+        if project_ids and rng.random() < 0.3:
+            rows["project_ideas"].append({
+                "project_id": rng.choice(project_ids), "idea_id": idea_id, "created_at": joined,
+            })
+
+    # Counters of services.project_stats as the write paths would have left them
+    stats = {pid: {
+        "project_id": pid, "tasks_todo": 0, "tasks_in_progress": 0, "tasks_done": 0,
+        "idea_count": 0, "concept_note_count": 0, "last_activity_at": joined,
+    } for pid in project_ids}
+    for task in rows["tasks"]:
+        if task["project_id"] is not None:
+            row = stats[task["project_id"]]
+            row[STATUS_COLUMNS[task["status"]]] += 1
+            row["last_activity_at"] = max(row["last_activity_at"], task["updated_at"])
+    for link in rows["project_ideas"]:
+        stats[link["project_id"]]["idea_count"] += 1
+    for concept in rows["concept_notes"]:
+        stats[concept["project_id"]]["concept_note_count"] += 1
+    rows["project_stats"] = list(stats.values())
+
+    tagging_base = first_id(u, config.ideas_per_user * config.tags_per_idea + config.journal_days * JOURNAL_TAGS_MAX)
+    rows["taggings"] = [{
+        "id": tagging_base + n,
+        "user_id": user_id,
+        "tag_id": tag_id,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "created_at": tagged_at,
+    } for n, (tag_id, entity_type, entity_id, tagged_at) in enumerate(tagged)]
+    members: Dict[tuple, List[int]] = {}
+    usage: Dict[int, List[datetime]] = {}
+    for tag_id, entity_type, entity_id, tagged_at in tagged:
+        members.setdefault((tag_id, entity_type), []).append(entity_id)
+        usage.setdefault(tag_id, []).append(tagged_at)
+    rows["tag_postings"] = [{
+        "user_id": user_id,
+        "tag_id": tag_id,
+        "entity_type": entity_type,
+        "bitmap": encode_bitmap(bitmap_from_ids(ids)),
+        "cardinality": len(ids),
+    } for (tag_id, entity_type), ids in members.items()]
+    rows["tag_usage"] = [{
+        "user_id": user_id, "tag_id": tag_id, "count": len(times), "last_used_at": max(times),
+    } for tag_id, times in usage.items()]
+
+    return rows
+
+
+def _worker_init(config: SyntheticConfig, hashed_password: str) -> None:
+    global _CONFIG, _PASSWORD
+    _CONFIG, _PASSWORD = config, hashed_password
+    _load_models()
+
+
+def _generate_batch(users: Sequence[int]) -> Dict[str, List[dict]]:
+    batch: Dict[str, List[dict]] = {}
+    for u in users:
+        for table, rows in generate_user(_CONFIG, u, _PASSWORD).items():
+            batch.setdefault(table, []).extend(rows)
+    return batch
+
+
+def _batches(total: int, size: int) -> Iterator[range]:
+    for start in range(0, total, size):
+        yield range(start, min(start + size, total))
+
+
+def _tune_sqlite(engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # Bulk load only: no rollback journal, no fsync
+        for pragma in (
+            "journal_mode=OFF",
+            "synchronous=OFF",
+            "temp_store=MEMORY",
+            "cache_size=-262144",
+            "locking_mode=EXCLUSIVE",
+        ):
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+
+def generate(database_url: str, config: SyntheticConfig, jobs: int = 0, users_per_batch: int = 4) -> Dict[str, int]:
+    """Create the schema in ``database_url`` and fill it. Returns row counts per table."""
+    from auth.utils import get_password_hash
+
+    metadata = _load_models()
+    engine = create_engine(database_url)
+    if engine.dialect.name == "sqlite":
+        _tune_sqlite(engine)
+    metadata.create_all(engine)
+
+    tables = {table.name: table for table in metadata.sorted_tables}
+    indexes = [index for table in tables.values() for index in table.indexes if not index.unique]
+    hashed_password = get_password_hash(SYNTHETIC_PASSWORD)
+    counts: Dict[str, int] = {}
+    jobs = jobs or multiprocessing.cpu_count()
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        for index in indexes:
+            index.drop(conn, checkfirst=True)
+        conn.execute(tables["tags"].insert(), [
+            {"id": i + 1, "name": name} for i, name in enumerate(TAG_VOCABULARY + WORDS)
+        ])
+        counts["tags"] = len(TAG_VOCABULARY) + len(WORDS)
+
+    batches = _batches(config.users, users_per_batch)
+    with multiprocessing.Pool(jobs, initializer=_worker_init, initargs=(config, hashed_password)) as pool:
+        for done, batch in enumerate(pool.imap(_generate_batch, batches), start=1):
+            with engine.begin() as conn:
+                for table in metadata.sorted_tables:
+                    rows = batch.get(table.name)
+                    if rows:
+                        conn.execute(table.insert(), rows)
+                        counts[table.name] = counts.get(table.name, 0) + len(rows)
+            users_done = min(done * users_per_batch, config.users)
+            logger.info("%d/%d users written (%.0fs)", users_done, config.users, time.perf_counter() - started)
+
+    logger.info("Rebuilding %d indexes ...", len(indexes))
+    with engine.begin() as conn:
+        for index in indexes:
+            index.create(conn)
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    logger.info("Done in %.0fs", time.perf_counter() - started)
+    return counts
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.synthetic", description=__doc__.split("\n")[0])
+    parser.add_argument("--database-url", required=True, help="Target database; must not contain IPMS data")
+    parser.add_argument("--preset", choices=list(PRESETS), default="small")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--users", type=int, help="Override the preset's user count")
+    parser.add_argument("--tasks-per-user", type=int, help="Override the preset's tasks per user")
+    parser.add_argument("--jobs", type=int, default=0, help="Generator processes (default: CPU count)")
+    parser.add_argument("--users-per-batch", type=int, default=4, help="Users written per transaction")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    overrides = {"seed": args.seed}
+    if args.users is not None:
+        overrides["users"] = args.users
+    if args.tasks_per_user is not None:
+        overrides["tasks_per_user"] = args.tasks_per_user
+    config = replace(PRESETS[args.preset], **overrides)
+    logger.info("Generating %s", asdict(config))
+
+    counts = generate(args.database_url, config, jobs=args.jobs, users_per_batch=args.users_per_batch)
+    for table, count in sorted(counts.items()):
+        print(f"{table:<18} {count:>12,}")
+
+
+if __name__ == "__main__":
+    main()
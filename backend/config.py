@@ -27,6 +27,9 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", secrets.token_hex(32))
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_SCOPES: list = ["read", "write"]
+    # How often each worker reloads revoked token versions from the database
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = 30
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./ipms.db")
@@ -38,6 +41,12 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
     GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET", "")
     GOOGLE_REDIRECT_URI: str = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:3000/auth/google/callback")
+    GOOGLE_TOKEN_URL: str = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+    GOOGLE_JWKS_URL: str = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+    GOOGLE_USERINFO_URL: str = os.getenv("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v2/userinfo")
+    GOOGLE_ISSUERS: list = ["https://accounts.google.com", "accounts.google.com"]
+    # Used when the JWKS response carries no Cache-Control max-age
+    GOOGLE_JWKS_DEFAULT_TTL: int = 3600
     
     # Validate required settings
     @property
@@ -67,12 +76,78 @@ class Settings(BaseSettings):
         "Accept",
         "Origin",
         "X-Requested-With",
+        "If-None-Match",
+        "If-Modified-Since",
     ]
     CORS_METHODS: list = ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
     CORS_ALLOW_CREDENTIALS: bool = True
     CORS_ALLOW_METHODS: list = ["*"]
     CORS_ALLOW_HEADERS: list = ["*"]
     
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_LEVELS: dict = {
+        "application/json": {"gzip": 6, "br": 5, "zstd": 6},
+        "text/": {"gzip": 6, "br": 5, "zstd": 6},
+        "application/javascript": {"gzip": 6, "br": 5, "zstd": 6},
+    }
+    COMPRESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    
+    # Background maintenance (token purge, VACUUM, ANALYZE)
+    MAINTENANCE_ENABLED: bool = os.getenv("MAINTENANCE_ENABLED", "true").lower() == "true"
+    MAINTENANCE_TICK_SECONDS: int = 60
+    MAINTENANCE_LEASE_SECONDS: int = 180
+    MAINTENANCE_DELETE_CHUNK_SIZE: int = 1000
+    MAINTENANCE_JOB_INTERVALS: dict = {
+        "purge_refresh_tokens": 3600,
+        "purge_password_resets": 6 * 3600,
+        "incremental_vacuum": 6 * 3600,
+        "optimize": 24 * 3600,
+        "purge_reminder_deliveries": 24 * 3600,
+        "run_purges": 600,
+        "prune_taggings": 3600,
+        "compact_concept_revisions": 24 * 3600,
+        "compact_mindmaps": 600,
+        "score_journal_entries": 3600,
+    }
+    PASSWORD_RESET_RETENTION_DAYS: int = 7
+    REMINDER_DELIVERY_RETENTION_DAYS: int = 30
+    # Projects with more child rows than this are deleted in the background
+    PURGE_SYNC_MAX_ROWS: int = 1000
+    VACUUM_PAGES_PER_RUN: int = 2000
+    
+    # Recurring tasks: how far back the agenda looks for missed occurrences
+    RECURRENCE_OVERDUE_LOOKBACK_DAYS: int = 30
+    
+    # Due-date and habit reminders
+    REMINDERS_ENABLED: bool = os.getenv("REMINDERS_ENABLED", "true").lower() == "true"
+    REMINDER_LEAD_MINUTES: int = 15
+    REMINDER_HORIZON_HOURS: int = 24
+    REMINDER_RELOAD_SECONDS: int = 300
+    # Reminders missed by up to this much (e.g. during a restart) are still sent
+    REMINDER_GRACE_MINUTES: int = 10
+    REMINDER_NOTIFIER: str = os.getenv("REMINDER_NOTIFIER", "log")  # log, webhook
+    REMINDER_WEBHOOK_URL: str = os.getenv("REMINDER_WEBHOOK_URL", "")
+    
+    # Tag autocomplete: cached per-user prefix indexes and how fast old usage fades
+    TAG_INDEX_MAX_USERS: int = 1000
+    TAG_INDEX_TTL_SECONDS: int = 60
+    TAG_RECENCY_HALF_LIFE_DAYS: float = 30.0
+    
+    # Concept note history: a full snapshot every N revisions, deltas in between
+    CONCEPT_REVISION_SNAPSHOT_INTERVAL: int = 20
+    # Older revisions are dropped by the compaction job
+    CONCEPT_REVISION_MAX_KEPT: int = 500
+    
+    # Mindmap JSON Patch log: folded into the stored document after this many
+    # patches, and the last patched documents kept in memory per worker
+    MINDMAP_COMPACT_AFTER_OPS: int = 50
+    MINDMAP_DOCUMENT_CACHE_SIZE: int = 32
+    # Live editing: merged operations are written at most once per interval,
+    # and each WebSocket message carries at most this many
+    MINDMAP_COLLAB_FLUSH_MS: int = 500
+    MINDMAP_COLLAB_MAX_OPS: int = 500
+    
     # AI Settings
     ai: AIProviderSettings = AIProviderSettings()
 
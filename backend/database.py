@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, event, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import logging
@@ -29,6 +29,16 @@ except Exception as e:
     logger.error(f"Failed to create database engine: {e}")
     raise
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # Only takes effect on a new database file; lets maintenance run incremental VACUUM
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # SQLite ignores foreign keys (and ON DELETE CASCADE) unless enabled per connection
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 try:
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     logger.info("Session maker created successfully")
@@ -7,10 +7,16 @@ from routers.ideas import router as ideas_router
 from routers.concepts import router as concepts_router
 from routers.project_ideas import router as project_ideas_router
 from routers.mindmaps import router as mindmaps_router
+from routers.tags import router as tags_router
 import uvicorn
 import logging
 import sys
 from database import Base, engine, SessionLocal
+from middleware import CompressionMiddleware
+from services.maintenance import scheduler as maintenance_scheduler
+from auth.google import google_client
+from services.reminders import reminder_scheduler
+from services.mindmap_collab import collaboration_hub
 from config import settings
 from datetime import datetime
 
@@ -62,6 +68,14 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Compress large responses (gzip, plus brotli/zstd when installed)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    levels=settings.COMPRESSION_LEVELS,
+    cache_max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+)
+
 # Add middleware for request logging
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -87,6 +101,33 @@ async def general_exception_handler(request: Request, exc: Exception):
         content={"detail": "Internal server error"}
     )
 
+# Background maintenance; only the worker holding the lease runs jobs
+@app.on_event("startup")
+async def start_maintenance():
+    if settings.MAINTENANCE_ENABLED:
+        maintenance_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_maintenance():
+    await maintenance_scheduler.stop()
+
+@app.on_event("startup")
+async def start_reminders():
+    if settings.REMINDERS_ENABLED:
+        reminder_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_reminders():
+    await reminder_scheduler.stop()
+
+@app.on_event("shutdown")
+async def flush_mindmap_rooms():
+    await collaboration_hub.close()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await google_client.aclose()
+
 # Mount routers
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
 app.include_router(tasks_router, prefix="/api/tasks", tags=["tasks"])
@@ -98,6 +139,7 @@ app.include_router(ideas_router, prefix="/api/ideas", tags=["ideas"])
 app.include_router(concepts_router, prefix="/api/concepts", tags=["concepts"])
 app.include_router(project_ideas_router, prefix="/api/project-ideas", tags=["project-ideas"])
 app.include_router(mindmaps_router, prefix="/api/mindmaps", tags=["mindmaps"])
+app.include_router(tags_router, prefix="/api/tags", tags=["tags"])
 
 @app.get("/")
 async def root():
@@ -117,11 +159,13 @@ async def health_check():
         # Verify database connection
         db = SessionLocal()
         db.execute("SELECT 1")
+        maintenance = maintenance_scheduler.status(db)
         db.close()
         db_status = "operational"
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
         db_status = "error"
+        maintenance = None
 
     return {
         "status": "healthy" if db_status == "operational" else "unhealthy",
@@ -129,7 +173,8 @@ async def health_check():
         "services": {
             "database": db_status,
             "api": "operational"
-        }
+        },
+        "maintenance": maintenance
     }
 
 if __name__ == "__main__":
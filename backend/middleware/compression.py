@@ -0,0 +1,307 @@
+"""Response compression with content negotiation and a precompressed cache.
+
+Supports gzip out of the box and brotli / zstd when the optional ``brotli`` and
+``zstandard`` packages are installed. Responses that carry an ``ETag`` and are
+not marked ``no-store`` are compressed once and then served from an in-memory
+LRU cache keyed by a digest of the body, the encoding and the level. The ETags
+are weak and not per user, so they only mark a response as worth caching; the
+digest guarantees the cached bytes are those of the body the app rendered.
+"""
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Server preference when the client weights several encodings equally
+ENCODING_PREFERENCE = ("br", "zstd", "gzip")
+
+DEFAULT_LEVELS: Dict[str, Dict[str, int]] = {
+    "application/json": {"gzip": 6, "br": 5, "zstd": 6},
+    "text/": {"gzip": 6, "br": 5, "zstd": 6},
+    "application/javascript": {"gzip": 6, "br": 5, "zstd": 6},
+}
+
+
+def available_encodings() -> Tuple[str, ...]:
+    encodings = []
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+def negotiate_encoding(accept_encoding: str, supported: Iterable[str]) -> Optional[str]:
+    """Pick the best supported encoding from an ``Accept-Encoding`` header."""
+    supported = tuple(supported)
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in ENCODING_PREFERENCE:
+        if coding not in supported:
+            continue
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    """Uniform streaming interface over gzip, brotli and zstd."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.flush()
+        if self.encoding == "zstd":
+            return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush()
+
+    @classmethod
+    def oneshot(cls, encoding: str, level: int, data: bytes) -> bytes:
+        if encoding == "gzip":
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            return compressor.compress(data) + compressor.flush()
+        if encoding == "br":
+            return brotli.compress(data, quality=level)
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+class CompressedCache:
+    """Thread-safe LRU of compressed bodies bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class CompressionMiddleware:
+    """ASGI middleware negotiating gzip/brotli/zstd for sufficiently large responses."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        levels: Optional[Dict[str, Dict[str, int]]] = None,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = levels if levels is not None else DEFAULT_LEVELS
+        self.encodings = available_encodings()
+        self.cache = CompressedCache(cache_max_bytes)
+
+    def level_for(self, content_type: str, encoding: str) -> Optional[int]:
+        """Return the configured level for a content type, or None if it should not be compressed."""
+        content_type = content_type.split(";")[0].strip().lower()
+        match = None
+        for prefix in self.levels:
+            if content_type.startswith(prefix) and (match is None or len(prefix) > len(match)):
+                match = prefix
+        if match is None:
+            return None
+        return self.levels[match].get(encoding)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding, self.encodings) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, scope, send, encoding: str):
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.start_message = None
+        self.level: Optional[int] = None
+        self.passthrough = False
+        self.streaming: Optional[_Compressor] = None
+
+    async def __call__(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        if self.streaming is not None:
+            await self._send_streaming(message)
+            return
+
+        headers = _Headers(self.start_message["headers"])
+        status = self.start_message["status"]
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        self.level = self.middleware.level_for(headers.get("content-type", ""), self.encoding)
+        if (
+            status < 200
+            or status in (204, 206, 304)
+            or "content-encoding" in headers
+            or self.level is None
+            or (not more_body and len(body) < self.middleware.minimum_size)
+        ):
+            self.passthrough = True
+            if self.level is not None and "content-encoding" not in headers:
+                headers.add_vary("Accept-Encoding")
+                self.start_message["headers"] = headers.raw
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        headers.add_vary("Accept-Encoding")
+        headers.set("content-encoding", self.encoding)
+
+        if more_body:
+            # Streaming response: compress chunk by chunk, length is unknown up front
+            headers.remove("content-length")
+            self.start_message["headers"] = headers.raw
+            self.streaming = _Compressor(self.encoding, self.level)
+            await self.send(self.start_message)
+            await self._send_streaming(message)
+            return
+
+        compressed = None
+        cache_key = None
+        etag = headers.get("etag")
+        if etag and "no-store" not in headers.get("cache-control", "").lower():
+            # Hashing is far cheaper than compressing, and safe whatever the ETag covers
+            cache_key = (hashlib.blake2b(body, digest_size=16).digest(), self.encoding, self.level)
+            compressed = self.middleware.cache.get(cache_key)
+        if compressed is None:
+            compressed = _Compressor.oneshot(self.encoding, self.level, body)
+            if cache_key is not None:
+                self.middleware.cache.put(cache_key, compressed)
+
+        headers.set("content-length", str(len(compressed)))
+        self.start_message["headers"] = headers.raw
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    async def _send_streaming(self, message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        chunk = self.streaming.compress(body) if body else b""
+        if not more_body:
+            chunk += self.streaming.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+class _Headers:
+    """Minimal mutable view over raw ASGI header pairs."""
+
+    def __init__(self, raw: List[Tuple[bytes, bytes]]):
+        self.raw = list(raw)
+
+    def __contains__(self, name: str) -> bool:
+        key = name.encode("latin-1")
+        return any(k.lower() == key for k, _ in self.raw)
+
+    def get(self, name: str, default: str = "") -> str:
+        key = name.encode("latin-1")
+        for k, v in self.raw:
+            if k.lower() == key:
+                return v.decode("latin-1")
+        return default
+
+    def remove(self, name: str) -> None:
+        key = name.encode("latin-1")
+        self.raw = [(k, v) for k, v in self.raw if k.lower() != key]
+
+    def set(self, name: str, value: str) -> None:
+        self.remove(name)
+        self.raw.append((name.encode("latin-1"), value.encode("latin-1")))
+
+    def add_vary(self, value: str) -> None:
+        existing = self.get("vary")
+        values = [v.strip() for v in existing.split(",") if v.strip()]
+        if value.lower() not in (v.lower() for v in values):
+            values.append(value)
+        self.set("vary", ", ".join(values))
@@ -0,0 +1,64 @@
+"""add task dependencies, schedules and estimated_hours
+
+Revision ID: 2e9f6b4c8d15
+Revises: d71c4e8f2a90
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e9f6b4c8d15'
+down_revision = 'd71c4e8f2a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('estimated_hours', sa.Float(), nullable=True))
+    op.create_table(
+        'task_dependencies',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('depends_on_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['depends_on_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('task_id', 'depends_on_id', name='uq_task_dependency')
+    )
+    op.create_index(op.f('ix_task_dependencies_id'), 'task_dependencies', ['id'], unique=False)
+    op.create_index(op.f('ix_task_dependencies_task_id'), 'task_dependencies', ['task_id'], unique=False)
+    op.create_index(op.f('ix_task_dependencies_depends_on_id'), 'task_dependencies', ['depends_on_id'], unique=False)
+    op.create_index(op.f('ix_task_dependencies_project_id'), 'task_dependencies', ['project_id'], unique=False)
+    op.create_table(
+        'task_schedules',
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('earliest_start', sa.Float(), nullable=False),
+        sa.Column('earliest_finish', sa.Float(), nullable=False),
+        sa.Column('latest_start', sa.Float(), nullable=False),
+        sa.Column('latest_finish', sa.Float(), nullable=False),
+        sa.Column('slack', sa.Float(), nullable=False),
+        sa.Column('is_critical', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('task_id')
+    )
+    op.create_index(op.f('ix_task_schedules_project_id'), 'task_schedules', ['project_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_task_schedules_project_id'), table_name='task_schedules')
+    op.drop_table('task_schedules')
+    op.drop_index(op.f('ix_task_dependencies_project_id'), table_name='task_dependencies')
+    op.drop_index(op.f('ix_task_dependencies_depends_on_id'), table_name='task_dependencies')
+    op.drop_index(op.f('ix_task_dependencies_task_id'), table_name='task_dependencies')
+    op.drop_index(op.f('ix_task_dependencies_id'), table_name='task_dependencies')
+    op.drop_table('task_dependencies')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('estimated_hours')
@@ -0,0 +1,58 @@
+"""add task recurrences and occurrence exceptions
+
+Revision ID: 5a3d7f9e1b24
+Revises: 2e9f6b4c8d15
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a3d7f9e1b24'
+down_revision = '2e9f6b4c8d15'
+branch_labels = None
+depends_on = None
+
+task_status = sa.Enum('TODO', 'IN_PROGRESS', 'DONE', name='taskstatus')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_recurrences',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('rule', sa.String(length=500), nullable=False),
+        sa.Column('dtstart', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('task_id')
+    )
+    op.create_index(op.f('ix_task_recurrences_id'), 'task_recurrences', ['id'], unique=False)
+    op.create_table(
+        'task_occurrence_exceptions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('occurrence_date', sa.DateTime(), nullable=False),
+        sa.Column('skipped', sa.Boolean(), nullable=False),
+        sa.Column('status', task_status, nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('task_id', 'occurrence_date', name='uq_task_occurrence')
+    )
+    op.create_index(op.f('ix_task_occurrence_exceptions_id'), 'task_occurrence_exceptions', ['id'], unique=False)
+    op.create_index(op.f('ix_task_occurrence_exceptions_task_id'), 'task_occurrence_exceptions', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_task_occurrence_exceptions_task_id'), table_name='task_occurrence_exceptions')
+    op.drop_index(op.f('ix_task_occurrence_exceptions_id'), table_name='task_occurrence_exceptions')
+    op.drop_table('task_occurrence_exceptions')
+    op.drop_index(op.f('ix_task_recurrences_id'), table_name='task_recurrences')
+    op.drop_table('task_recurrences')
@@ -0,0 +1,44 @@
+"""add reminder deliveries and habit reminder time
+
+Revision ID: 9c4e2b7a1f63
+Revises: 5a3d7f9e1b24
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e2b7a1f63'
+down_revision = '5a3d7f9e1b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reminder_deliveries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('target_id', sa.Integer(), nullable=False),
+        sa.Column('fire_at', sa.DateTime(), nullable=False),
+        sa.Column('delivered_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kind', 'target_id', 'fire_at', name='uq_reminder_delivery')
+    )
+    op.create_index(op.f('ix_reminder_deliveries_id'), 'reminder_deliveries', ['id'], unique=False)
+    op.create_index(op.f('ix_reminder_deliveries_delivered_at'), 'reminder_deliveries', ['delivered_at'], unique=False)
+    op.add_column('habits', sa.Column('reminder_time', sa.Time(), nullable=True))
+    op.create_index(op.f('ix_habits_reminder_time'), 'habits', ['reminder_time'], unique=False)
+    op.create_index('ix_tasks_due_date', 'tasks', ['due_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_due_date', table_name='tasks')
+    op.drop_index(op.f('ix_habits_reminder_time'), table_name='habits')
+    with op.batch_alter_table('habits') as batch_op:
+        batch_op.drop_column('reminder_time')
+    op.drop_index(op.f('ix_reminder_deliveries_delivered_at'), table_name='reminder_deliveries')
+    op.drop_index(op.f('ix_reminder_deliveries_id'), table_name='reminder_deliveries')
+    op.drop_table('reminder_deliveries')
@@ -0,0 +1,41 @@
+"""add per-user tag usage counts
+
+Revision ID: a6c9e3f1b847
+Revises: f3a8d2c6b519
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c9e3f1b847'
+down_revision = 'f3a8d2c6b519'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tag_usage',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'tag_id')
+    )
+    # Backfill from the tags on existing ideas
+    op.execute("""
+        INSERT INTO tag_usage (user_id, tag_id, count, last_used_at)
+        SELECT i.user_id, it.tag_id, count(*), max(coalesce(i.updated_at, i.created_at))
+        FROM idea_tags it JOIN ideas i ON i.id = it.idea_id
+        WHERE i.user_id IS NOT NULL
+        GROUP BY i.user_id, it.tag_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('tag_usage')
@@ -0,0 +1,45 @@
+"""add journal sentiment scores and daily journal aggregates
+
+Revision ID: a9d3e5c7b180
+Revises: f2b8d6a4c951
+Create Date: 2026-10-20 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3e5c7b180'
+down_revision = 'f2b8d6a4c951'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Left NULL here: the score_journal_entries maintenance job scores the
+    # existing entries and builds their journal_daily_stats rows
+    with op.batch_alter_table('journal_entries') as batch_op:
+        batch_op.add_column(sa.Column('word_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('sentiment', sa.Float(), nullable=True))
+    op.create_index('ix_journal_entries_user_created', 'journal_entries', ['user_id', 'created_at'])
+    op.create_table(
+        'journal_daily_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('mood', sa.String(length=50), nullable=False),
+        sa.Column('entry_count', sa.Integer(), nullable=False),
+        sa.Column('scored_count', sa.Integer(), nullable=False),
+        sa.Column('word_count', sa.Integer(), nullable=False),
+        sa.Column('sentiment_sum', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'mood')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('journal_daily_stats')
+    op.drop_index('ix_journal_entries_user_created', table_name='journal_entries')
+    with op.batch_alter_table('journal_entries') as batch_op:
+        batch_op.drop_column('sentiment')
+        batch_op.drop_column('word_count')
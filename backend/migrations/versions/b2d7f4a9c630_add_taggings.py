@@ -0,0 +1,161 @@
+"""unify tags into taggings with bitmap postings
+
+Revision ID: b2d7f4a9c630
+Revises: a6c9e3f1b847
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+import json
+import zlib
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d7f4a9c630'
+down_revision = 'a6c9e3f1b847'
+branch_labels = None
+depends_on = None
+
+
+def _encode(ids) -> bytes:
+    # Same format as services.tagging.encode_bitmap, kept here so the
+    # migration does not depend on application code
+    data = bytearray(max(ids) // 8 + 1)
+    for entity_id in ids:
+        data[entity_id >> 3] |= 1 << (entity_id & 7)
+    return zlib.compress(bytes(data))
+
+
+def _tag_ids(conn, names) -> dict:
+    tags = sa.table('tags', sa.column('id', sa.Integer), sa.column('name', sa.String))
+    known = dict(conn.execute(sa.select(tags.c.name, tags.c.id)).fetchall())
+    missing = sorted(set(names) - set(known))
+    if missing:
+        conn.execute(tags.insert(), [{'name': name} for name in missing])
+        known = dict(conn.execute(sa.select(tags.c.name, tags.c.id)).fetchall())
+    return known
+
+
+def _rebuild_tag_usage(source: str) -> None:
+    op.execute("DELETE FROM tag_usage")
+    op.execute(f"""
+        INSERT INTO tag_usage (user_id, tag_id, count, last_used_at)
+        SELECT user_id, tag_id, count(*), max(used_at) FROM ({source}) GROUP BY user_id, tag_id
+    """)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'taggings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tag_id', 'entity_type', 'entity_id', name='uq_taggings_tag_entity')
+    )
+    op.create_index('ix_taggings_entity', 'taggings', ['entity_type', 'entity_id'], unique=False)
+    op.create_index('ix_taggings_user_tag', 'taggings', ['user_id', 'tag_id'], unique=False)
+    postings = op.create_table(
+        'tag_postings',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('bitmap', sa.LargeBinary(), nullable=False),
+        sa.Column('cardinality', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'tag_id', 'entity_type')
+    )
+
+    op.execute("""
+        INSERT INTO taggings (user_id, tag_id, entity_type, entity_id, created_at)
+        SELECT i.user_id, it.tag_id, 'idea', it.idea_id, min(i.created_at)
+        FROM idea_tags it JOIN ideas i ON i.id = it.idea_id
+        WHERE it.tag_id IS NOT NULL
+        GROUP BY it.tag_id, it.idea_id
+    """)
+
+    # Journal tags were a JSON array of names on each entry
+    conn = op.get_bind()
+    entries = conn.execute(sa.text(
+        "SELECT id, user_id, tags, created_at FROM journal_entries WHERE tags IS NOT NULL AND user_id IS NOT NULL"
+    )).fetchall()
+    entry_tags = []
+    for entry_id, user_id, tags, created_at in entries:
+        names = json.loads(tags) if isinstance(tags, str) else tags
+        names = {name.strip() for name in names or () if isinstance(name, str) and name.strip()}
+        entry_tags.append((entry_id, user_id, created_at, names))
+    tag_ids = _tag_ids(conn, set().union(*(names for *_, names in entry_tags)))
+    rows = [
+        {'user_id': user_id, 'tag_id': tag_ids[name], 'entity_type': 'journal',
+         'entity_id': entry_id, 'created_at': created_at}
+        for entry_id, user_id, created_at, names in entry_tags for name in names
+    ]
+    if rows:
+        # Raw values: the timestamps were read back as stored
+        conn.execute(sa.text("""
+            INSERT INTO taggings (user_id, tag_id, entity_type, entity_id, created_at)
+            VALUES (:user_id, :tag_id, :entity_type, :entity_id, :created_at)
+        """), rows)
+
+    members = defaultdict(list)
+    for user_id, tag_id, entity_type, entity_id in conn.execute(sa.text(
+        "SELECT user_id, tag_id, entity_type, entity_id FROM taggings"
+    )):
+        members[user_id, tag_id, entity_type].append(entity_id)
+    if members:
+        op.bulk_insert(postings, [
+            {'user_id': user_id, 'tag_id': tag_id, 'entity_type': entity_type,
+             'bitmap': _encode(ids), 'cardinality': len(ids)}
+            for (user_id, tag_id, entity_type), ids in members.items()
+        ])
+
+    # Usage counts now cover every kind of item, not only ideas
+    _rebuild_tag_usage("SELECT user_id, tag_id, created_at AS used_at FROM taggings")
+
+    op.drop_table('idea_tags')
+    with op.batch_alter_table('journal_entries') as batch_op:
+        batch_op.drop_column('tags')
+
+
+def downgrade() -> None:
+    op.add_column('journal_entries', sa.Column('tags', sa.JSON(), nullable=True))
+    conn = op.get_bind()
+    names = defaultdict(list)
+    for entry_id, name in conn.execute(sa.text("""
+        SELECT tg.entity_id, t.name FROM taggings tg JOIN tags t ON t.id = tg.tag_id
+        WHERE tg.entity_type = 'journal' ORDER BY t.name
+    """)):
+        names[entry_id].append(name)
+    for entry_id, tags in names.items():
+        conn.execute(sa.text("UPDATE journal_entries SET tags = :tags WHERE id = :id"),
+                     {'tags': json.dumps(tags), 'id': entry_id})
+
+    op.create_table(
+        'idea_tags',
+        sa.Column('idea_id', sa.Integer(), nullable=True),
+        sa.Column('tag_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['idea_id'], ['ideas.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE')
+    )
+    op.execute("""
+        INSERT INTO idea_tags (idea_id, tag_id)
+        SELECT entity_id, tag_id FROM taggings WHERE entity_type = 'idea'
+    """)
+    _rebuild_tag_usage("""
+        SELECT i.user_id, it.tag_id, coalesce(i.updated_at, i.created_at) AS used_at
+        FROM idea_tags it JOIN ideas i ON i.id = it.idea_id
+    """)
+
+    op.drop_table('tag_postings')
+    op.drop_index('ix_taggings_user_tag', table_name='taggings')
+    op.drop_index('ix_taggings_entity', table_name='taggings')
+    op.drop_table('taggings')
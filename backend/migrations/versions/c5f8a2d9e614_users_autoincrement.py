@@ -0,0 +1,28 @@
+"""never reuse user ids
+
+Revision ID: c5f8a2d9e614
+Revises: a9d3e5c7b180
+Create Date: 2026-10-21 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f8a2d9e614'
+down_revision = 'a9d3e5c7b180'
+branch_labels = None
+depends_on = None
+
+
+# Without AUTOINCREMENT SQLite hands the id of the last deleted user to the
+# next one, and access tokens of the deleted account would then resolve to it.
+# The table can only be rebuilt to change this; the copy keeps the ids.
+def upgrade() -> None:
+    with op.batch_alter_table('users', recreate='always', table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users', recreate='always') as batch_op:
+        pass
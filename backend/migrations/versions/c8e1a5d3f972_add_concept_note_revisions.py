@@ -0,0 +1,47 @@
+"""add concept note revisions
+
+Revision ID: c8e1a5d3f972
+Revises: b2d7f4a9c630
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e1a5d3f972'
+down_revision = 'b2d7f4a9c630'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'concept_note_revisions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('concept_id', sa.Integer(), nullable=False),
+        sa.Column('number', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('kind', sa.String(length=10), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('chain_length', sa.Integer(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['concept_id'], ['concept_notes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('concept_id', 'number', name='uq_concept_note_revisions_number')
+    )
+    # The current text of every note becomes its first revision
+    op.execute("""
+        INSERT INTO concept_note_revisions (concept_id, number, title, kind, content, chain_length,
+                                            size, user_id, created_at)
+        SELECT id, 1, title, 'snapshot', content, 0, length(content), user_id, coalesce(updated_at, created_at)
+        FROM concept_notes
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('concept_note_revisions')
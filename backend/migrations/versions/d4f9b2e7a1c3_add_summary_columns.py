@@ -0,0 +1,100 @@
+"""add excerpt and size columns for list view summaries
+
+Revision ID: d4f9b2e7a1c3
+Revises: c8e1a5d3f972
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+import json
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f9b2e7a1c3'
+down_revision = 'c8e1a5d3f972'
+branch_labels = None
+depends_on = None
+
+EXCERPT_LENGTH = 200
+BATCH_SIZE = 1000
+
+
+def _excerpt(text) -> str:
+    # Same algorithm as utils.summary.excerpt, kept here so the migration
+    # does not depend on application code
+    text = re.sub(r"\s+", " ", text or "").strip()
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text[:EXCERPT_LENGTH - 1]
+    space = cut.rfind(" ")
+    if space > EXCERPT_LENGTH // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def _json(value):
+    # JSON columns read through sa.text come back as the stored string
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _text_summary(text):
+    return {'excerpt': _excerpt(text), 'size': len(text or '')}
+
+
+def _activity_summary(data):
+    return {'size': len(json.dumps(_json(data))) if data is not None else 0}
+
+
+def _mindmap_summary(data):
+    data = _json(data)
+    return {
+        'size': len(json.dumps(data)) if data is not None else 0,
+        'node_count': len(data.get('nodes') or []) if isinstance(data, dict) else 0,
+    }
+
+
+def _backfill(table: str, body: str, summarize) -> None:
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.text(
+            f"SELECT id, {body} FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        updates = [dict(summarize(value), id=row_id) for row_id, value in rows]
+        columns = ", ".join(f"{column} = :{column}" for column in updates[0] if column != 'id')
+        conn.execute(sa.text(f"UPDATE {table} SET {columns} WHERE id = :id"), updates)
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    for table in ('concept_notes', 'journal_entries'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('excerpt', sa.String(length=EXCERPT_LENGTH), nullable=False, server_default=''))
+            batch_op.add_column(sa.Column('size', sa.Integer(), nullable=False, server_default='0'))
+    with op.batch_alter_table('activities') as batch_op:
+        batch_op.add_column(sa.Column('size', sa.Integer(), nullable=False, server_default='0'))
+    with op.batch_alter_table('mindmaps') as batch_op:
+        batch_op.add_column(sa.Column('size', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('node_count', sa.Integer(), nullable=False, server_default='0'))
+
+    _backfill('concept_notes', 'content', _text_summary)
+    _backfill('journal_entries', 'content', _text_summary)
+    _backfill('activities', 'data', _activity_summary)
+    _backfill('mindmaps', 'data', _mindmap_summary)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('mindmaps') as batch_op:
+        batch_op.drop_column('node_count')
+        batch_op.drop_column('size')
+    with op.batch_alter_table('activities') as batch_op:
+        batch_op.drop_column('size')
+    for table in ('journal_entries', 'concept_notes'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('size')
+            batch_op.drop_column('excerpt')
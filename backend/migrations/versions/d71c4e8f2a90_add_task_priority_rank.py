@@ -0,0 +1,29 @@
+"""add task priority_rank and agenda index
+
+Revision ID: d71c4e8f2a90
+Revises: 8b0e5d3a6c12
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd71c4e8f2a90'
+down_revision = '8b0e5d3a6c12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('priority_rank', sa.Integer(), nullable=False, server_default='1'))
+    # Enum columns store member names
+    op.execute("UPDATE tasks SET priority_rank = CASE priority WHEN 'LOW' THEN 0 WHEN 'HIGH' THEN 2 ELSE 1 END")
+    op.create_index('ix_tasks_user_status_due_rank', 'tasks', ['user_id', 'status', 'due_date', 'priority_rank'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_user_status_due_rank', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('priority_rank')
@@ -0,0 +1,48 @@
+"""add project stats counters
+
+Revision ID: e5b1c8a4d372
+Revises: 9c4e2b7a1f63
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b1c8a4d372'
+down_revision = '9c4e2b7a1f63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_stats',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('tasks_todo', sa.Integer(), nullable=False),
+        sa.Column('tasks_in_progress', sa.Integer(), nullable=False),
+        sa.Column('tasks_done', sa.Integer(), nullable=False),
+        sa.Column('idea_count', sa.Integer(), nullable=False),
+        sa.Column('concept_note_count', sa.Integer(), nullable=False),
+        sa.Column('last_activity_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+    # Backfill the counters of existing projects
+    op.execute("""
+        INSERT INTO project_stats (project_id, tasks_todo, tasks_in_progress, tasks_done,
+                                   idea_count, concept_note_count, last_activity_at)
+        SELECT p.id,
+               (SELECT count(*) FROM tasks t WHERE t.project_id = p.id AND t.status = 'TODO'),
+               (SELECT count(*) FROM tasks t WHERE t.project_id = p.id AND t.status = 'IN_PROGRESS'),
+               (SELECT count(*) FROM tasks t WHERE t.project_id = p.id AND t.status = 'DONE'),
+               (SELECT count(*) FROM project_ideas pi WHERE pi.project_id = p.id),
+               (SELECT count(*) FROM concept_notes c WHERE c.project_id = p.id),
+               coalesce(p.updated_at, p.created_at)
+        FROM projects p
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('project_stats')
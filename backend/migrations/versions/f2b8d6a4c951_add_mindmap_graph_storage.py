@@ -0,0 +1,117 @@
+"""add normalized mindmap storage with R-tree viewport indexes
+
+Revision ID: f2b8d6a4c951
+Revises: e7a3c9f2b416
+Create Date: 2026-10-20 14:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d6a4c951'
+down_revision = 'e7a3c9f2b416'
+branch_labels = None
+depends_on = None
+
+# Same statements as models.mindmap_graph.SPATIAL_INDEX_DDL, kept here so the
+# migration does not depend on application code
+_EDGE_BOXES = """
+    INSERT OR REPLACE INTO mindmap_edge_index
+    SELECT e.id, min(s.x, t.x), max(s.x, t.x), min(s.y, t.y), max(s.y, t.y), e.mindmap_id, e.mindmap_id
+    FROM mindmap_edges e
+    JOIN mindmap_nodes s ON s.mindmap_id = e.mindmap_id AND s.key = e.source
+    JOIN mindmap_nodes t ON t.mindmap_id = e.mindmap_id AND t.key = e.target
+"""
+SPATIAL_INDEX_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS mindmap_node_index USING rtree(id, min_x, max_x, min_y, max_y, min_m, max_m)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS mindmap_edge_index USING rtree(id, min_x, max_x, min_y, max_y, min_m, max_m)",
+    f"""CREATE TRIGGER IF NOT EXISTS mindmap_nodes_ai AFTER INSERT ON mindmap_nodes BEGIN
+        INSERT INTO mindmap_node_index VALUES (new.id, new.x, new.x, new.y, new.y, new.mindmap_id, new.mindmap_id);
+        {_EDGE_BOXES} WHERE e.mindmap_id = new.mindmap_id AND (e.source = new.key OR e.target = new.key);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS mindmap_nodes_au AFTER UPDATE OF x, y ON mindmap_nodes BEGIN
+        UPDATE mindmap_node_index SET min_x = new.x, max_x = new.x, min_y = new.y, max_y = new.y WHERE id = new.id;
+        {_EDGE_BOXES} WHERE e.mindmap_id = new.mindmap_id AND (e.source = new.key OR e.target = new.key);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS mindmap_nodes_ad AFTER DELETE ON mindmap_nodes BEGIN
+        DELETE FROM mindmap_node_index WHERE id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS mindmap_edges_ai AFTER INSERT ON mindmap_edges BEGIN
+        {_EDGE_BOXES} WHERE e.id = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS mindmap_edges_au AFTER UPDATE OF source, target ON mindmap_edges BEGIN
+        DELETE FROM mindmap_edge_index WHERE id = new.id;
+        {_EDGE_BOXES} WHERE e.id = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS mindmap_edges_ad AFTER DELETE ON mindmap_edges BEGIN
+        DELETE FROM mindmap_edge_index WHERE id = old.id;
+    END""",
+]
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('mindmaps') as batch_op:
+        batch_op.add_column(sa.Column('storage', sa.String(length=20), nullable=False, server_default='document'))
+    op.create_table(
+        'mindmap_nodes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('mindmap_id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('x', sa.Float(), nullable=False),
+        sa.Column('y', sa.Float(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['mindmap_id'], ['mindmaps.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('mindmap_id', 'key', name='uq_mindmap_nodes_key')
+    )
+    op.create_table(
+        'mindmap_edges',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('mindmap_id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('source', sa.String(length=100), nullable=False),
+        sa.Column('target', sa.String(length=100), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['mindmap_id'], ['mindmaps.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('mindmap_id', 'key', name='uq_mindmap_edges_key')
+    )
+    op.create_index('ix_mindmap_edges_source', 'mindmap_edges', ['mindmap_id', 'source'], unique=False)
+    op.create_index('ix_mindmap_edges_target', 'mindmap_edges', ['mindmap_id', 'target'], unique=False)
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in SPATIAL_INDEX_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    # Fold normalized maps back into their documents
+    conn = op.get_bind()
+    for mindmap_id, data in conn.execute(sa.text(
+        "SELECT id, data FROM mindmaps WHERE storage = 'normalized'"
+    )).fetchall():
+        document = json.loads(data) if isinstance(data, str) else (data or {})
+        for table, name in (('mindmap_nodes', 'nodes'), ('mindmap_edges', 'edges')):
+            document[name] = [
+                {'id': key, **json.loads(body)} for key, body in conn.execute(sa.text(
+                    f"SELECT key, data FROM {table} WHERE mindmap_id = :id ORDER BY id"
+                ), {'id': mindmap_id})
+            ]
+        conn.execute(sa.text("UPDATE mindmaps SET data = :data WHERE id = :id"),
+                     {'data': json.dumps(document), 'id': mindmap_id})
+
+    if conn.dialect.name == 'sqlite':
+        for trigger in ('mindmap_nodes_ai', 'mindmap_nodes_au', 'mindmap_nodes_ad',
+                        'mindmap_edges_ai', 'mindmap_edges_au', 'mindmap_edges_ad'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS mindmap_edge_index")
+        op.execute("DROP TABLE IF EXISTS mindmap_node_index")
+    op.drop_index('ix_mindmap_edges_target', table_name='mindmap_edges')
+    op.drop_index('ix_mindmap_edges_source', table_name='mindmap_edges')
+    op.drop_table('mindmap_edges')
+    op.drop_table('mindmap_nodes')
+    with op.batch_alter_table('mindmaps') as batch_op:
+        batch_op.drop_column('storage')
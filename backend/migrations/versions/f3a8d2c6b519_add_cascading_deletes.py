@@ -0,0 +1,79 @@
+"""add ON DELETE CASCADE foreign keys and purge jobs
+
+Revision ID: f3a8d2c6b519
+Revises: e5b1c8a4d372
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from itertools import groupby
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8d2c6b519'
+down_revision = 'e5b1c8a4d372'
+branch_labels = None
+depends_on = None
+
+# SQLite cannot alter a foreign key, so each table is rebuilt in batch mode;
+# the naming convention gives the reflected (unnamed) constraints a name to drop.
+naming_convention = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# (table, column, referred table)
+cascading_keys = [
+    ('activities', 'user_id', 'users'),
+    ('concept_notes', 'project_id', 'projects'),
+    ('concept_notes', 'user_id', 'users'),
+    ('goal_progress', 'goal_id', 'goals'),
+    ('goals', 'user_id', 'users'),
+    ('habit_tracking', 'habit_id', 'habits'),
+    ('habits', 'user_id', 'users'),
+    ('ideas', 'user_id', 'users'),
+    ('journal_entries', 'user_id', 'users'),
+    ('mindmaps', 'project_id', 'projects'),
+    ('password_resets', 'user_id', 'users'),
+    ('profiles', 'user_id', 'users'),
+    ('project_ideas', 'idea_id', 'ideas'),
+    ('project_ideas', 'project_id', 'projects'),
+    ('projects', 'owner_id', 'users'),
+    ('tasks', 'project_id', 'projects'),
+    ('tasks', 'user_id', 'users'),
+]
+
+
+def _set_ondelete(ondelete) -> None:
+    for table, keys in groupby(cascading_keys, key=lambda key: key[0]):
+        with op.batch_alter_table(table, recreate='always', naming_convention=naming_convention) as batch_op:
+            for _, column, referred in keys:
+                name = f'fk_{table}_{column}_{referred}'
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _set_ondelete('CASCADE')
+    op.add_column('projects', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_table(
+        'purge_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('target_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_rows', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_purge_jobs_id'), 'purge_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_purge_jobs_finished_at'), 'purge_jobs', ['finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_purge_jobs_finished_at'), table_name='purge_jobs')
+    op.drop_index(op.f('ix_purge_jobs_id'), table_name='purge_jobs')
+    op.drop_table('purge_jobs')
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('deleted_at')
+    _set_ondelete(None)
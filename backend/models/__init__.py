@@ -13,6 +13,17 @@ from .password_reset import PasswordReset
 from .idea import Idea
 from .concept import ConceptNote
 from .mindmap import Mindmap
+from .maintenance import SchedulerLease, MaintenanceJobRun, PurgeJob
+from .task_dependency import TaskDependency, TaskSchedule
+from .task_recurrence import TaskRecurrence, TaskOccurrenceException
+from .reminder import ReminderDelivery
+from .project_stats import ProjectStats
+from .tag_usage import TagUsage
+from .tagging import Tagging, TagPosting
+from .concept_revision import ConceptNoteRevision
+from .mindmap_operation import MindmapOperation
+from .mindmap_graph import MindmapNode, MindmapEdge
+from .journal_stats import JournalDailyStats
 
 __all__ = [
     "Base",
@@ -27,5 +38,22 @@ __all__ = [
     "PasswordReset",
     "Idea",
     "ConceptNote",
-    "Mindmap"
+    "Mindmap",
+    "SchedulerLease",
+    "MaintenanceJobRun",
+    "PurgeJob",
+    "TaskDependency",
+    "TaskSchedule",
+    "TaskRecurrence",
+    "TaskOccurrenceException",
+    "ReminderDelivery",
+    "ProjectStats",
+    "TagUsage",
+    "Tagging",
+    "TagPosting",
+    "ConceptNoteRevision",
+    "MindmapOperation",
+    "MindmapNode",
+    "MindmapEdge",
+    "JournalDailyStats"
 ]
@@ -1,30 +1,55 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Index
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from database import Base
+from .tagging import tags_relationship
+from utils.sentiment import analyze
+from utils.summary import EXCERPT_LENGTH, excerpt, json_size
 
 class Activity(Base):
     __tablename__ = "activities"
     __table_args__ = {'extend_existing': True}
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     type = Column(String(50))  # e.g., 'music', 'web', 'app', 'location'
     data = Column(JSON)  # Store flexible activity data
+    size = Column(Integer, nullable=False, default=0, server_default="0")
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="activities")
 
+    @validates("data")
+    def _sync_size(self, key, data):
+        self.size = json_size(data)
+        return data
+
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_journal_entries_user_created", "user_id", "created_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     content = Column(Text)
+    excerpt = Column(String(EXCERPT_LENGTH), nullable=False, default="", server_default="")
+    size = Column(Integer, nullable=False, default=0, server_default="0")
     mood = Column(String(50), nullable=True)
-    tags = Column(JSON)  # Store array of tags
+    # Unset for entries written before scoring existed, until the
+    # ``score_journal_entries`` job gets to them
+    word_count = Column(Integer, nullable=True)
+    sentiment = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     user = relationship("User", back_populates="journal_entries")
+    tags = tags_relationship("journal", "JournalEntry")
+
+    @validates("content")
+    def _sync_summary(self, key, content):
+        self.excerpt = excerpt(content)
+        self.size = len(content or "")
+        self.word_count, self.sentiment = analyze(content)
+        return content
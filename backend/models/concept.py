@@ -1,7 +1,9 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 from database import Base
+from .tagging import tags_relationship
+from utils.summary import EXCERPT_LENGTH, excerpt
 
 class ConceptNote(Base):
     __tablename__ = "concept_notes"
@@ -9,13 +11,23 @@ class ConceptNote(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
     content = Column(Text, nullable=False)
+    # Kept in sync with content for list views that do not load it
+    excerpt = Column(String(EXCERPT_LENGTH), nullable=False, default="", server_default="")
+    size = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign Keys
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Relationships
     project = relationship("Project", back_populates="concept_notes")
     user = relationship("User", back_populates="concept_notes")
+    tags = tags_relationship("concept", "ConceptNote")
+
+    @validates("content")
+    def _sync_summary(self, key, content):
+        self.excerpt = excerpt(content)
+        self.size = len(content or "")
+        return content
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint
+from datetime import datetime
+from database import Base
+
+class ConceptNoteRevision(Base):
+    """One saved state of a concept note.
+
+    ``kind`` is ``snapshot`` when ``content`` holds the full text, or ``delta``
+    when it holds the JSON-encoded line edits turning the previous revision
+    into this one; ``chain_length`` counts the deltas since the last snapshot.
+    """
+    __tablename__ = "concept_note_revisions"
+    __table_args__ = (
+        UniqueConstraint("concept_id", "number", name="uq_concept_note_revisions_number"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    concept_id = Column(Integer, ForeignKey("concept_notes.id", ondelete="CASCADE"), nullable=False)
+    number = Column(Integer, nullable=False)
+    title = Column(String(100), nullable=False)
+    kind = Column(String(10), nullable=False)
+    content = Column(Text, nullable=False)
+    chain_length = Column(Integer, nullable=False, default=0)
+    # Length of the full text, so listings need not rebuild it
+    size = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ConceptNoteRevision {self.concept_id}#{self.number} {self.kind}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, JSON, Boolean, Time
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -8,7 +8,7 @@ class Goal(Base):
     __table_args__ = {'extend_existing': True}
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     title = Column(String)
     description = Column(String)
     category = Column(String)
@@ -20,7 +20,7 @@ class Goal(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User", back_populates="goals")
-    progress_updates = relationship("GoalProgress", back_populates="goal", cascade="all, delete-orphan")
+    progress_updates = relationship("GoalProgress", back_populates="goal", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class GoalProgress(Base):
@@ -28,7 +28,7 @@ class GoalProgress(Base):
     __table_args__ = {'extend_existing': True}
 
     id = Column(Integer, primary_key=True, index=True)
-    goal_id = Column(Integer, ForeignKey("goals.id"))
+    goal_id = Column(Integer, ForeignKey("goals.id", ondelete="CASCADE"))
     progress = Column(Float)
     notes = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -41,16 +41,17 @@ class Habit(Base):
     __table_args__ = {'extend_existing': True}
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     name = Column(String)
     description = Column(String, nullable=True)
     frequency = Column(String)  # daily, weekly, monthly
     target_days = Column(JSON, default=[])  # For weekly habits: ["monday", "wednesday", "friday"]
     streak = Column(Integer, default=0)
+    reminder_time = Column(Time, nullable=True, index=True)  # UTC time of day
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="habits")
-    tracking = relationship("HabitTracking", back_populates="habit", cascade="all, delete-orphan")
+    tracking = relationship("HabitTracking", back_populates="habit", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class HabitTracking(Base):
@@ -58,7 +59,7 @@ class HabitTracking(Base):
     __table_args__ = {'extend_existing': True}
 
     id = Column(Integer, primary_key=True, index=True)
-    habit_id = Column(Integer, ForeignKey("habits.id"))
+    habit_id = Column(Integer, ForeignKey("habits.id", ondelete="CASCADE"))
     completed = Column(DateTime(timezone=True), server_default=func.now())
     notes = Column(String, nullable=True)
 
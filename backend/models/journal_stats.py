@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
+from database import Base
+
+class JournalDailyStats(Base):
+    """Journal entries of one user, day and mood, aggregated (see services/journal_stats).
+
+    ``mood`` is "" for entries without one; ``scored_count`` counts the
+    entries with a sentiment score, which ``sentiment_sum`` adds up.
+    """
+    __tablename__ = "journal_daily_stats"
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    mood = Column(String(50), primary_key=True)
+    entry_count = Column(Integer, nullable=False, default=0)
+    scored_count = Column(Integer, nullable=False, default=0)
+    word_count = Column(Integer, nullable=False, default=0)
+    sentiment_sum = Column(Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<JournalDailyStats {self.user_id} {self.day} {self.mood!r}>"
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from datetime import datetime
+from database import Base
+
+class SchedulerLease(Base):
+    """Time-limited lock that elects one worker to run background jobs."""
+    __tablename__ = "scheduler_leases"
+    __table_args__ = {'extend_existing': True}
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<SchedulerLease {self.name} held by {self.holder}>"
+
+class MaintenanceJobRun(Base):
+    """Outcome of the most recent run of each maintenance job."""
+    __tablename__ = "maintenance_jobs"
+    __table_args__ = {'extend_existing': True}
+
+    name = Column(String, primary_key=True)
+    last_run_at = Column(DateTime, nullable=True)
+    last_duration_ms = Column(Integer, nullable=True)
+    last_result = Column(Text, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<MaintenanceJobRun {self.name}>"
+
+class PurgeJob(Base):
+    """A project or user account being deleted in chunks (see services/purge)."""
+    __tablename__ = "purge_jobs"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)  # project, user
+    target_id = Column(Integer, nullable=False)
+    deleted_rows = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True, index=True)
+    last_error = Column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<PurgeJob {self.kind}:{self.target_id}>"
@@ -1,6 +1,10 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from database import Base
+from utils.summary import json_size
+
+def count_nodes(data) -> int:
+    return len(data.get("nodes") or []) if isinstance(data, dict) else 0
 
 class Mindmap(Base):
     __tablename__ = "mindmaps"
@@ -8,6 +12,21 @@ class Mindmap(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     data = Column(JSON)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    size = Column(Integer, nullable=False, default=0, server_default="0")
+    node_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # ``data`` is the document as of ``snapshot_version``; the JSON Patches
+    # since then, up to ``version``, are in ``mindmap_operations``
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    snapshot_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # "document": nodes and edges are in ``data``; "normalized": they are rows
+    # of mindmap_nodes and mindmap_edges and ``data`` holds everything else
+    storage = Column(String(20), nullable=False, default="document", server_default="document")
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"))
     
     project = relationship("Project", back_populates="mindmaps")
+
+    @validates("data")
+    def _sync_summary(self, key, data):
+        self.size = json_size(data)
+        self.node_count = count_nodes(data)
+        return data
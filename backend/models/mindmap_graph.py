@@ -0,0 +1,96 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, JSON, Index, UniqueConstraint, DDL, event
+from sqlalchemy.orm import validates
+from database import Base
+
+def node_coordinates(node) -> tuple:
+    """``(x, y)`` of a node given either a React Flow ``position`` or top-level ``x``/``y``."""
+    position = node.get("position") if isinstance(node.get("position"), dict) else node
+    try:
+        return float(position.get("x") or 0), float(position.get("y") or 0)
+    except (TypeError, ValueError):
+        return 0.0, 0.0
+
+class MindmapNode(Base):
+    """A node of a mindmap in normalized storage.
+
+    ``data`` is the node as the client sent it, without its ``id`` (``key``);
+    ``x`` and ``y`` are copied from it for the spatial index.
+    """
+    __tablename__ = "mindmap_nodes"
+    __table_args__ = (
+        UniqueConstraint("mindmap_id", "key", name="uq_mindmap_nodes_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    mindmap_id = Column(Integer, ForeignKey("mindmaps.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(100), nullable=False)
+    x = Column(Float, nullable=False, default=0)
+    y = Column(Float, nullable=False, default=0)
+    data = Column(JSON, nullable=False)
+
+    @validates("data")
+    def _sync_coordinates(self, key, data):
+        self.x, self.y = node_coordinates(data)
+        return data
+
+class MindmapEdge(Base):
+    """An edge of a mindmap in normalized storage, between two node keys."""
+    __tablename__ = "mindmap_edges"
+    __table_args__ = (
+        UniqueConstraint("mindmap_id", "key", name="uq_mindmap_edges_key"),
+        Index("ix_mindmap_edges_source", "mindmap_id", "source"),
+        Index("ix_mindmap_edges_target", "mindmap_id", "target"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    mindmap_id = Column(Integer, ForeignKey("mindmaps.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(100), nullable=False)
+    source = Column(String(100), nullable=False)
+    target = Column(String(100), nullable=False)
+    data = Column(JSON, nullable=False)
+
+# SQLite R-trees over node positions and edge bounding boxes. The mindmap id is
+# a third dimension, so a viewport query only visits the nodes of one map.
+# Triggers keep them in sync, including for rows removed by ON DELETE CASCADE.
+_EDGE_BOXES = """
+    INSERT OR REPLACE INTO mindmap_edge_index
+    SELECT e.id, min(s.x, t.x), max(s.x, t.x), min(s.y, t.y), max(s.y, t.y), e.mindmap_id, e.mindmap_id
+    FROM mindmap_edges e
+    JOIN mindmap_nodes s ON s.mindmap_id = e.mindmap_id AND s.key = e.source
+    JOIN mindmap_nodes t ON t.mindmap_id = e.mindmap_id AND t.key = e.target
+"""
+SPATIAL_INDEX_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS mindmap_node_index USING rtree(id, min_x, max_x, min_y, max_y, min_m, max_m)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS mindmap_edge_index USING rtree(id, min_x, max_x, min_y, max_y, min_m, max_m)",
+    f"""CREATE TRIGGER IF NOT EXISTS mindmap_nodes_ai AFTER INSERT ON mindmap_nodes BEGIN
+        INSERT INTO mindmap_node_index VALUES (new.id, new.x, new.x, new.y, new.y, new.mindmap_id, new.mindmap_id);
+        {_EDGE_BOXES} WHERE e.mindmap_id = new.mindmap_id AND (e.source = new.key OR e.target = new.key);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS mindmap_nodes_au AFTER UPDATE OF x, y ON mindmap_nodes BEGIN
+        UPDATE mindmap_node_index SET min_x = new.x, max_x = new.x, min_y = new.y, max_y = new.y WHERE id = new.id;
+        {_EDGE_BOXES} WHERE e.mindmap_id = new.mindmap_id AND (e.source = new.key OR e.target = new.key);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS mindmap_nodes_ad AFTER DELETE ON mindmap_nodes BEGIN
+        DELETE FROM mindmap_node_index WHERE id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS mindmap_edges_ai AFTER INSERT ON mindmap_edges BEGIN
+        {_EDGE_BOXES} WHERE e.id = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS mindmap_edges_au AFTER UPDATE OF source, target ON mindmap_edges BEGIN
+        DELETE FROM mindmap_edge_index WHERE id = new.id;
+        {_EDGE_BOXES} WHERE e.id = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS mindmap_edges_ad AFTER DELETE ON mindmap_edges BEGIN
+        DELETE FROM mindmap_edge_index WHERE id = old.id;
+    END""",
+]
+
+for statement in SPATIAL_INDEX_DDL:
+    # Each trigger is created with the table it is on; the R-trees (IF NOT
+    # EXISTS) with whichever table comes first, so any creation order works
+    if "VIRTUAL TABLE" in statement:
+        tables = [MindmapNode.__table__, MindmapEdge.__table__]
+    else:
+        tables = [MindmapEdge.__table__ if " ON mindmap_edges " in statement else MindmapNode.__table__]
+    for table in tables:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON, UniqueConstraint
+from datetime import datetime
+from database import Base
+
+class MindmapOperation(Base):
+    """A JSON Patch applied to a mindmap after its stored snapshot.
+
+    ``version`` is the mindmap version the patch produced; rows are deleted
+    once a snapshot at or after that version has been written.
+    """
+    __tablename__ = "mindmap_operations"
+    __table_args__ = (
+        UniqueConstraint("mindmap_id", "version", name="uq_mindmap_operations_version"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    mindmap_id = Column(Integer, ForeignKey("mindmaps.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    ops = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MindmapOperation {self.mindmap_id}@{self.version}>"
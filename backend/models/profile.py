@@ -7,7 +7,7 @@ class Profile(Base):
     __table_args__ = {'extend_existing': True}
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), unique=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True)
     full_name = Column(String, nullable=True)
     bio = Column(String, nullable=True)
     theme_preference = Column(String, default="light")
@@ -24,13 +24,18 @@ class Project(Base):
     actual_end_date = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set while a large project is purged in the background; such projects are hidden
+    deleted_at = Column(DateTime, nullable=True)
     
     # Foreign Keys
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Relationships
     owner = relationship("User", back_populates="projects")
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
-    concept_notes = relationship("ConceptNote", back_populates="project", cascade="all, delete-orphan")
-    ideas = relationship("Idea", secondary=project_ideas, back_populates="projects")
-    mindmaps = relationship("Mindmap", back_populates="project")
+    # Children are removed by ON DELETE CASCADE instead of being loaded and deleted one by one
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    concept_notes = relationship("ConceptNote", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    ideas = relationship("Idea", secondary=project_ideas, back_populates="projects", passive_deletes=True)
+    mindmaps = relationship("Mindmap", back_populates="project", passive_deletes=True)
+    # Only loaded when asked for (joinedload), so plain project listings skip the join
+    stats = relationship("ProjectStats", uselist=False, lazy="noload", passive_deletes=True)
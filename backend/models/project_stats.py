@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from datetime import datetime
+from database import Base
+
+class ProjectStats(Base):
+    """Denormalized counters of a project, maintained on every write (see services/project_stats)."""
+    __tablename__ = "project_stats"
+    __table_args__ = {'extend_existing': True}
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    tasks_todo = Column(Integer, nullable=False, default=0)
+    tasks_in_progress = Column(Integer, nullable=False, default=0)
+    tasks_done = Column(Integer, nullable=False, default=0)
+    idea_count = Column(Integer, nullable=False, default=0)
+    concept_note_count = Column(Integer, nullable=False, default=0)
+    last_activity_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def task_count(self) -> int:
+        return self.tasks_todo + self.tasks_in_progress + self.tasks_done
+
+    def __repr__(self):
+        return f"<ProjectStats {self.project_id}>"
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from datetime import datetime
+from database import Base
+
+class ReminderDelivery(Base):
+    """Claim on one reminder firing; the unique key keeps workers from sending it twice."""
+    __tablename__ = "reminder_deliveries"
+    __table_args__ = (
+        UniqueConstraint("kind", "target_id", "fire_at", name="uq_reminder_delivery"),
+        {'extend_existing': True}
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)  # task, habit
+    target_id = Column(Integer, nullable=False)
+    fire_at = Column(DateTime, nullable=False)
+    delivered_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<ReminderDelivery {self.kind}:{self.target_id} at {self.fire_at}>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from datetime import datetime
+from database import Base
+
+class TagUsage(Base):
+    """How many of a user's items carry a tag, and when it was last applied."""
+    __tablename__ = "tag_usage"
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TagUsage {self.user_id}:{self.tag_id} x{self.count}>"
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from database import Base
+
+# Entities that can carry tags, keyed by the value stored in ``entity_type``
+TAGGABLE_TYPES = ("task", "idea", "journal", "concept")
+
+class Tagging(Base):
+    """A tag applied to one task, idea, journal entry or concept note."""
+    __tablename__ = "taggings"
+    __table_args__ = (
+        UniqueConstraint("tag_id", "entity_type", "entity_id", name="uq_taggings_tag_entity"),
+        Index("ix_taggings_entity", "entity_type", "entity_id"),
+        Index("ix_taggings_user_tag", "user_id", "tag_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), nullable=False)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Tagging {self.tag_id} on {self.entity_type} {self.entity_id}>"
+
+class TagPosting(Base):
+    """Ids of a user's entities of one type carrying a tag, as a zlib-compressed bitset."""
+    __tablename__ = "tag_postings"
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    entity_type = Column(String(20), primary_key=True)
+    bitmap = Column(LargeBinary, nullable=False)
+    cardinality = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TagPosting {self.user_id}:{self.tag_id}:{self.entity_type} x{self.cardinality}>"
+
+def tags_relationship(entity_type: str, model: str):
+    """Read-only ``Tag`` collection of a taggable model; written through ``services.tagging``."""
+    return relationship(
+        "Tag",
+        secondary="taggings",
+        primaryjoin=f"and_({model}.id == foreign(Tagging.entity_id), Tagging.entity_type == '{entity_type}')",
+        secondaryjoin="Tag.id == foreign(Tagging.tag_id)",
+        viewonly=True,
+        lazy="selectin",
+        order_by="Tag.name",
+    )
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index, Float
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 import enum
 from database import Base
+from .tagging import tags_relationship
 
 class TaskStatus(str, enum.Enum):
     TODO = "todo"
@@ -14,23 +15,45 @@ class TaskPriority(str, enum.Enum):
     MEDIUM = "medium"
     HIGH = "high"
 
+# Numeric order of priorities; the enum itself sorts by name
+PRIORITY_RANKS = {
+    TaskPriority.LOW: 0,
+    TaskPriority.MEDIUM: 1,
+    TaskPriority.HIGH: 2,
+}
+
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Serves status/due-date range scans such as the agenda buckets
+        Index("ix_tasks_user_status_due_rank", "user_id", "status", "due_date", "priority_rank"),
+        # Cross-user due date range scan used to load reminders
+        Index("ix_tasks_due_date", "due_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
     description = Column(Text)
     status = Column(Enum(TaskStatus), default=TaskStatus.TODO)
     priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM)
+    priority_rank = Column(Integer, nullable=False, default=PRIORITY_RANKS[TaskPriority.MEDIUM], server_default="1")
     due_date = Column(DateTime, nullable=True)
+    estimated_hours = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
     
     # Foreign Keys
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="tasks")
     project = relationship("Project", back_populates="tasks")
+    tags = tags_relationship("task", "Task")
+
+    @validates("priority")
+    def _sync_priority_rank(self, key, priority):
+        if priority is not None:
+            self.priority_rank = PRIORITY_RANKS[TaskPriority(priority)]
+        return priority
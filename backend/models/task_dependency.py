@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime
+from database import Base
+
+class TaskDependency(Base):
+    """``task_id`` cannot start before ``depends_on_id`` is finished."""
+    __tablename__ = "task_dependencies"
+    __table_args__ = (
+        UniqueConstraint("task_id", "depends_on_id", name="uq_task_dependency"),
+        {'extend_existing': True}
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    depends_on_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Both tasks belong to this project; lets a project's graph load in one query
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TaskDependency {self.depends_on_id} -> {self.task_id}>"
+
+class TaskSchedule(Base):
+    """Critical-path schedule of a task, in hours from the project start."""
+    __tablename__ = "task_schedules"
+    __table_args__ = {'extend_existing': True}
+
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    earliest_start = Column(Float, nullable=False)
+    earliest_finish = Column(Float, nullable=False)
+    latest_start = Column(Float, nullable=False)
+    latest_finish = Column(Float, nullable=False)
+    slack = Column(Float, nullable=False)
+    is_critical = Column(Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"<TaskSchedule {self.task_id}>"
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum, UniqueConstraint
+from datetime import datetime
+from database import Base
+from .task import TaskStatus
+
+class TaskRecurrence(Base):
+    """RRULE attached to a task; occurrences are expanded at query time, never stored."""
+    __tablename__ = "task_recurrences"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, unique=True)
+    rule = Column(String(500), nullable=False)
+    dtstart = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TaskRecurrence {self.task_id} {self.rule}>"
+
+class TaskOccurrenceException(Base):
+    """A single occurrence that was skipped, completed, moved or otherwise changed."""
+    __tablename__ = "task_occurrence_exceptions"
+    __table_args__ = (
+        UniqueConstraint("task_id", "occurrence_date", name="uq_task_occurrence"),
+        {'extend_existing': True}
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Date the rule generated; identifies the occurrence even after it is moved
+    occurrence_date = Column(DateTime, nullable=False)
+    skipped = Column(Boolean, nullable=False, default=False)
+    status = Column(Enum(TaskStatus), nullable=True)
+    due_date = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TaskOccurrenceException {self.task_id} {self.occurrence_date}>"
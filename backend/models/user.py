@@ -6,7 +6,9 @@ import datetime
 
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {'extend_existing': True}
+    # AUTOINCREMENT: ids of deleted accounts are never handed out again, so
+    # their leftover access tokens cannot pass as a new user's
+    __table_args__ = {'extend_existing': True, 'sqlite_autoincrement': True}
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True)
@@ -16,23 +18,26 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_login = Column(DateTime(timezone=True), nullable=True)
+    # Bumped to invalidate every access token issued before it
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
-    tasks = relationship("Task", back_populates="user")
-    password_resets = relationship("PasswordReset", back_populates="user")
-    profile = relationship("Profile", back_populates="user", uselist=False)
-    refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
+    # Owned rows are removed by ON DELETE CASCADE (or services/purge for large accounts)
+    tasks = relationship("Task", back_populates="user", passive_deletes=True)
+    password_resets = relationship("PasswordReset", back_populates="user", passive_deletes=True)
+    profile = relationship("Profile", back_populates="user", uselist=False, passive_deletes=True)
+    refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     
     # New relationships for personal data tracking
-    activities = relationship("Activity", back_populates="user", cascade="all, delete-orphan")
-    journal_entries = relationship("JournalEntry", back_populates="user", cascade="all, delete-orphan")
+    activities = relationship("Activity", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    journal_entries = relationship("JournalEntry", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     
     # New relationships for personal development
-    goals = relationship("Goal", back_populates="user", cascade="all, delete-orphan")
-    habits = relationship("Habit", back_populates="user", cascade="all, delete-orphan")
-    projects = relationship("Project", back_populates="owner")
-    ideas = relationship("Idea", back_populates="user", cascade="all, delete-orphan")
-    concept_notes = relationship("ConceptNote", back_populates="user", cascade="all, delete-orphan")
+    goals = relationship("Goal", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    habits = relationship("Habit", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    projects = relationship("Project", back_populates="owner", passive_deletes=True)
+    ideas = relationship("Idea", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    concept_notes = relationship("ConceptNote", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<User {self.username}>"
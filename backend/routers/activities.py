@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import desc
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta
 
 from database import get_db
 from models.activity import Activity, JournalEntry
@@ -10,11 +10,18 @@ from models.user import User
 from schemas.activity import (
     Activity as ActivitySchema,
     ActivityCreate,
+    ActivitySummary,
     JournalEntry as JournalEntrySchema,
+    JournalEntrySummary,
     JournalEntryCreate,
-    JournalEntryUpdate
+    JournalEntryUpdate,
+    JournalStatsBucket
 )
 from auth.utils import get_current_user
+from services import journal_stats
+from services.tag_index import tag_suggester
+from services.tagging import bitmap_ids, match, set_tags, untag
+from utils.summary import ListView, list_response
 
 router = APIRouter(tags=["activities"])
 
@@ -31,12 +38,13 @@ async def create_activity(
     db.refresh(db_activity)
     return db_activity
 
-@router.get("/activities", response_model=List[ActivitySchema])
+@router.get("/activities", response_model=list_response(ActivitySchema, ActivitySummary))
 async def get_activities(
     type: Optional[str] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     limit: int = Query(50, le=100),
+    view: ListView = "full",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -49,7 +57,10 @@ async def get_activities(
     if to_date:
         query = query.filter(Activity.timestamp <= to_date)
     
-    return query.order_by(desc(Activity.timestamp)).limit(limit).all()
+    query = query.order_by(desc(Activity.timestamp)).limit(limit)
+    if view == "summary":
+        return [ActivitySummary.model_validate(activity) for activity in query.options(defer(Activity.data))]
+    return query.all()
 
 # Journal endpoints
 @router.post("/journal", response_model=JournalEntrySchema)
@@ -58,19 +69,24 @@ async def create_journal_entry(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_entry = JournalEntry(**entry.dict(), user_id=current_user.id)
+    db_entry = JournalEntry(**entry.dict(exclude={"tags"}), user_id=current_user.id)
     db.add(db_entry)
+    db.flush()
+    journal_stats.entry_changed(db, None, journal_stats.contribution(db_entry))
+    tag_deltas = set_tags(db, current_user.id, "journal", db_entry.id, entry.tags)
     db.commit()
+    tag_suggester.apply(current_user.id, tag_deltas, datetime.utcnow())
     db.refresh(db_entry)
     return db_entry
 
-@router.get("/journal", response_model=List[JournalEntrySchema])
+@router.get("/journal", response_model=list_response(JournalEntrySchema, JournalEntrySummary))
 async def get_journal_entries(
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     mood: Optional[str] = None,
     tags: Optional[List[str]] = Query(None),
     limit: int = Query(50, le=100),
+    view: ListView = "full",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -83,10 +99,30 @@ async def get_journal_entries(
     if mood:
         query = query.filter(JournalEntry.mood == mood)
     if tags:
-        # Filter entries that contain any of the specified tags
-        query = query.filter(JournalEntry.tags.contains(tags))
+        # Entries carrying any of the specified tags, resolved from the tag postings
+        query = query.filter(JournalEntry.id.in_(bitmap_ids(match(db, current_user.id, "journal", any_tags=tags))))
     
-    return query.order_by(desc(JournalEntry.created_at)).limit(limit).all()
+    query = query.order_by(desc(JournalEntry.created_at)).limit(limit)
+    if view == "summary":
+        return [JournalEntrySummary.model_validate(entry) for entry in query.options(defer(JournalEntry.content))]
+    return query.all()
+
+# Declared before /journal/{entry_id}, which would otherwise match it
+@router.get("/journal/stats", response_model=List[JournalStatsBucket])
+async def get_journal_stats(
+    bucket: Literal["day", "week", "month"] = "day",
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Entry count, words, mean sentiment and mood counts per day, week or
+    month; the last year by default."""
+    to_date = to_date or datetime.utcnow().date()
+    from_date = from_date or to_date - timedelta(days=365)
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="from_date must not be after to_date")
+    return journal_stats.timeline(db, current_user.id, bucket, from_date, to_date)
 
 @router.get("/journal/{entry_id}", response_model=JournalEntrySchema)
 async def get_journal_entry(
@@ -119,10 +155,16 @@ async def update_journal_entry(
         raise HTTPException(status_code=404, detail="Journal entry not found")
     
     update_data = entry_update.dict(exclude_unset=True)
+    tags = update_data.pop("tags", None)
+    before = journal_stats.contribution(db_entry)
     for field, value in update_data.items():
         setattr(db_entry, field, value)
+    db.flush()
+    journal_stats.entry_changed(db, before, journal_stats.contribution(db_entry))
+    tag_deltas = set_tags(db, current_user.id, "journal", db_entry.id, tags) if tags is not None else {}
     
     db.commit()
+    tag_suggester.apply(current_user.id, tag_deltas, datetime.utcnow())
     db.refresh(db_entry)
     return db_entry
 
@@ -140,6 +182,11 @@ async def delete_journal_entry(
     if not entry:
         raise HTTPException(status_code=404, detail="Journal entry not found")
     
+    before = journal_stats.contribution(entry)
+    untag(db, "journal", [entry_id])
     db.delete(entry)
+    db.flush()
+    journal_stats.entry_changed(db, before, None)
     db.commit()
+    tag_suggester.forget(current_user.id)
     return {"message": "Journal entry deleted successfully"}
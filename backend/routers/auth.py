@@ -1,5 +1,5 @@
 from datetime import timedelta, datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 import secrets
@@ -17,6 +17,7 @@ load_dotenv()
 from database import get_db
 from models.user import User
 from models.refresh_token import RefreshToken
+from models.password_reset import PasswordReset
 from schemas.auth import (
     Token,
     UserCreate,
@@ -36,6 +37,8 @@ from auth.utils import (
     create_refresh_token,
     store_refresh_token
 )
+from auth.revocation import revoke_user_tokens
+from services.purge import schedule_purge, run_purge_job
 from config import get_settings
 
 settings = get_settings()
@@ -253,10 +256,48 @@ async def logout(
             detail="Failed to logout"
         )
 
+@router.post("/logout-all")
+def logout_all(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke every refresh token and invalidate all access tokens of the current user."""
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == current_user.id,
+        RefreshToken.revoked == False
+    ).update({RefreshToken.revoked: True}, synchronize_session=False)
+    revoke_user_tokens(db, current_user)
+    return {"message": "Successfully logged out of all sessions"}
+
 @router.get("/me")
 def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
+def delete_account(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete the current user's account and all of its data.
+
+    Sign-in stops working immediately and the username and email are freed;
+    the data itself is purged in chunks in the background.
+    """
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == current_user.id,
+        RefreshToken.revoked == False
+    ).update({RefreshToken.revoked: True}, synchronize_session=False)
+    current_user.username = f"deleted-{current_user.id}-{secrets.token_hex(4)}"
+    current_user.email = None
+    current_user.hashed_password = None
+    job = schedule_purge(db, "user", current_user.id)
+    job_id = job.id
+    # Commits the changes above
+    revoke_user_tokens(db, current_user)
+    background_tasks.add_task(run_purge_job, job_id)
+    return {"message": "Account deletion scheduled", "purge_id": job_id}
+
 @router.get("/profile")
 async def get_profile(current_user: User = Depends(get_current_user)):
     """Get the profile of the currently authenticated user."""
@@ -319,5 +360,10 @@ def verify_password_reset(
     # Mark reset token as used
     reset.used_at = datetime.utcnow()
     
-    db.commit()
+    # Sessions opened with the old password must not outlive the reset
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == user.id,
+        RefreshToken.revoked == False
+    ).update({RefreshToken.revoked: True}, synchronize_session=False)
+    revoke_user_tokens(db, user)
     return {"message": "Password reset successful"}
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, defer
 from typing import List
 from datetime import datetime
 
@@ -7,7 +7,17 @@ from database import get_db
 from auth import get_current_user
 from models.user import User
 from models.concept import ConceptNote
-from schemas.concept import ConceptNoteCreate, ConceptNoteUpdate, ConceptNote as ConceptNoteSchema
+from models.concept_revision import ConceptNoteRevision
+from models.project import Project
+from services.project_stats import adjust as adjust_stats
+from services.tag_index import tag_suggester
+from services.tagging import set_tags, untag
+from services import concept_revisions
+from utils.summary import ListView, list_response
+from schemas.concept import (
+    ConceptNoteCreate, ConceptNoteUpdate, ConceptNote as ConceptNoteSchema, ConceptNoteSummary,
+    ConceptNoteRevisionSummary, ConceptNoteRevision as ConceptNoteRevisionSchema, ConceptNoteRevisionDiff
+)
 
 router = APIRouter(
     tags=["concepts"]
@@ -19,6 +29,17 @@ def create_concept_note(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    project = db.query(Project.id).filter(
+        Project.id == concept.project_id,
+        Project.owner_id == current_user.id,
+        Project.deleted_at.is_(None)
+    ).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
     db_concept = ConceptNote(
         title=concept.title,
         content=concept.content,
@@ -26,20 +47,28 @@ def create_concept_note(
         user_id=current_user.id
     )
     db.add(db_concept)
+    db.flush()
+    tag_deltas = set_tags(db, current_user.id, "concept", db_concept.id, concept.tags)
+    concept_revisions.record_revision(db, db_concept, None, current_user.id)
+    adjust_stats(db, db_concept.project_id, concept_note_count=1)
     db.commit()
+    tag_suggester.apply(current_user.id, tag_deltas, datetime.utcnow())
     db.refresh(db_concept)
     return db_concept
 
-@router.get("/project/{project_id}", response_model=List[ConceptNoteSchema])
+@router.get("/project/{project_id}", response_model=list_response(ConceptNoteSchema, ConceptNoteSummary))
 def get_project_concepts(
     project_id: int,
+    view: ListView = "full",
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    concepts = db.query(ConceptNote).filter(
+    query = db.query(ConceptNote).filter(
         ConceptNote.project_id == project_id
-    ).order_by(ConceptNote.created_at.desc()).all()
-    return concepts
+    ).order_by(ConceptNote.created_at.desc())
+    if view == "summary":
+        return [ConceptNoteSummary.model_validate(concept) for concept in query.options(defer(ConceptNote.content))]
+    return query.all()
 
 @router.get("/{concept_id}", response_model=ConceptNoteSchema)
 def get_concept_note(
@@ -75,11 +104,20 @@ def update_concept_note(
             detail="Not authorized to update this concept note"
         )
 
-    for field, value in concept_update.model_dump(exclude_unset=True).items():
+    update_data = concept_update.model_dump(exclude_unset=True)
+    tags = update_data.pop("tags", None)
+    old_title, old_content = db_concept.title, db_concept.content
+    for field, value in update_data.items():
         setattr(db_concept, field, value)
+    tag_deltas = set_tags(db, current_user.id, "concept", db_concept.id, tags) if tags is not None else {}
     
     db_concept.updated_at = datetime.utcnow()
+    if (db_concept.title, db_concept.content) != (old_title, old_content):
+        db.flush()
+        concept_revisions.record_revision(db, db_concept, old_content, current_user.id)
+    adjust_stats(db, db_concept.project_id)
     db.commit()
+    tag_suggester.apply(current_user.id, tag_deltas, datetime.utcnow())
     db.refresh(db_concept)
     return db_concept
 
@@ -102,6 +140,99 @@ def delete_concept_note(
             detail="Not authorized to delete this concept note"
         )
 
+    untag(db, "concept", [db_concept.id])
     db.delete(db_concept)
+    db.flush()
+    adjust_stats(db, db_concept.project_id, concept_note_count=-1)
     db.commit()
+    tag_suggester.forget(current_user.id)
     return None
+
+def _get_own_concept(db: Session, concept_id: int, user_id: int) -> ConceptNote:
+    concept = db.query(ConceptNote).filter(ConceptNote.id == concept_id).first()
+    if not concept:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Concept note not found"
+        )
+    if concept.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this concept note"
+        )
+    return concept
+
+def _rebuild_revision(db: Session, concept_id: int, number: int):
+    rebuilt = concept_revisions.rebuild(db, concept_id, number)
+    if rebuilt is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Revision not found"
+        )
+    return rebuilt
+
+@router.get("/{concept_id}/revisions", response_model=List[ConceptNoteRevisionSummary])
+def list_concept_revisions(
+    concept_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Revisions of a note, newest first, without their content."""
+    _get_own_concept(db, concept_id, current_user.id)
+    return db.query(ConceptNoteRevision).filter(
+        ConceptNoteRevision.concept_id == concept_id
+    ).order_by(ConceptNoteRevision.number.desc()).offset(offset).limit(limit).all()
+
+@router.get("/{concept_id}/revisions/{number}", response_model=ConceptNoteRevisionSchema)
+def get_concept_revision(
+    concept_id: int,
+    number: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    _get_own_concept(db, concept_id, current_user.id)
+    revision, content = _rebuild_revision(db, concept_id, number)
+    return ConceptNoteRevisionSchema(
+        **ConceptNoteRevisionSummary.model_validate(revision).model_dump(),
+        content=content
+    )
+
+@router.get("/{concept_id}/revisions/{number}/diff", response_model=ConceptNoteRevisionDiff)
+def diff_concept_revision(
+    concept_id: int,
+    number: int,
+    against: int | None = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Unified diff from revision ``against`` (default: the one before) to revision ``number``."""
+    _get_own_concept(db, concept_id, current_user.id)
+    against = number - 1 if against is None else against
+    old, old_content = _rebuild_revision(db, concept_id, against)
+    new, new_content = _rebuild_revision(db, concept_id, number)
+    lines = concept_revisions.diff(
+        old.title, old_content, new.title, new_content, f"revision {against}", f"revision {number}"
+    )
+    return {"from_number": against, "to_number": number, "lines": lines}
+
+@router.post("/{concept_id}/revisions/{number}/restore", response_model=ConceptNoteSchema)
+def restore_concept_revision(
+    concept_id: int,
+    number: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Make an old revision current again; the restore is itself a new revision."""
+    db_concept = _get_own_concept(db, concept_id, current_user.id)
+    revision, content = _rebuild_revision(db, concept_id, number)
+    old_content = db_concept.content
+    db_concept.title, db_concept.content = revision.title, content
+    db_concept.updated_at = datetime.utcnow()
+    db.flush()
+    concept_revisions.record_revision(db, db_concept, old_content, current_user.id)
+    adjust_stats(db, db_concept.project_id)
+    db.commit()
+    db.refresh(db_concept)
+    return db_concept
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from typing import List, Optional
@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 from database import get_db
 from models.development import Goal, GoalProgress, Habit, HabitTracking
 from models.user import User
+from services.reminders import reminder_scheduler
 from schemas.development import (
     Goal as GoalSchema,
     GoalCreate,
@@ -20,6 +21,7 @@ from schemas.development import (
     HabitTrackingCreate
 )
 from auth.utils import get_current_user
+from utils.http_cache import collection_validator, entity_validator, conditional_response
 
 router = APIRouter(tags=["development"])
 
@@ -38,11 +40,18 @@ async def create_goal(
 
 @router.get("/goals", response_model=List[GoalSchema])
 async def get_goals(
+    request: Request,
+    response: Response,
     category: Optional[str] = None,
     status: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    etag, last_modified = collection_validator(db, Goal, Goal.user_id, current_user.id, request)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
     query = db.query(Goal).filter(Goal.user_id == current_user.id)
     
     if category:
@@ -55,9 +64,18 @@ async def get_goals(
 @router.get("/goals/{goal_id}", response_model=GoalSchema)
 async def get_goal(
     goal_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    validator = entity_validator(db, Goal, Goal.id == goal_id, Goal.user_id == current_user.id)
+    if validator is None:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    not_modified = conditional_response(request, response, *validator)
+    if not_modified is not None:
+        return not_modified
+
     goal = db.query(Goal).filter(
         Goal.id == goal_id,
         Goal.user_id == current_user.id
@@ -146,6 +164,7 @@ async def create_habit(
     db.add(db_habit)
     db.commit()
     db.refresh(db_habit)
+    reminder_scheduler.habit_changed(db_habit)
     return db_habit
 
 @router.get("/habits", response_model=List[HabitSchema])
@@ -182,6 +201,7 @@ async def update_habit(
     
     db.commit()
     db.refresh(db_habit)
+    reminder_scheduler.habit_changed(db_habit)
     return db_habit
 
 @router.post("/habits/{habit_id}/track", response_model=HabitTrackingSchema)
@@ -228,4 +248,5 @@ async def delete_habit(
     
     db.delete(habit)
     db.commit()
+    reminder_scheduler.cancel("habit", habit_id)
     return {"message": "Habit deleted successfully"}
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import datetime
 
 from database import get_db
 from models.idea import Idea, Tag
 from schemas.idea import IdeaCreate, IdeaUpdate, IdeaResponse, TagCreate, TagResponse
 from auth.utils import get_current_user
+from services.project_stats import adjust as adjust_stats
+from services.tag_index import tag_suggester
+from services.tagging import bitmap_ids, match, set_tags, untag
 
 router = APIRouter(tags=["ideas"])
 
@@ -15,25 +19,17 @@ def create_idea(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    # Create or get tags
-    tags = []
-    for tag_name in idea_data.tags:
-        tag = db.query(Tag).filter(Tag.name == tag_name).first()
-        if not tag:
-            tag = Tag(name=tag_name)
-            db.add(tag)
-        tags.append(tag)
-    
-    # Create idea
     idea = Idea(
         title=idea_data.title,
         description=idea_data.description,
         status=idea_data.status,
-        user_id=current_user.id,
-        tags=tags
+        user_id=current_user.id
     )
     db.add(idea)
+    db.flush()
+    deltas = set_tags(db, current_user.id, "idea", idea.id, idea_data.tags)
     db.commit()
+    tag_suggester.apply(current_user.id, deltas, datetime.utcnow())
     db.refresh(idea)
     return idea
 
@@ -49,7 +45,7 @@ def get_ideas(
     if status:
         query = query.filter(Idea.status == status)
     if tag:
-        query = query.join(Idea.tags).filter(Tag.name == tag)
+        query = query.filter(Idea.id.in_(bitmap_ids(match(db, current_user.id, "idea", all_tags=[tag]))))
     
     ideas = query.all()
     return ideas
@@ -69,21 +65,16 @@ def update_idea(
         raise HTTPException(status_code=404, detail="Idea not found")
     
     # Update tags if provided
+    deltas = {}
     if idea_data.tags is not None:
-        tags = []
-        for tag_name in idea_data.tags:
-            tag = db.query(Tag).filter(Tag.name == tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-            tags.append(tag)
-        idea.tags = tags
+        deltas = set_tags(db, current_user.id, "idea", idea.id, idea_data.tags)
     
     # Update other fields
     for key, value in idea_data.dict(exclude={'tags'}, exclude_unset=True).items():
         setattr(idea, key, value)
     
     db.commit()
+    tag_suggester.apply(current_user.id, deltas, datetime.utcnow())
     db.refresh(idea)
     return idea
 
@@ -100,8 +91,14 @@ def delete_idea(
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
     
+    project_ids = [project.id for project in idea.projects]
     db.delete(idea)
+    db.flush()
+    for project_id in project_ids:
+        adjust_stats(db, project_id, idea_count=-1)
+    untag(db, "idea", [idea_id])
     db.commit()
+    tag_suggester.forget(current_user.id)
     return {"message": "Idea deleted successfully"}
 
 @router.get("/tags", response_model=List[TagResponse])
@@ -1,25 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+import json
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from sqlalchemy.orm import Session, defer
+from typing import Any, Dict
+from auth.utils import get_current_principal, get_current_user
 from database import get_db
 from models.mindmap import Mindmap
-from pydantic import BaseModel
+from models.project import Project
+from models.user import User
+from schemas.mindmap import (
+    MindmapBase, MindmapCreate, MindmapResponse, MindmapSummary, MindmapPatch, MindmapPatchResult,
+    MindmapStorage, MindmapViewport
+)
+from services import mindmap_graph
+from services.mindmap_graph import NORMALIZED, StorageMismatch
+from services.json_patch import JsonPatchError, JsonPatchTestFailed
+from services.mindmap_collab import collaboration_hub
+from services.mindmap_patches import VersionConflict, apply_patch, current_document, load_documents, replace_document
+from utils.summary import ListView, list_response
 
 router = APIRouter()
 
-class MindmapBase(BaseModel):
-    title: str
-    data: dict
-
-class MindmapCreate(MindmapBase):
-    project_id: int
-
-class MindmapResponse(MindmapBase):
-    id: int
-    project_id: int
-
-    class Config:
-        from_attributes = True
+def _get_owned_mindmap(db: Session, mindmap_id: int, user_id: int) -> Mindmap:
+    mindmap = db.query(Mindmap).options(defer(Mindmap.data)).join(
+        Project, Project.id == Mindmap.project_id
+    ).filter(
+        Mindmap.id == mindmap_id,
+        Project.owner_id == user_id,
+        Project.deleted_at.is_(None)
+    ).first()
+    if not mindmap:
+        raise HTTPException(status_code=404, detail="Mindmap not found")
+    return mindmap
 
 @router.post("/", response_model=MindmapResponse)
 def create_mindmap(mindmap: MindmapCreate, db: Session = Depends(get_db)):
@@ -34,11 +47,16 @@ def get_mindmap(mindmap_id: int, db: Session = Depends(get_db)):
     mindmap = db.query(Mindmap).filter(Mindmap.id == mindmap_id).first()
     if not mindmap:
         raise HTTPException(status_code=404, detail="Mindmap not found")
+    load_documents(db, [mindmap])
     return mindmap
 
-@router.get("/projects/{project_id}/mindmaps/", response_model=List[MindmapResponse])
-def get_project_mindmaps(project_id: int, db: Session = Depends(get_db)):
-    mindmaps = db.query(Mindmap).filter(Mindmap.project_id == project_id).all()
+@router.get("/projects/{project_id}/mindmaps/", response_model=list_response(MindmapResponse, MindmapSummary))
+def get_project_mindmaps(project_id: int, view: ListView = "full", db: Session = Depends(get_db)):
+    query = db.query(Mindmap).filter(Mindmap.project_id == project_id)
+    if view == "summary":
+        return [MindmapSummary.model_validate(mindmap) for mindmap in query.options(defer(Mindmap.data))]
+    mindmaps = query.all()
+    load_documents(db, mindmaps)
     return mindmaps
 
 @router.put("/{mindmap_id}", response_model=MindmapResponse)
@@ -49,11 +67,189 @@ def update_mindmap(mindmap_id: int, mindmap: MindmapBase, db: Session = Depends(
     
     for key, value in mindmap.dict().items():
         setattr(db_mindmap, key, value)
+    if db_mindmap.storage == NORMALIZED:
+        try:
+            mindmap_graph.write_graph(db, db_mindmap, mindmap.data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    replace_document(db, db_mindmap)
     
     db.commit()
     db.refresh(db_mindmap)
     return db_mindmap
 
+@router.patch("/{mindmap_id}", response_model=MindmapPatchResult)
+def patch_mindmap(
+    mindmap_id: int,
+    patch: MindmapPatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Apply RFC 6902 operations to the mindmap at ``base_version``.
+
+    Responds 409 when the map has changed since that version (or a ``test``
+    operation fails) and 422 when an operation does not apply.
+    """
+    mindmap = _get_owned_mindmap(db, mindmap_id, current_user.id)
+    ops = [op.model_dump(by_alias=True, exclude_unset=True) for op in patch.ops]
+    try:
+        apply_patch(db, mindmap, patch.base_version, ops)
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=f"Mindmap is at version {e.version}, not {patch.base_version}")
+    except (JsonPatchTestFailed, StorageMismatch) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except JsonPatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return mindmap
+
+@router.put("/{mindmap_id}/storage", response_model=MindmapSummary)
+def set_mindmap_storage(
+    mindmap_id: int,
+    storage: MindmapStorage,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Switch between one JSON document and node/edge rows with viewport queries."""
+    mindmap = _get_owned_mindmap(db, mindmap_id, current_user.id)
+    if mindmap.storage == storage.storage:
+        return mindmap
+    try:
+        if storage.storage == NORMALIZED:
+            # Pending JSON Patches are folded in first
+            mindmap_graph.write_graph(db, mindmap, current_document(db, mindmap.id)[1])
+        else:
+            mindmap_graph.release_graph(db, mindmap)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    replace_document(db, mindmap)
+    db.commit()
+    db.refresh(mindmap)
+    return mindmap
+
+@router.get("/{mindmap_id}/viewport", response_model=MindmapViewport)
+def get_mindmap_viewport(
+    mindmap_id: int,
+    min_x: float,
+    min_y: float,
+    max_x: float,
+    max_y: float,
+    limit: int = Query(2000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    mindmap = _get_owned_mindmap(db, mindmap_id, current_user.id)
+    if min_x > max_x or min_y > max_y:
+        raise HTTPException(status_code=400, detail="The viewport minimum must not exceed its maximum")
+    try:
+        nodes, edges, truncated = mindmap_graph.viewport(db, mindmap, min_x, min_y, max_x, max_y, limit)
+    except StorageMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return MindmapViewport(version=mindmap.version, nodes=nodes, edges=edges, truncated=truncated)
+
+def _edit_graph(db: Session, mindmap_id: int, user_id: int, edit, key: str, *args):
+    mindmap = _get_owned_mindmap(db, mindmap_id, user_id)
+    try:
+        result = edit(db, mindmap, key, *args)
+    except StorageMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return result
+
+@router.put("/{mindmap_id}/nodes/{key}", response_model=Dict[str, Any])
+def put_mindmap_node(
+    mindmap_id: int,
+    key: str,
+    node: Dict[str, Any] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return _edit_graph(db, mindmap_id, current_user.id, mindmap_graph.put_node, key, node)
+
+@router.delete("/{mindmap_id}/nodes/{key}")
+def delete_mindmap_node(
+    mindmap_id: int,
+    key: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if not _edit_graph(db, mindmap_id, current_user.id, mindmap_graph.delete_node, key):
+        raise HTTPException(status_code=404, detail="Node not found")
+    return {"message": "Node deleted successfully"}
+
+@router.put("/{mindmap_id}/edges/{key}", response_model=Dict[str, Any])
+def put_mindmap_edge(
+    mindmap_id: int,
+    key: str,
+    edge: Dict[str, Any] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return _edit_graph(db, mindmap_id, current_user.id, mindmap_graph.put_edge, key, edge)
+
+@router.delete("/{mindmap_id}/edges/{key}")
+def delete_mindmap_edge(
+    mindmap_id: int,
+    key: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if not _edit_graph(db, mindmap_id, current_user.id, mindmap_graph.delete_edge, key):
+        raise HTTPException(status_code=404, detail="Edge not found")
+    return {"message": "Edge deleted successfully"}
+
+def _may_edit(db: Session, mindmap_id: int, token: str) -> bool:
+    """Whether ``token`` is valid and its user owns the mindmap's project."""
+    try:
+        principal = get_current_principal(token, db)
+    except HTTPException:
+        return False
+    return db.query(Mindmap.id).join(Project, Project.id == Mindmap.project_id).filter(
+        Mindmap.id == mindmap_id,
+        Project.owner_id == principal.id,
+        Project.deleted_at.is_(None)
+    ).first() is not None
+
+@router.websocket("/{mindmap_id}/ws")
+async def mindmap_collaboration(
+    websocket: WebSocket,
+    mindmap_id: int,
+    token: str = Query(...),
+    db: Session = Depends(get_db)
+):
+    """Live editing session; see ``services.mindmap_collab`` for the protocol.
+
+    Browsers cannot set headers on a WebSocket, so the access token comes as
+    the ``token`` query parameter.
+    """
+    try:
+        allowed = await asyncio.to_thread(_may_edit, db, mindmap_id, token)
+    finally:
+        # Not needed for the rest of the session; the room writes with its own sessions
+        await asyncio.to_thread(db.close)
+    if not allowed:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    joined = await collaboration_hub.join(mindmap_id, websocket)
+    if joined is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    room, connection = joined
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                await room.receive(connection, json.loads(text))
+            except ValueError as e:
+                # Malformed JSON or an ``InvalidMessage``; the batch is dropped
+                await connection.send({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await collaboration_hub.leave(room, connection)
+
 @router.delete("/{mindmap_id}")
 def delete_mindmap(mindmap_id: int, db: Session = Depends(get_db)):
     mindmap = db.query(Mindmap).filter(Mindmap.id == mindmap_id).first()
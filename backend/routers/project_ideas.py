@@ -10,6 +10,7 @@ from models.project import Project
 from models.idea import Idea
 from models.project_idea import project_ideas
 from schemas.idea import IdeaResponse
+from services.project_stats import adjust as adjust_stats
 
 router = APIRouter(
     prefix="/api/projects/{project_id}/ideas",
@@ -64,6 +65,7 @@ def link_idea_to_project(
         created_at=datetime.utcnow()
     )
     db.execute(stmt)
+    adjust_stats(db, project_id, idea_count=1)
     db.commit()
 
     return idea
@@ -110,6 +112,8 @@ def unlink_idea_from_project(
         project_ideas.c.idea_id == idea_id
     )
     result = db.execute(stmt)
+    if result.rowcount:
+        adjust_stats(db, project_id, idea_count=-1)
     db.commit()
 
     if result.rowcount == 0:
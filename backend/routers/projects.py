@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
+import asyncio
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, defer, joinedload, sessionmaker
+from sqlalchemy import desc, asc, func
 from typing import List, Optional, Literal
 from datetime import datetime
 
@@ -9,13 +12,25 @@ from models.project import Project, ProjectStatus
 from models.task import Task
 from models.idea import Idea
 from models.concept import ConceptNote
+from models.project_stats import ProjectStats
 from schemas.project import ProjectCreate, ProjectUpdate, Project as ProjectSchema
-from schemas.task import TaskResponse
+from schemas.task import TaskResponse, ProjectSchedule
+from models.task_dependency import TaskSchedule
+from services.task_graph import update_schedule
+from services.project_stats import adjust as adjust_stats, attach_stats
+from services.project_detail import load_project, parse_include, stream_project
+from services.purge import schedule_purge, run_purge_job
+from services.tag_index import tag_suggester
+from services.tagging import untag
 from schemas.idea import IdeaResponse
-from schemas.concept import ConceptNote as ConceptNoteSchema
-from auth.utils import get_current_user
+from schemas.concept import ConceptNote as ConceptNoteSchema, ConceptNoteSummary
+from auth.utils import get_current_user, Principal, require_scope
 from models.user import User
+from utils.http_cache import collection_validator, entity_validator, conditional_response
+from config import get_settings
+from utils.summary import ListView, list_response
 
+settings = get_settings()
 router = APIRouter()
 
 @router.post("/", response_model=ProjectSchema)
@@ -29,21 +44,41 @@ def create_project(
         owner_id=current_user.id
     )
     db.add(db_project)
+    db.flush()
+    db.add(ProjectStats(project_id=db_project.id, last_activity_at=db_project.created_at))
     db.commit()
     db.refresh(db_project)
     return db_project
 
 @router.get("/", response_model=List[ProjectSchema])
 def get_projects(
+    request: Request,
+    response: Response,
     status: Optional[ProjectStatus] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     sort_by: Optional[Literal["created_at", "updated_at", "title", "status"]] = None,
     sort_order: Optional[Literal["asc", "desc"]] = "desc",
+    with_stats: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Project).filter(Project.owner_id == current_user.id)
+    """List projects; ``with_stats=true`` adds task/idea/note counters to each one."""
+    stats_modified = None
+    if with_stats:
+        stats_modified = db.query(func.max(ProjectStats.last_activity_at)).join(
+            Project, Project.id == ProjectStats.project_id
+        ).filter(Project.owner_id == current_user.id, Project.deleted_at.is_(None)).scalar()
+    etag, last_modified = collection_validator(
+        db, Project, Project.owner_id, current_user.id, request, related_modified=stats_modified
+    )
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    query = db.query(Project).filter(Project.owner_id == current_user.id, Project.deleted_at.is_(None))
+    if with_stats:
+        query = query.options(joinedload(Project.stats))
     
     if status:
         query = query.filter(Project.status == status)
@@ -53,17 +88,32 @@ def get_projects(
         if hasattr(Project, sort_by):
             query = query.order_by(order_func(getattr(Project, sort_by)))
     
-    return query.offset(skip).limit(limit).all()
+    projects = query.offset(skip).limit(limit).all()
+    if with_stats:
+        attach_stats(db, projects)
+    return projects
 
 @router.get("/{project_id}", response_model=ProjectSchema)
 def get_project(
     project_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    validator = entity_validator(
+        db, Project, Project.id == project_id, Project.owner_id == current_user.id, Project.deleted_at.is_(None)
+    )
+    if validator is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    not_modified = conditional_response(request, response, *validator)
+    if not_modified is not None:
+        return not_modified
+
     project = db.query(Project).filter(
         Project.id == project_id,
-        Project.owner_id == current_user.id
+        Project.owner_id == current_user.id,
+        Project.deleted_at.is_(None)
     ).first()
     
     if not project:
@@ -71,6 +121,31 @@ def get_project(
     
     return project
 
+@router.get("/{project_id}/full")
+async def get_project_full(
+    project_id: int,
+    include: str = "tasks,ideas,concepts,mindmaps",
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("read"))
+):
+    """The project with the requested sections (newest ``limit`` rows of each), in one streamed response.
+
+    Sections are queried concurrently on separate connections and written as
+    they complete; each carries ``items`` and ``has_more``.
+    """
+    try:
+        sections = parse_include(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    project = await asyncio.to_thread(load_project, db, project_id, current_user.id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    # Sessions on the request's engine, so overrides of get_db apply to the sections too
+    session_factory = sessionmaker(bind=db.get_bind())
+    return StreamingResponse(stream_project(project, sections, limit, session_factory), media_type="application/json")
+
 @router.get("/{project_id}/tasks", response_model=List[TaskResponse])
 def get_project_tasks(
     project_id: int,
@@ -91,6 +166,33 @@ def get_project_tasks(
     
     return tasks
 
+@router.get("/{project_id}/schedule", response_model=ProjectSchedule)
+def get_project_schedule(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Earliest/latest start of every task and the critical path, in hours from the project start."""
+    project = db.query(Project).filter(
+        Project.id == project_id,
+        Project.owner_id == current_user.id
+    ).first()
+    
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    schedules = db.query(TaskSchedule).filter(
+        TaskSchedule.project_id == project_id
+    ).order_by(TaskSchedule.earliest_start, TaskSchedule.task_id).all()
+    
+    return {
+        "project_id": project.id,
+        "start_date": project.start_date or project.created_at,
+        "duration_hours": max((s.earliest_finish for s in schedules), default=0.0),
+        "critical_path": [s.task_id for s in schedules if s.is_critical],
+        "tasks": schedules
+    }
+
 @router.get("/{project_id}/ideas", response_model=List[IdeaResponse])
 def get_project_ideas(
     project_id: int,
@@ -107,9 +209,10 @@ def get_project_ideas(
     
     return project.ideas
 
-@router.get("/{project_id}/concepts", response_model=List[ConceptNoteSchema])
+@router.get("/{project_id}/concepts", response_model=list_response(ConceptNoteSchema, ConceptNoteSummary))
 def get_project_concept_notes(
     project_id: int,
+    view: ListView = "full",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -121,11 +224,14 @@ def get_project_concept_notes(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    concepts = db.query(ConceptNote).filter(
+    query = db.query(ConceptNote).filter(
         ConceptNote.project_id == project_id
-    ).order_by(ConceptNote.created_at.desc()).all()
+    ).order_by(ConceptNote.created_at.desc())
     
-    return concepts
+    if view == "summary":
+        # The note bodies are not read at all, only their stored excerpts
+        return [ConceptNoteSummary.model_validate(concept) for concept in query.options(defer(ConceptNote.content))]
+    return query.all()
 
 @router.post("/{project_id}/ideas/{idea_id}")
 def link_idea_to_project(
@@ -152,6 +258,8 @@ def link_idea_to_project(
     
     if idea not in project.ideas:
         project.ideas.append(idea)
+        db.flush()
+        adjust_stats(db, project_id, idea_count=1)
         db.commit()
     
     return {"status": "success"}
@@ -181,6 +289,8 @@ def unlink_idea_from_project(
     
     if idea in project.ideas:
         project.ideas.remove(idea)
+        db.flush()
+        adjust_stats(db, project_id, idea_count=-1)
         db.commit()
     
     return {"status": "success"}
@@ -200,9 +310,17 @@ def update_project(
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
     
+    old_start_date = db_project.start_date
     for field, value in project_update.dict(exclude_unset=True).items():
         setattr(db_project, field, value)
     
+    if db_project.start_date != old_start_date:
+        # Due dates are scheduled relative to the start date
+        due = [task_id for task_id, in db.query(Task.id).filter(Task.project_id == project_id, Task.due_date.isnot(None))]
+        if due:
+            update_schedule(db, project_id, backward_seeds=due)
+    
+    adjust_stats(db, project_id)
     db.commit()
     db.refresh(db_project)
     return db_project
@@ -210,17 +328,46 @@ def update_project(
 @router.delete("/{project_id}")
 def delete_project(
     project_id: int,
+    response: Response,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """Delete a project and everything in it.
+
+    Small projects go in one statement through ``ON DELETE CASCADE``; larger
+    ones are hidden at once and purged in chunks in the background (202).
+    """
     db_project = db.query(Project).filter(
         Project.id == project_id,
-        Project.owner_id == current_user.id
+        Project.owner_id == current_user.id,
+        Project.deleted_at.is_(None)
     ).first()
     
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
     
+    # Bounded counts: only whether the limit is exceeded matters
+    limit = settings.PURGE_SYNC_MAX_ROWS
+    size = sum(
+        db.query(column).filter(column == project_id).limit(limit + 1).count()
+        for column in (Task.project_id, ConceptNote.project_id)
+    )
+    if size > limit:
+        db_project.deleted_at = datetime.utcnow()
+        job = schedule_purge(db, "project", project_id)
+        db.commit()
+        background_tasks.add_task(run_purge_job, job.id)
+        response.status_code = 202
+        return {"message": "Project deletion scheduled", "purge_id": job.id}
+    
+    # The cascade removes the rows but not their taggings, whose ids could be reused
+    users = set()
+    for entity_type, model in (("task", Task), ("concept", ConceptNote)):
+        ids = [entity_id for entity_id, in db.query(model.id).filter(model.project_id == project_id)]
+        users |= untag(db, entity_type, ids)
     db.delete(db_project)
     db.commit()
+    for user_id in users:
+        tag_suggester.forget(user_id)
     return {"message": "Project deleted successfully"}
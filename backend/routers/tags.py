@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+
+from database import get_db
+from schemas.idea import TagSuggestion, TaggedItems
+from auth.utils import get_current_user
+from services.tag_index import tag_suggester
+from services.tagging import search
+
+router = APIRouter(tags=["tags"])
+
+@router.get("/suggest", response_model=List[TagSuggestion])
+def suggest_tags(
+    q: str = "",
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """The current user's tags starting with ``q``, most used and most recently used first."""
+    return tag_suggester.suggest(db, current_user.id, q, limit)
+
+@router.get("/search", response_model=TaggedItems)
+def search_tagged(
+    type: Literal["task", "idea", "journal", "concept"],
+    all_tags: Optional[List[str]] = Query(None, alias="all"),
+    any_tags: Optional[List[str]] = Query(None, alias="any"),
+    not_tags: Optional[List[str]] = Query(None, alias="not"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Ids of the current user's items of ``type`` carrying every ``all`` tag,
+    at least one ``any`` tag and no ``not`` tag, newest first."""
+    ids, total = search(db, current_user.id, type, all_tags or (), any_tags or (), not_tags or (), limit)
+    return {"entity_type": type, "ids": ids, "total": total}
@@ -1,50 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
+from sqlalchemy import and_, or_, desc, asc, func, exists
 from typing import List, Optional
 from datetime import datetime, timedelta
+from collections import defaultdict
 
 from database import get_db
-from models.task import Task
-from models.user import User
-from schemas.task import TaskCreate, TaskUpdate, TaskResponse
-from auth.utils import get_current_user
+from models.task import Task, TaskStatus, PRIORITY_RANKS
+from models.project import Project
+from schemas.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskBulkRequest, TaskBulkResult, TaskAgenda,
+    TaskDependencyCreate, TaskDependencyResponse,
+    TaskRecurrenceSet, TaskRecurrenceResponse, TaskOccurrenceUpdate
+)
+from auth.utils import Principal, require_scope
+from models.task_dependency import TaskDependency
+from models.task_recurrence import TaskRecurrence, TaskOccurrenceException
+from services.task_graph import TaskGraph, update_schedule, detach_tasks, reschedule
+from services.recurrence import expand_occurrences, delete_recurrences, parse_rule, is_occurrence
+from services.reminders import reminder_scheduler
+from services import project_stats
+from services.tag_index import tag_suggester
+from services.tagging import set_tags, untag
+from config import get_settings
+from utils.http_cache import collection_validator, entity_validator, conditional_response
+
+settings = get_settings()
 
 router = APIRouter(
     tags=["tasks"]
 )
 
-@router.post("/", response_model=TaskResponse)
-def create_task(
-    task: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    db_task = Task(**task.dict(), user_id=current_user.id)
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
-    return db_task
-
-@router.get("/", response_model=List[TaskResponse])
-async def get_tasks(
-    status: Optional[str] = Query(None, enum=["todo", "in_progress", "done"]),
-    priority: Optional[str] = Query(None, enum=["low", "medium", "high"]),
+def build_task_query(
+    db: Session,
+    user_id: int,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    project_id: Optional[int] = None,
     due_date_from: Optional[datetime] = None,
     due_date_to: Optional[datetime] = None,
     search: Optional[str] = None,
-    sort_by: Optional[str] = Query(None, enum=["due_date", "priority", "status", "created_at"]),
-    sort_order: Optional[str] = Query("asc", enum=["asc", "desc"]),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
+    recurring: Optional[bool] = None
 ):
-    query = db.query(Task).filter(Task.user_id == current_user.id)
+    """Build the filtered and sorted task query used by the list endpoint.
+
+    ``recurring`` restricts the result to tasks with (True) or without
+    (False) a recurrence rule.
+    """
+    query = db.query(Task).filter(Task.user_id == user_id)
+    if recurring is not None:
+        has_rule = exists().where(TaskRecurrence.task_id == Task.id)
+        query = query.filter(has_rule if recurring else ~has_rule)
 
     # Apply filters
     if status:
         query = query.filter(Task.status == status)
     if priority:
         query = query.filter(Task.priority == priority)
+    if project_id is not None:
+        query = query.filter(Task.project_id == project_id)
     if due_date_from:
         query = query.filter(Task.due_date >= due_date_from)
     if due_date_to:
@@ -58,7 +74,8 @@ async def get_tasks(
 
     # Apply sorting
     if sort_by:
-        sort_column = getattr(Task, sort_by)
+        # Priority sorts by its numeric rank rather than the enum name
+        sort_column = Task.priority_rank if sort_by == "priority" else getattr(Task, sort_by)
         if sort_order == "desc":
             query = query.order_by(desc(sort_column))
         else:
@@ -67,14 +84,261 @@ async def get_tasks(
         # Default sorting by created_at desc
         query = query.order_by(desc(Task.created_at))
 
-    return query.all()
+    return query
+
+def _task_field(task, field):
+    return task[field] if isinstance(task, dict) else getattr(task, field)
+
+def sort_tasks(tasks: list, sort_by: Optional[str] = None, sort_order: Optional[str] = "asc") -> list:
+    """Sort ORM tasks and expanded occurrences together, like ``build_task_query`` orders rows."""
+    if not sort_by:
+        return sorted(tasks, key=lambda t: _task_field(t, "created_at"), reverse=True)
+    field = "priority_rank" if sort_by == "priority" else sort_by
+
+    def key(task):
+        value = PRIORITY_RANKS[_task_field(task, "priority")] if field == "priority_rank" else _task_field(task, field)
+        if isinstance(value, TaskStatus):
+            value = value.name
+        # NULLs first, as SQLite sorts them
+        return (0, 0) if value is None else (1, value)
+    return sorted(tasks, key=key, reverse=sort_order == "desc")
+
+def _recurring_occurrences(
+    db: Session,
+    user_id: int,
+    start: datetime,
+    end: datetime,
+    statuses: Optional[List[TaskStatus]] = None,
+    **filters
+) -> List[dict]:
+    masters = build_task_query(db, user_id, recurring=True, **filters).order_by(None).all()
+    occurrences = expand_occurrences(db, masters, start, end)
+    if statuses is not None:
+        occurrences = [o for o in occurrences if o["status"] in statuses]
+    return occurrences
+
+def _check_project(db: Session, project_id: Optional[int], user_id: int) -> None:
+    """404 unless ``project_id`` is empty or one of the user's live projects."""
+    if project_id is None:
+        return
+    owns_project = db.query(Project.id).filter(
+        Project.id == project_id,
+        Project.owner_id == user_id,
+        Project.deleted_at.is_(None)
+    ).first()
+    if owns_project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+@router.post("/", response_model=TaskResponse)
+def create_task(
+    task: TaskCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("write"))
+):
+    _check_project(db, task.project_id, current_user.id)
+    db_task = Task(**task.dict(exclude={"tags"}), user_id=current_user.id)
+    db.add(db_task)
+    db.flush()
+    tag_deltas = set_tags(db, current_user.id, "task", db_task.id, task.tags)
+    if db_task.project_id is not None:
+        update_schedule(db, db_task.project_id, [db_task.id], [db_task.id])
+        project_stats.task_changed(db, None, None, db_task.project_id, db_task.status)
+    db.commit()
+    tag_suggester.apply(current_user.id, tag_deltas, datetime.utcnow())
+    db.refresh(db_task)
+    reminder_scheduler.task_changed(db_task)
+    return db_task
+
+@router.get("/", response_model=List[TaskResponse])
+async def get_tasks(
+    request: Request,
+    response: Response,
+    status: Optional[str] = Query(None, enum=["todo", "in_progress", "done"]),
+    priority: Optional[str] = Query(None, enum=["low", "medium", "high"]),
+    due_date_from: Optional[datetime] = None,
+    due_date_to: Optional[datetime] = None,
+    search: Optional[str] = None,
+    sort_by: Optional[str] = Query(None, enum=["due_date", "priority", "status", "created_at"]),
+    sort_order: Optional[str] = Query("asc", enum=["asc", "desc"]),
+    current_user: Principal = Depends(require_scope("read")),
+    db: Session = Depends(get_db)
+):
+    etag, last_modified = collection_validator(db, Task, Task.user_id, current_user.id, request)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    # With a full due date window, recurring tasks are listed as their
+    # occurrences inside the window instead of as the series itself
+    window = due_date_from is not None and due_date_to is not None
+    query = build_task_query(
+        db,
+        current_user.id,
+        status=status,
+        priority=priority,
+        due_date_from=due_date_from,
+        due_date_to=due_date_to,
+        search=search,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        recurring=False if window else None
+    )
+    tasks = query.all()
+    if not window:
+        return tasks
+
+    occurrences = _recurring_occurrences(
+        db,
+        current_user.id,
+        due_date_from,
+        due_date_to,
+        statuses=[TaskStatus(status)] if status else None,
+        priority=priority,
+        search=search
+    )
+    if not occurrences:
+        return tasks
+    return sort_tasks(tasks + occurrences, sort_by, sort_order)
+
+@router.post("/bulk", response_model=TaskBulkResult)
+def bulk_tasks(
+    bulk: TaskBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("write"))
+):
+    """Update or delete many tasks, selected by ids or by a filter, in one statement."""
+    if (bulk.ids is None) == (bulk.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+
+    if bulk.filter is not None:
+        criteria = bulk.filter.dict()
+        # An empty filter would select every task of the user
+        if not any(value not in (None, "") for value in criteria.values()):
+            raise HTTPException(status_code=400, detail="Filter needs at least one criterion")
+        query = build_task_query(db, current_user.id, **criteria).order_by(None)
+    else:
+        query = db.query(Task).filter(Task.user_id == current_user.id, Task.id.in_(bulk.ids))
+
+    # Projects whose dependency schedule has to be rebuilt afterwards
+    selected = query.with_entities(Task.id, Task.project_id).all()
+    touched_projects = {project_id for _, project_id in selected if project_id is not None}
+
+    if bulk.action == "delete":
+        detached = detach_tasks(db, [task_id for task_id, _ in selected])
+        delete_recurrences(db, [task_id for task_id, _ in selected])
+        untag(db, "task", [task_id for task_id, _ in selected])
+        affected = query.delete(synchronize_session=False)
+        for project_id in touched_projects:
+            reschedule(db, project_id, detached.get(project_id))
+        project_stats.recount(db, touched_projects, activity_at=datetime.utcnow())
+        db.commit()
+        tag_suggester.forget(current_user.id)
+        reminder_scheduler.tasks_removed(task_id for task_id, _ in selected)
+        return {"action": bulk.action, "affected": affected}
+
+    values = bulk.changes.dict(exclude_unset=True) if bulk.changes else {}
+    if not values:
+        raise HTTPException(status_code=400, detail="No changes provided")
+    if None in (values.get("status", ""), values.get("priority", "")):
+        raise HTTPException(status_code=400, detail="status and priority cannot be null")
+    _check_project(db, values.get("project_id"), current_user.id)
+
+    updates = {getattr(Task, field): value for field, value in values.items()}
+    if "priority" in values:
+        updates[Task.priority_rank] = PRIORITY_RANKS[values["priority"]]
+    if values.get("status") == TaskStatus.DONE:
+        # Same rule as update_task: keep the first completion time
+        updates[Task.completed_at] = func.coalesce(Task.completed_at, datetime.utcnow())
+    detached = {}
+    if "project_id" in values:
+        moved = [task_id for task_id, project_id in selected if project_id != values["project_id"]]
+        detached = detach_tasks(db, moved)
+        if values["project_id"] is not None:
+            touched_projects.add(values["project_id"])
+    affected = query.update(updates, synchronize_session=False)
+    if "project_id" in values or "due_date" in values:
+        # Each selected task is rescheduled where it ended up
+        seeds = defaultdict(set)
+        for task_id, project_id in selected:
+            seeds[values.get("project_id", project_id)].add(task_id)
+        for project_id in touched_projects:
+            reschedule(db, project_id, detached.get(project_id), seeds.get(project_id, ()))
+    project_stats.recount(db, touched_projects, activity_at=datetime.utcnow())
+    db.commit()
+    if "due_date" in values or "status" in values:
+        reminder_scheduler.refresh_tasks(db, [task_id for task_id, _ in selected])
+    return {"action": bulk.action, "affected": affected}
+
+@router.get("/agenda", response_model=TaskAgenda)
+def get_agenda(
+    days: int = Query(7, ge=1, le=90),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("read"))
+):
+    """Open tasks that are overdue, due today, or due within ``days`` days.
+
+    Each bucket is one range scan over the (user_id, status, due_date,
+    priority_rank) index, ordered by due date and then highest priority.
+    """
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
+    open_statuses = [TaskStatus.TODO, TaskStatus.IN_PROGRESS]
+
+    end = tomorrow + timedelta(days=days)
+    # Recurring tasks appear as their open occurrences; overdue ones only
+    # within the lookback window so an old daily series stays bounded
+    occurrences = _recurring_occurrences(
+        db,
+        current_user.id,
+        today - timedelta(days=settings.RECURRENCE_OVERDUE_LOOKBACK_DAYS),
+        end - timedelta(microseconds=1),
+        statuses=open_statuses
+    )
+    has_rule = exists().where(TaskRecurrence.task_id == Task.id)
+
+    def bucket(start: Optional[datetime], end: datetime):
+        query = db.query(Task).filter(
+            Task.user_id == current_user.id,
+            Task.status.in_(open_statuses),
+            Task.due_date < end,
+            ~has_rule
+        )
+        if start is not None:
+            query = query.filter(Task.due_date >= start)
+        else:
+            query = query.filter(Task.due_date.isnot(None))
+        tasks = query.order_by(asc(Task.due_date), desc(Task.priority_rank)).limit(limit).all()
+        due = [o for o in occurrences if o["due_date"] < end and (start is None or o["due_date"] >= start)]
+        if not due:
+            return tasks
+        merged = sorted(
+            tasks + due,
+            key=lambda t: (_task_field(t, "due_date"), -PRIORITY_RANKS[_task_field(t, "priority")])
+        )
+        return merged[:limit]
+
+    return {
+        "overdue": bucket(None, today),
+        "today": bucket(today, tomorrow),
+        "upcoming": bucket(tomorrow, end),
+    }
 
 @router.get("/{task_id}", response_model=TaskResponse)
 def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(require_scope("read"))
 ):
+    validator = entity_validator(db, Task, Task.id == task_id, Task.user_id == current_user.id)
+    if validator is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    not_modified = conditional_response(request, response, *validator)
+    if not_modified is not None:
+        return not_modified
+
     task = db.query(Task).filter(
         Task.id == task_id,
         Task.user_id == current_user.id
@@ -88,7 +352,7 @@ def update_task(
     task_id: int,
     task_update: TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(require_scope("write"))
 ):
     db_task = db.query(Task).filter(
         Task.id == task_id,
@@ -97,22 +361,48 @@ def update_task(
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    old_project_id, old_estimate, old_due_date = db_task.project_id, db_task.estimated_hours, db_task.due_date
+    old_status = db_task.status
     update_data = task_update.dict(exclude_unset=True)
+    tags = update_data.pop("tags", None)
+    if update_data.get("project_id") != old_project_id:
+        _check_project(db, update_data.get("project_id"), current_user.id)
     for field, value in update_data.items():
         setattr(db_task, field, value)
+    tag_deltas = set_tags(db, current_user.id, "task", db_task.id, tags) if tags is not None else {}
+    if tag_deltas:
+        # Tags live in another table; bump the task so cached copies revalidate
+        db_task.updated_at = datetime.utcnow()
     
     if task_update.status == "done" and db_task.completed_at is None:
         db_task.completed_at = datetime.utcnow()
     
+    if db_task.project_id != old_project_id:
+        # Dependencies never cross projects
+        detached = detach_tasks(db, [db_task.id])
+        if old_project_id is not None:
+            reschedule(db, old_project_id, detached.get(old_project_id))
+        if db_task.project_id is not None:
+            reschedule(db, db_task.project_id, seeds=[db_task.id])
+    elif db_task.project_id is not None:
+        if db_task.estimated_hours != old_estimate:
+            update_schedule(db, db_task.project_id, [db_task.id], [db_task.id])
+        elif db_task.due_date != old_due_date:
+            update_schedule(db, db_task.project_id, backward_seeds=[db_task.id])
+    project_stats.task_changed(db, old_project_id, old_status, db_task.project_id, db_task.status)
+    
     db.commit()
+    tag_suggester.apply(current_user.id, tag_deltas, datetime.utcnow())
     db.refresh(db_task)
+    if "due_date" in update_data or "status" in update_data or "title" in update_data:
+        reminder_scheduler.task_changed(db_task)
     return db_task
 
 @router.delete("/{task_id}")
 def delete_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(require_scope("write"))
 ):
     db_task = db.query(Task).filter(
         Task.id == task_id,
@@ -121,6 +411,200 @@ def delete_task(
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    project_id, status = db_task.project_id, db_task.status
+    detached = detach_tasks(db, [db_task.id])
+    delete_recurrences(db, [db_task.id])
+    untag(db, "task", [db_task.id])
     db.delete(db_task)
+    if project_id is not None:
+        reschedule(db, project_id, detached.get(project_id))
+        project_stats.task_changed(db, project_id, status, None, None)
     db.commit()
+    tag_suggester.forget(current_user.id)
+    reminder_scheduler.cancel("task", task_id)
     return {"message": "Task deleted successfully"}
+
+@router.get("/{task_id}/dependencies", response_model=List[TaskDependencyResponse])
+def get_task_dependencies(
+    task_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("read"))
+):
+    """Tasks that must be finished before this one can start."""
+    db_task = db.query(Task.id).filter(
+        Task.id == task_id,
+        Task.user_id == current_user.id
+    ).first()
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return db.query(TaskDependency).filter(TaskDependency.task_id == task_id).all()
+
+@router.post("/{task_id}/dependencies", response_model=TaskDependencyResponse, status_code=201)
+def add_task_dependency(
+    task_id: int,
+    dependency: TaskDependencyCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("write"))
+):
+    tasks = {
+        task.id: task for task in db.query(Task.id, Task.project_id).filter(
+            Task.id.in_([task_id, dependency.depends_on_id]),
+            Task.user_id == current_user.id
+        )
+    }
+    if task_id not in tasks or dependency.depends_on_id not in tasks:
+        raise HTTPException(status_code=404, detail="Task not found")
+    project_id = tasks[task_id].project_id
+    if project_id is None or tasks[dependency.depends_on_id].project_id != project_id:
+        raise HTTPException(status_code=400, detail="Dependencies must be between tasks of the same project")
+
+    existing = db.query(TaskDependency).filter(
+        TaskDependency.task_id == task_id,
+        TaskDependency.depends_on_id == dependency.depends_on_id
+    ).first()
+    if existing is not None:
+        return existing
+
+    edges = db.query(TaskDependency.depends_on_id, TaskDependency.task_id).filter(
+        TaskDependency.project_id == project_id
+    ).all()
+    if TaskGraph({}, edges).creates_cycle(dependency.depends_on_id, task_id):
+        raise HTTPException(status_code=409, detail="Dependency would create a cycle")
+
+    db_dependency = TaskDependency(task_id=task_id, depends_on_id=dependency.depends_on_id, project_id=project_id)
+    db.add(db_dependency)
+    update_schedule(db, project_id, [task_id], [dependency.depends_on_id])
+    db.commit()
+    db.refresh(db_dependency)
+    return db_dependency
+
+@router.delete("/{task_id}/dependencies/{depends_on_id}", status_code=204)
+def remove_task_dependency(
+    task_id: int,
+    depends_on_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("write"))
+):
+    db_dependency = db.query(TaskDependency).join(Task, Task.id == TaskDependency.task_id).filter(
+        TaskDependency.task_id == task_id,
+        TaskDependency.depends_on_id == depends_on_id,
+        Task.user_id == current_user.id
+    ).first()
+    if db_dependency is None:
+        raise HTTPException(status_code=404, detail="Dependency not found")
+    project_id = db_dependency.project_id
+    db.delete(db_dependency)
+    update_schedule(db, project_id, [task_id], [depends_on_id])
+    db.commit()
+    return Response(status_code=204)
+
+
+def _get_owned_task(db: Session, task_id: int, user_id: int) -> Task:
+    db_task = db.query(Task).filter(
+        Task.id == task_id,
+        Task.user_id == user_id
+    ).first()
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return db_task
+
+@router.get("/{task_id}/recurrence", response_model=TaskRecurrenceResponse)
+def get_task_recurrence(
+    task_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("read"))
+):
+    _get_owned_task(db, task_id, current_user.id)
+    recurrence = db.query(TaskRecurrence).filter(TaskRecurrence.task_id == task_id).first()
+    if recurrence is None:
+        raise HTTPException(status_code=404, detail="Recurrence not found")
+    return recurrence
+
+@router.put("/{task_id}/recurrence", response_model=TaskRecurrenceResponse)
+def set_task_recurrence(
+    task_id: int,
+    recurrence: TaskRecurrenceSet,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("write"))
+):
+    """Make a task repeat according to an RRULE, e.g. ``FREQ=WEEKLY;BYDAY=MO,TH``."""
+    db_task = _get_owned_task(db, task_id, current_user.id)
+    dtstart = recurrence.dtstart or db_task.due_date
+    if dtstart is None:
+        raise HTTPException(status_code=400, detail="dtstart is required when the task has no due date")
+    dtstart = dtstart.replace(tzinfo=None)
+    try:
+        parse_rule(recurrence.rule, dtstart)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid recurrence rule: {e}")
+
+    db_recurrence = db.query(TaskRecurrence).filter(TaskRecurrence.task_id == task_id).first()
+    if db_recurrence is None:
+        db_recurrence = TaskRecurrence(task_id=task_id)
+        db.add(db_recurrence)
+    elif (db_recurrence.rule, db_recurrence.dtstart) != (recurrence.rule, dtstart):
+        # Exceptions refer to dates of the old rule
+        db.query(TaskOccurrenceException).filter(
+            TaskOccurrenceException.task_id == task_id
+        ).delete(synchronize_session=False)
+    db_recurrence.rule = recurrence.rule
+    db_recurrence.dtstart = dtstart
+    # Bump the task so cached task lists revalidate
+    db_task.updated_at = datetime.utcnow()
+    db.commit()
+    db.refresh(db_recurrence)
+    return db_recurrence
+
+@router.delete("/{task_id}/recurrence", status_code=204)
+def delete_task_recurrence(
+    task_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("write"))
+):
+    db_task = _get_owned_task(db, task_id, current_user.id)
+    delete_recurrences(db, [task_id])
+    db_task.updated_at = datetime.utcnow()
+    db.commit()
+    return Response(status_code=204)
+
+@router.put("/{task_id}/occurrences/{occurrence_date}", response_model=TaskResponse)
+def update_task_occurrence(
+    task_id: int,
+    occurrence_date: datetime,
+    occurrence_update: TaskOccurrenceUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_scope("write"))
+):
+    """Complete, skip or move a single occurrence of a recurring task."""
+    db_task = _get_owned_task(db, task_id, current_user.id)
+    recurrence = db.query(TaskRecurrence).filter(TaskRecurrence.task_id == task_id).first()
+    if recurrence is None:
+        raise HTTPException(status_code=404, detail="Recurrence not found")
+    occurrence_date = occurrence_date.replace(tzinfo=None)
+    if not is_occurrence(recurrence, occurrence_date):
+        raise HTTPException(status_code=404, detail="Occurrence not found")
+
+    exception = db.query(TaskOccurrenceException).filter(
+        TaskOccurrenceException.task_id == task_id,
+        TaskOccurrenceException.occurrence_date == occurrence_date
+    ).first()
+    if exception is None:
+        exception = TaskOccurrenceException(task_id=task_id, occurrence_date=occurrence_date)
+        db.add(exception)
+    for field, value in occurrence_update.dict(exclude_unset=True).items():
+        setattr(exception, field, value)
+    if exception.status == TaskStatus.DONE and exception.completed_at is None:
+        exception.completed_at = datetime.utcnow()
+    db_task.updated_at = datetime.utcnow()
+    db.commit()
+
+    start = min(occurrence_date, exception.due_date or occurrence_date)
+    end = max(occurrence_date, exception.due_date or occurrence_date)
+    occurrences = [
+        o for o in expand_occurrences(db, [db_task], start, end)
+        if o["occurrence_date"] == occurrence_date
+    ]
+    if not occurrences:
+        # Skipped occurrences are no longer listed
+        return Response(status_code=204)
+    return occurrences[0]
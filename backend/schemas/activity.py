@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, Dict, List, Any
-from datetime import datetime
+from datetime import date, datetime
 
 class ActivityBase(BaseModel):
     type: str
@@ -34,7 +34,51 @@ class JournalEntry(JournalEntryBase):
     id: int
     user_id: int
     created_at: datetime
-    updated_at: datetime
+    # Unset until the entry is first edited
+    updated_at: Optional[datetime] = None
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def _tag_names(cls, tags):
+        # Entries carry ``Tag`` rows; the journal API has always returned plain names
+        return [getattr(tag, "name", tag) for tag in tags or []]
+
+    class Config:
+        from_attributes = True
+
+class ActivitySummary(BaseModel):
+    """List view of an activity: the size of ``data`` instead of the data."""
+    id: int
+    user_id: int
+    type: str
+    size: int
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+class JournalEntrySummary(BaseModel):
+    """List view of a journal entry: an excerpt instead of the content."""
+    id: int
+    user_id: int
+    excerpt: str
+    size: int
+    mood: Optional[str] = None
+    tags: List[str] = []
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    _tag_names = field_validator("tags", mode="before")(JournalEntry._tag_names.__func__)
 
     class Config:
         from_attributes = True
+
+class JournalStatsBucket(BaseModel):
+    """Journal entries of one day, week or month, aggregated."""
+    period: date  # first day of the bucket; weeks start on Monday
+    entries: int
+    words: int
+    # Mean score in [-1, 1] of the entries scored so far
+    sentiment: Optional[float] = None
+    # Entries per mood; entries without a mood only count in ``entries``
+    moods: Dict[str, int] = {}
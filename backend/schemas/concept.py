@@ -1,16 +1,20 @@
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict
 
+from schemas.idea import TagResponse
+
 class ConceptNoteBase(BaseModel):
     title: str
     content: str
 
 class ConceptNoteCreate(ConceptNoteBase):
     project_id: int
+    tags: list[str] = []
 
 class ConceptNoteUpdate(BaseModel):
     title: str | None = None
     content: str | None = None
+    tags: list[str] | None = None
 
 class ConceptNote(ConceptNoteBase):
     id: int
@@ -18,5 +22,38 @@ class ConceptNote(ConceptNoteBase):
     user_id: int
     created_at: datetime
     updated_at: datetime
+    tags: list[TagResponse] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ConceptNoteSummary(BaseModel):
+    """List view of a note: an excerpt instead of the content."""
+    id: int
+    title: str
+    excerpt: str
+    size: int
+    project_id: int
+    user_id: int
+    created_at: datetime
+    updated_at: datetime
+    tags: list[TagResponse] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+class ConceptNoteRevisionSummary(BaseModel):
+    number: int
+    title: str
+    kind: str
+    size: int
+    user_id: int | None = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ConceptNoteRevision(ConceptNoteRevisionSummary):
+    content: str
+
+class ConceptNoteRevisionDiff(BaseModel):
+    from_number: int
+    to_number: int
+    lines: list[str]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, List, Any
-from datetime import datetime
+from datetime import datetime, time
 
 class GoalBase(BaseModel):
     title: str
@@ -51,6 +51,7 @@ class HabitBase(BaseModel):
     description: Optional[str] = None
     frequency: str
     target_days: List[str] = Field(default_factory=list)
+    reminder_time: Optional[time] = None
 
 class HabitCreate(HabitBase):
     pass
@@ -60,6 +61,7 @@ class HabitUpdate(BaseModel):
     description: Optional[str] = None
     frequency: Optional[str] = None
     target_days: Optional[List[str]] = None
+    reminder_time: Optional[time] = None
 
 class Habit(HabitBase):
     id: int
@@ -38,3 +38,15 @@ class IdeaResponse(IdeaBase):
 
     class Config:
         from_attributes = True
+
+class TagSuggestion(TagBase):
+    count: int
+    last_used_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class TaggedItems(BaseModel):
+    entity_type: str
+    ids: List[int]
+    total: int
@@ -0,0 +1,59 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+class MindmapBase(BaseModel):
+    title: str
+    data: dict
+
+class MindmapCreate(MindmapBase):
+    project_id: int
+
+class MindmapResponse(MindmapBase):
+    id: int
+    project_id: int
+    version: int
+    storage: str
+
+    class Config:
+        from_attributes = True
+
+class MindmapSummary(BaseModel):
+    """List view of a mindmap: its size and node count instead of the data."""
+    id: int
+    title: str
+    project_id: int
+    size: int
+    node_count: int
+    storage: str
+
+    class Config:
+        from_attributes = True
+
+class JsonPatchOperation(BaseModel):
+    """One RFC 6902 operation; ``value`` is required by add, replace and test."""
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(None, alias="from")
+
+    class Config:
+        populate_by_name = True
+
+class MindmapPatch(BaseModel):
+    base_version: int
+    ops: List[JsonPatchOperation]
+
+class MindmapPatchResult(BaseModel):
+    id: int
+    version: int
+    node_count: int
+
+class MindmapStorage(BaseModel):
+    storage: Literal["document", "normalized"]
+
+class MindmapViewport(BaseModel):
+    """Nodes inside the requested rectangle and edges crossing it."""
+    version: int
+    nodes: List[Dict[str, Any]]
+    edges: List[Dict[str, Any]]
+    truncated: bool
@@ -19,6 +19,18 @@ class ProjectUpdate(BaseModel):
     target_end_date: Optional[datetime] = None
     actual_end_date: Optional[datetime] = None
 
+class ProjectStats(BaseModel):
+    tasks_todo: int = 0
+    tasks_in_progress: int = 0
+    tasks_done: int = 0
+    task_count: int = 0
+    idea_count: int = 0
+    concept_note_count: int = 0
+    last_activity_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
 class Project(ProjectBase):
     id: int
     owner_id: int
@@ -26,6 +38,8 @@ class Project(ProjectBase):
     actual_end_date: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
+    # Only filled in when requested with ``with_stats=true``
+    stats: Optional[ProjectStats] = None
 
     class Config:
         orm_mode = True
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from models.task import TaskStatus, TaskPriority
+from schemas.idea import TagResponse
 
 class TaskBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
@@ -10,9 +11,10 @@ class TaskBase(BaseModel):
     priority: TaskPriority = TaskPriority.MEDIUM
     due_date: Optional[datetime] = None
     project_id: Optional[int] = None
+    estimated_hours: Optional[float] = Field(None, ge=0)
 
 class TaskCreate(TaskBase):
-    pass
+    tags: List[str] = []
 
 class TaskUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -21,12 +23,97 @@ class TaskUpdate(BaseModel):
     priority: Optional[TaskPriority] = None
     due_date: Optional[datetime] = None
     project_id: Optional[int] = None
+    estimated_hours: Optional[float] = Field(None, ge=0)
+    tags: Optional[List[str]] = None
 
 class TaskResponse(TaskBase):
     id: int
     user_id: int
     created_at: datetime
     updated_at: datetime
+    tags: List[TagResponse] = []
+    # Set on virtual occurrences of a recurring task: the date the rule generated
+    occurrence_date: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+class TaskDependencyCreate(BaseModel):
+    depends_on_id: int
+
+class TaskDependencyResponse(BaseModel):
+    task_id: int
+    depends_on_id: int
+    project_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class TaskScheduleResponse(BaseModel):
+    task_id: int
+    earliest_start: float
+    earliest_finish: float
+    latest_start: float
+    latest_finish: float
+    slack: float
+    is_critical: bool
+
+    class Config:
+        from_attributes = True
+
+class ProjectSchedule(BaseModel):
+    project_id: int
+    start_date: datetime
+    duration_hours: float
+    critical_path: List[int]
+    tasks: List[TaskScheduleResponse]
+
+class TaskRecurrenceSet(BaseModel):
+    rule: str = Field(..., min_length=1, max_length=500)
+    dtstart: Optional[datetime] = None
+
+class TaskRecurrenceResponse(BaseModel):
+    task_id: int
+    rule: str
+    dtstart: datetime
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class TaskOccurrenceUpdate(BaseModel):
+    status: Optional[TaskStatus] = None
+    due_date: Optional[datetime] = None
+    skipped: Optional[bool] = None
+
+class TaskAgenda(BaseModel):
+    overdue: List[TaskResponse]
+    today: List[TaskResponse]
+    upcoming: List[TaskResponse]
+
+class TaskBulkFilter(BaseModel):
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    project_id: Optional[int] = None
+    due_date_from: Optional[datetime] = None
+    due_date_to: Optional[datetime] = None
+    search: Optional[str] = None
+
+class TaskBulkChanges(BaseModel):
+    # Fields left out are untouched; project_id and due_date may be set to null explicitly
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    project_id: Optional[int] = None
+    due_date: Optional[datetime] = None
+
+class TaskBulkRequest(BaseModel):
+    action: Literal["update", "delete"]
+    ids: Optional[List[int]] = Field(None, max_length=5000)
+    filter: Optional[TaskBulkFilter] = None
+    changes: Optional[TaskBulkChanges] = None
+
+class TaskBulkResult(BaseModel):
+    action: str
+    affected: int
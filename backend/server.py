@@ -0,0 +1,122 @@
+"""Production server entry point (``ipms-server``).
+
+Runs the API with multiple worker processes. On POSIX systems gunicorn is used
+as the process manager with uvicorn workers: the app is imported once in the
+master before forking, workers are recycled after a (jittered) number of
+requests, and ``SIGHUP`` performs a graceful reload. Where gunicorn is not
+available (e.g. Windows) uvicorn's own multi-process supervisor is used.
+uvloop and httptools are picked automatically when installed.
+"""
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import sys
+
+# The backend modules use top-level imports (``from database import ...``)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+APP = "main:app"
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def default_workers() -> int:
+    """Classic ``2 * cores + 1``, capped so small containers aren't oversubscribed."""
+    return min(2 * multiprocessing.cpu_count() + 1, 16)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="ipms-server", description="Run the IPMS API in production mode")
+    parser.add_argument("--host", default=os.getenv("IPMS_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("IPMS_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("IPMS_WORKERS", default_workers())),
+                        help="Number of worker processes (default: 2 * CPU cores + 1)")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("IPMS_MAX_REQUESTS", "10000")),
+                        help="Recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--max-requests-jitter", type=int,
+                        default=int(os.getenv("IPMS_MAX_REQUESTS_JITTER", "1000")),
+                        help="Random extra requests per worker so they don't all restart together")
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("IPMS_TIMEOUT", "60")),
+                        help="Seconds a silent worker may take before it is killed")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("IPMS_GRACEFUL_TIMEOUT", "30")),
+                        help="Seconds workers get to finish in-flight requests on reload/shutdown")
+    parser.add_argument("--keep-alive", type=int, default=int(os.getenv("IPMS_KEEP_ALIVE", "5")))
+    parser.add_argument("--log-level", default=os.getenv("IPMS_LOG_LEVEL", "info"))
+    parser.add_argument("--no-preload", action="store_true",
+                        help="Import the app in each worker instead of once before forking")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "uvicorn"], default="auto")
+    return parser.parse_args(argv)
+
+
+def _post_fork(server, worker) -> None:
+    # Connections opened while preloading must not be shared across processes
+    from database import engine
+    engine.dispose()
+
+
+def run_gunicorn(args: argparse.Namespace) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": not args.no_preload,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter if args.max_requests else 0,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "keepalive": args.keep_alive,
+        "loglevel": args.log_level,
+        "accesslog": "-",
+        "errorlog": "-",
+        "chdir": BACKEND_DIR,
+        "post_fork": _post_fork,
+    }
+
+    class IPMSApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+            return app
+
+    IPMSApplication().run()
+
+
+def run_uvicorn(args: argparse.Namespace) -> None:
+    import uvicorn
+
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="uvloop" if _has_module("uvloop") else "auto",
+        http="httptools" if _has_module("httptools") else "auto",
+        limit_max_requests=args.max_requests or None,
+        timeout_keep_alive=args.keep_alive,
+        log_level=args.log_level,
+    )
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    server = args.server
+    if server == "auto":
+        server = "gunicorn" if os.name == "posix" and _has_module("gunicorn") else "uvicorn"
+    if server == "gunicorn":
+        run_gunicorn(args)
+    else:
+        run_uvicorn(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Revision history of concept notes.
+
+Every save of a note appends a ``ConceptNoteRevision``. Most revisions store
+only a delta: the line edits from the previous revision, as JSON
+``[["=", n], ["-", n], ["+", "text"], ...]`` (keep, drop, insert). Every
+``CONCEPT_REVISION_SNAPSHOT_INTERVAL`` revisions, or whenever the delta would
+not be much smaller than the text, the full text is stored instead, so
+rebuilding any revision reads one snapshot plus a bounded number of deltas.
+
+``compact_concept_revisions`` rebases chains that have grown longer than the
+interval (after it was lowered) and drops revisions beyond
+``CONCEPT_REVISION_MAX_KEPT``, turning the oldest kept one into a snapshot.
+"""
+import difflib
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models.concept import ConceptNote
+from models.concept_revision import ConceptNoteRevision
+
+settings = get_settings()
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+
+def make_delta(old: str, new: str) -> list:
+    old_lines, new_lines = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["=", i2 - i1])
+            continue
+        if i2 > i1:
+            ops.append(["-", i2 - i1])
+        if j2 > j1:
+            ops.append(["+", "".join(new_lines[j1:j2])])
+    return ops
+
+
+def apply_delta(old: str, ops: list) -> str:
+    old_lines = old.splitlines(keepends=True)
+    out, position = [], 0
+    for op, value in ops:
+        if op == "=":
+            out.extend(old_lines[position:position + value])
+            position += value
+        elif op == "-":
+            position += value
+        else:
+            out.append(value)
+    return "".join(out)
+
+
+def encode(previous: Optional[str], content: str, chain_length: int) -> Tuple[str, str, int]:
+    """``(kind, stored content, chain length)`` for ``content`` following
+    ``previous`` at ``chain_length`` deltas after the last snapshot."""
+    if previous is not None and chain_length < settings.CONCEPT_REVISION_SNAPSHOT_INTERVAL:
+        delta = json.dumps(make_delta(previous, content), separators=(",", ":"))
+        # Not worth a delta when it is about as large as the text
+        if len(delta) < len(content) // 2:
+            return DELTA, delta, chain_length
+    return SNAPSHOT, content, 0
+
+
+def _latest(db: Session, concept_id: int) -> Optional[ConceptNoteRevision]:
+    return db.query(ConceptNoteRevision).filter(
+        ConceptNoteRevision.concept_id == concept_id
+    ).order_by(ConceptNoteRevision.number.desc()).first()
+
+
+def record_revision(db: Session, concept: ConceptNote, previous_content: Optional[str], user_id: int) -> ConceptNoteRevision:
+    """Append the note's current title and content as a new revision.
+
+    ``previous_content`` is the content before this save, used to start the
+    history of notes saved before revisions existed. Call after the note
+    itself is flushed; does not commit.
+    """
+    latest = _latest(db, concept.id)
+    if latest is None and previous_content is not None:
+        latest = _append(db, concept.id, 1, concept.title, previous_content, None, 0, concept.user_id)
+    previous = previous_content if latest is not None else None
+    number = latest.number + 1 if latest is not None else 1
+    chain_length = latest.chain_length + 1 if latest is not None else 0
+    return _append(db, concept.id, number, concept.title, concept.content, previous, chain_length, user_id)
+
+
+def _append(db, concept_id, number, title, content, previous, chain_length, user_id) -> ConceptNoteRevision:
+    kind, stored, chain_length = encode(previous, content, chain_length)
+    revision = ConceptNoteRevision(
+        concept_id=concept_id,
+        number=number,
+        title=title,
+        kind=kind,
+        content=stored,
+        chain_length=chain_length,
+        size=len(content),
+        user_id=user_id,
+        created_at=datetime.utcnow(),
+    )
+    db.add(revision)
+    db.flush()
+    return revision
+
+
+def _contents(revisions: List[ConceptNoteRevision]) -> Iterator[Tuple[ConceptNoteRevision, str]]:
+    content = None
+    for revision in revisions:
+        content = revision.content if revision.kind == SNAPSHOT else apply_delta(content, json.loads(revision.content))
+        yield revision, content
+
+
+def rebuild(db: Session, concept_id: int, number: int) -> Optional[Tuple[ConceptNoteRevision, str]]:
+    """Revision ``number`` and its full text, from the nearest snapshot before it."""
+    base = db.query(func.max(ConceptNoteRevision.number)).filter(
+        ConceptNoteRevision.concept_id == concept_id,
+        ConceptNoteRevision.number <= number,
+        ConceptNoteRevision.kind == SNAPSHOT
+    ).scalar()
+    if base is None:
+        return None
+    chain = db.query(ConceptNoteRevision).filter(
+        ConceptNoteRevision.concept_id == concept_id,
+        ConceptNoteRevision.number.between(base, number)
+    ).order_by(ConceptNoteRevision.number).all()
+    if not chain or chain[-1].number != number:
+        return None
+    for revision, content in _contents(chain):
+        pass
+    return revision, content
+
+
+def diff(old_title: str, old: str, new_title: str, new: str, old_label: str, new_label: str) -> List[str]:
+    """Unified diff lines between two revisions, title first."""
+    lines = []
+    if old_title != new_title:
+        lines += [f"-title: {old_title}", f"+title: {new_title}"]
+    return lines + [
+        line.rstrip("\n") for line in difflib.unified_diff(
+            old.splitlines(keepends=True), new.splitlines(keepends=True), old_label, new_label
+        )
+    ]
+
+
+def compact_concept(db: Session, concept_id: int) -> int:
+    """Drop revisions beyond the kept limit and re-encode the rest with chains
+    no longer than the snapshot interval. Returns the number of rows changed."""
+    revisions = db.query(ConceptNoteRevision).filter(
+        ConceptNoteRevision.concept_id == concept_id
+    ).order_by(ConceptNoteRevision.number).all()
+    if not revisions:
+        return 0
+    first_kept = max(len(revisions) - settings.CONCEPT_REVISION_MAX_KEPT, 0)
+    changed, previous, chain_length = 0, None, 0
+    # Each revision is decoded (from its old encoding) before it is rewritten
+    for index, (revision, content) in enumerate(_contents(revisions)):
+        if index < first_kept:
+            db.delete(revision)
+            changed += 1
+            continue
+        kind, stored, chain_length = encode(previous, content, chain_length + 1 if previous is not None else 0)
+        if (kind, stored) != (revision.kind, revision.content):
+            revision.kind, revision.content = kind, stored
+            changed += 1
+        revision.chain_length = chain_length
+        previous = content
+    db.flush()
+    return changed
+
+
+def compact_concept_revisions(db: Session) -> str:
+    """Maintenance job: compact notes with too many revisions or over-long delta chains."""
+    concept_ids = [concept_id for concept_id, in db.query(ConceptNoteRevision.concept_id).group_by(
+        ConceptNoteRevision.concept_id
+    ).having(or_(
+        func.count() > settings.CONCEPT_REVISION_MAX_KEPT,
+        func.max(ConceptNoteRevision.chain_length) >= settings.CONCEPT_REVISION_SNAPSHOT_INTERVAL
+    ))]
+    changed = 0
+    for concept_id in concept_ids:
+        changed += compact_concept(db, concept_id)
+        db.commit()
+    return f"compacted {len(concept_ids)} notes, rewrote {changed} revisions"
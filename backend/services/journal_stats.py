@@ -0,0 +1,185 @@
+"""Daily journal aggregates for mood and sentiment charts.
+
+``journal_daily_stats`` holds one row per user, day and mood with the number
+of entries, their words and the sum of their sentiment scores, so a year of
+mood history is a few hundred rows rather than every entry; ``timeline``
+re-buckets them by week or month with a GROUP BY. Days are UTC dates of
+``created_at``.
+
+As in ``services.project_stats``, single entry writes adjust the rows with
+relative UPDATEs in the same transaction as the change; a row that does not
+exist yet is computed from the entries. Entries saved before scoring existed
+are scored by the ``score_journal_entries`` job, which rebuilds their days.
+
+Callers flush their change first and commit afterwards.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from models.activity import JournalEntry
+from models.journal_stats import JournalDailyStats
+from utils.sentiment import analyze
+
+NO_MOOD = ""
+SCORE_BATCH_SIZE = 500
+
+
+class Contribution(NamedTuple):
+    """What one entry adds to its row."""
+    user_id: int
+    day: date
+    mood: str
+    words: int
+    sentiment: Optional[float]
+
+
+def _day(timestamp: datetime) -> date:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.date()
+
+
+def contribution(entry: JournalEntry) -> Contribution:
+    return Contribution(entry.user_id, _day(entry.created_at), entry.mood or NO_MOOD,
+                        entry.word_count or 0, entry.sentiment)
+
+
+def entry_changed(db: Session, old: Optional[Contribution], new: Optional[Contribution]) -> None:
+    """Move one entry between rows; pass ``None`` for inserts and deletes."""
+    if old == new:
+        return
+    deltas: Dict[Tuple[int, date, str], List[float]] = {}
+    for change, sign in ((old, -1), (new, 1)):
+        if change is None:
+            continue
+        delta = deltas.setdefault((change.user_id, change.day, change.mood), [0, 0, 0, 0.0])
+        delta[0] += sign
+        delta[1] += sign if change.sentiment is not None else 0
+        delta[2] += sign * change.words
+        delta[3] += sign * (change.sentiment or 0)
+    # One statement per row, so a row rebuilt from the entries is not adjusted again
+    for (user_id, day, mood), (entries, scored, words, sentiment) in deltas.items():
+        updated = db.query(JournalDailyStats).filter(
+            JournalDailyStats.user_id == user_id,
+            JournalDailyStats.day == day,
+            JournalDailyStats.mood == mood
+        ).update({
+            JournalDailyStats.entry_count: JournalDailyStats.entry_count + entries,
+            JournalDailyStats.scored_count: JournalDailyStats.scored_count + scored,
+            JournalDailyStats.word_count: JournalDailyStats.word_count + words,
+            JournalDailyStats.sentiment_sum: JournalDailyStats.sentiment_sum + sentiment,
+        }, synchronize_session=False)
+        if not updated:
+            recount(db, user_id, [day], mood)
+
+
+def recount(db: Session, user_id: int, days: Iterable[date], mood: Optional[str] = None) -> None:
+    """Rebuild the rows of ``days`` (only those of ``mood`` when given) from the entries."""
+    for day in set(days):
+        start = datetime.combine(day, time.min)
+        entries = db.query(JournalEntry.mood, JournalEntry.word_count, JournalEntry.sentiment).filter(
+            JournalEntry.user_id == user_id,
+            JournalEntry.created_at >= start,
+            JournalEntry.created_at < start + timedelta(days=1)
+        )
+        rows = db.query(JournalDailyStats).filter(
+            JournalDailyStats.user_id == user_id,
+            JournalDailyStats.day == day
+        )
+        if mood is not None:
+            match = or_(JournalEntry.mood.is_(None), JournalEntry.mood == "") if mood == NO_MOOD else JournalEntry.mood == mood
+            entries = entries.filter(match)
+            rows = rows.filter(JournalDailyStats.mood == mood)
+        rows.delete(synchronize_session=False)
+
+        stats: Dict[str, JournalDailyStats] = {}
+        for entry_mood, words, sentiment in entries:
+            entry_mood = entry_mood or NO_MOOD
+            row = stats.get(entry_mood)
+            if row is None:
+                row = stats[entry_mood] = JournalDailyStats(
+                    user_id=user_id, day=day, mood=entry_mood,
+                    entry_count=0, scored_count=0, word_count=0, sentiment_sum=0.0
+                )
+            row.entry_count += 1
+            row.word_count += words or 0
+            if sentiment is not None:
+                row.scored_count += 1
+                row.sentiment_sum += sentiment
+        db.add_all(stats.values())
+    db.flush()
+
+
+def _period(db: Session, bucket: str):
+    day = JournalDailyStats.day
+    if bucket == "day":
+        return day
+    if db.get_bind().dialect.name == "sqlite":
+        # Weeks start on Monday: back to the coming Sunday, then six days earlier
+        expression = func.date(day, "weekday 0", "-6 days") if bucket == "week" else func.strftime("%Y-%m-01", day)
+        return sa.type_coerce(expression, sa.Date)
+    return sa.cast(func.date_trunc(bucket, day), sa.Date)
+
+
+def timeline(db: Session, user_id: int, bucket: str, from_date: date, to_date: date) -> List[dict]:
+    """Entries, words, mean sentiment and mood counts per day, week or month
+    (``bucket``) between two dates, oldest first; periods without entries are left out."""
+    period = _period(db, bucket).label("period")
+    rows = db.query(
+        period,
+        JournalDailyStats.mood,
+        func.sum(JournalDailyStats.entry_count),
+        func.sum(JournalDailyStats.scored_count),
+        func.sum(JournalDailyStats.word_count),
+        func.sum(JournalDailyStats.sentiment_sum)
+    ).filter(
+        JournalDailyStats.user_id == user_id,
+        JournalDailyStats.day >= from_date,
+        JournalDailyStats.day <= to_date,
+        JournalDailyStats.entry_count > 0
+    ).group_by(period, JournalDailyStats.mood).order_by(period)
+
+    buckets: Dict[date, dict] = {}
+    scores: Dict[date, List[float]] = {}
+    for start, mood, entries, scored, words, sentiment in rows:
+        summary = buckets.setdefault(start, {"period": start, "entries": 0, "words": 0, "sentiment": None, "moods": {}})
+        summary["entries"] += entries
+        summary["words"] += words
+        if mood != NO_MOOD:
+            summary["moods"][mood] = entries
+        totals = scores.setdefault(start, [0, 0.0])
+        totals[0] += scored
+        totals[1] += sentiment
+    for start, (scored, sentiment) in scores.items():
+        if scored:
+            buckets[start]["sentiment"] = round(sentiment / scored, 4)
+    return list(buckets.values())
+
+
+def score_journal_entries(db: Session) -> str:
+    """Maintenance job: score entries saved before scoring existed and rebuild their days."""
+    scored = 0
+    while True:
+        entries = db.query(
+            JournalEntry.id, JournalEntry.user_id, JournalEntry.content, JournalEntry.created_at, JournalEntry.updated_at
+        ).filter(JournalEntry.sentiment.is_(None)).order_by(JournalEntry.id).limit(SCORE_BATCH_SIZE).all()
+        if not entries:
+            break
+        days: Dict[int, set] = {}
+        scores = []
+        for entry in entries:
+            word_count, sentiment = analyze(entry.content)
+            # updated_at is written back as it was: scoring is not an edit, and
+            # leaving it out of the UPDATE would fire its onupdate
+            scores.append({"id": entry.id, "word_count": word_count, "sentiment": sentiment, "updated_at": entry.updated_at})
+            days.setdefault(entry.user_id, set()).add(_day(entry.created_at))
+        db.bulk_update_mappings(JournalEntry, scores)
+        for user_id, user_days in days.items():
+            recount(db, user_id, user_days)
+        db.commit()
+        scored += len(entries)
+    return f"scored {scored} journal entries"
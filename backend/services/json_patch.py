@@ -0,0 +1,137 @@
+"""JSON Patch (RFC 6902) over JSON Pointers (RFC 6901).
+
+``apply`` patches a parsed JSON document in place, which is what makes small
+edits to large documents cheap, so a document whose patch failed half-way must
+be discarded by the caller. Values taken from the operations are copied before
+they are inserted, so patching never aliases the caller's operation list.
+"""
+import copy
+from typing import Any, List, Sequence
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class JsonPatchError(ValueError):
+    """A malformed operation, or a path that does not exist in the document."""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """A ``test`` operation did not match the document."""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer '{pointer}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(array: list, token: str, pointer: str, append: bool = False) -> int:
+    if append and token == "-":
+        return len(array)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index '{token}' in '{pointer}'")
+    index = int(token)
+    if index > len(array) or (index == len(array) and not append):
+        raise JsonPatchError(f"Array index {index} out of range in '{pointer}'")
+    return index
+
+
+def _child(container: Any, token: str, pointer: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Path '{pointer}' does not exist")
+        return container[token]
+    if isinstance(container, list):
+        return container[_index(container, token, pointer)]
+    raise JsonPatchError(f"Path '{pointer}' does not exist")
+
+
+def resolve(document: Any, pointer: str) -> Any:
+    value = document
+    for token in parse_pointer(pointer):
+        value = _child(value, token, pointer)
+    return value
+
+
+def _parent(document: Any, pointer: str):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return None, None
+    container = document
+    for token in tokens[:-1]:
+        container = _child(container, token, pointer)
+    if not isinstance(container, (dict, list)):
+        raise JsonPatchError(f"Path '{pointer}' does not exist")
+    return container, tokens[-1]
+
+
+def _add(document: Any, pointer: str, value: Any) -> Any:
+    container, token = _parent(document, pointer)
+    if container is None:
+        return value
+    if isinstance(container, list):
+        container.insert(_index(container, token, pointer, append=True), value)
+    else:
+        container[token] = value
+    return document
+
+
+def _remove(document: Any, pointer: str):
+    """``(document, removed value)``; removing the root leaves ``None``."""
+    container, token = _parent(document, pointer)
+    if container is None:
+        return None, document
+    if isinstance(container, list):
+        return document, container.pop(_index(container, token, pointer))
+    if token not in container:
+        raise JsonPatchError(f"Path '{pointer}' does not exist")
+    return document, container.pop(token)
+
+
+def _equal(a: Any, b: Any) -> bool:
+    # JSON has no booleans-as-numbers: ``true`` does not equal ``1``
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[key], b[key]) for key in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _field(operation: dict, name: str) -> Any:
+    if name not in operation:
+        raise JsonPatchError(f"'{operation.get('op')}' operation is missing '{name}'")
+    return operation[name]
+
+
+def apply(document: Any, operations: Sequence[dict]) -> Any:
+    """Apply ``operations`` to ``document`` in place and return the patched
+    document (a new object only when the root itself was replaced)."""
+    for operation in operations:
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            raise JsonPatchError(f"Unknown operation '{op}'")
+        path = _field(operation, "path")
+        if op == "add":
+            document = _add(document, path, copy.deepcopy(_field(operation, "value")))
+        elif op == "remove":
+            document, _ = _remove(document, path)
+        elif op == "replace":
+            resolve(document, path)
+            document, _ = _remove(document, path)
+            document = _add(document, path, copy.deepcopy(_field(operation, "value")))
+        elif op == "move":
+            source = _field(operation, "from")
+            if source != path and path.startswith(source + "/"):
+                raise JsonPatchError(f"Cannot move '{source}' into its own child '{path}'")
+            document, value = _remove(document, source)
+            document = _add(document, path, value)
+        elif op == "copy":
+            value = copy.deepcopy(resolve(document, _field(operation, "from")))
+            document = _add(document, path, value)
+        elif not _equal(resolve(document, path), _field(operation, "value")):
+            raise JsonPatchTestFailed(f"Test of '{path}' failed")
+    return document
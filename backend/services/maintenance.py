@@ -0,0 +1,275 @@
+"""In-process scheduler for database housekeeping.
+
+Every worker runs a ``MaintenanceScheduler``, but only the one holding the
+``maintenance`` lease in ``scheduler_leases`` executes jobs, so a gunicorn
+deployment with many workers still purges and vacuums once. The lease expires
+on its own if the leader dies, and the last run of every job is stored in
+``maintenance_jobs`` so a new leader picks up the schedule where it was left.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from database import SessionLocal
+from models.maintenance import MaintenanceJobRun, SchedulerLease
+from models.password_reset import PasswordReset
+from models.refresh_token import RefreshToken
+from models.reminder import ReminderDelivery
+from services.purge import run_purges
+from services.tagging import prune_taggings
+from services.concept_revisions import compact_concept_revisions
+from services.mindmap_patches import compact_mindmaps
+from services.journal_stats import score_journal_entries
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "maintenance"
+
+
+@dataclass
+class MaintenanceJob:
+    name: str
+    interval: int
+    run: Callable[[Session], str]
+
+
+def _is_sqlite(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def _delete_in_chunks(db: Session, model, condition, chunk_size: int) -> int:
+    """Delete matching rows ``chunk_size`` at a time, committing between chunks
+    so the write lock is never held for long."""
+    deleted = 0
+    while True:
+        ids = [row_id for row_id, in db.query(model.id).filter(condition).limit(chunk_size).all()]
+        if not ids:
+            return deleted
+        db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        deleted += len(ids)
+
+
+def purge_refresh_tokens(db: Session) -> str:
+    condition = or_(RefreshToken.revoked == True, RefreshToken.expires_at < datetime.utcnow())
+    deleted = _delete_in_chunks(db, RefreshToken, condition, settings.MAINTENANCE_DELETE_CHUNK_SIZE)
+    return f"deleted {deleted} refresh tokens"
+
+
+def purge_password_resets(db: Session) -> str:
+    cutoff = datetime.utcnow() - timedelta(days=settings.PASSWORD_RESET_RETENTION_DAYS)
+    condition = or_(PasswordReset.expires_at < cutoff, PasswordReset.used_at < cutoff)
+    deleted = _delete_in_chunks(db, PasswordReset, condition, settings.MAINTENANCE_DELETE_CHUNK_SIZE)
+    return f"deleted {deleted} password resets"
+
+
+def purge_reminder_deliveries(db: Session) -> str:
+    cutoff = datetime.utcnow() - timedelta(days=settings.REMINDER_DELIVERY_RETENTION_DAYS)
+    condition = ReminderDelivery.fire_at < cutoff
+    deleted = _delete_in_chunks(db, ReminderDelivery, condition, settings.MAINTENANCE_DELETE_CHUNK_SIZE)
+    return f"deleted {deleted} reminder deliveries"
+
+
+def incremental_vacuum(db: Session) -> str:
+    """Return free pages to the OS without the exclusive lock of a full VACUUM."""
+    if not _is_sqlite(db):
+        return "skipped: not sqlite"
+    # 2 = INCREMENTAL; databases created before auto_vacuum was enabled need a one-off VACUUM
+    if db.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+        return "skipped: auto_vacuum is not INCREMENTAL"
+    free_before = db.execute(text("PRAGMA freelist_count")).scalar()
+    db.commit()
+    # The sqlite3 driver steps a PRAGMA only once, which frees a single page;
+    # executescript runs the statement to completion.
+    db.connection().connection.executescript(f"PRAGMA incremental_vacuum({int(settings.VACUUM_PAGES_PER_RUN)})")
+    free_after = db.execute(text("PRAGMA freelist_count")).scalar()
+    return f"released {free_before - free_after} pages"
+
+
+def optimize(db: Session) -> str:
+    """Refresh planner statistics."""
+    if _is_sqlite(db):
+        db.execute(text("PRAGMA optimize"))
+        db.commit()
+        return "pragma optimize"
+    db.execute(text("ANALYZE"))
+    db.commit()
+    return "analyze"
+
+
+JOBS: List[MaintenanceJob] = [
+    MaintenanceJob(name, settings.MAINTENANCE_JOB_INTERVALS[name], func)
+    for name, func in (
+        ("purge_refresh_tokens", purge_refresh_tokens),
+        ("purge_password_resets", purge_password_resets),
+        ("purge_reminder_deliveries", purge_reminder_deliveries),
+        ("run_purges", run_purges),
+        ("prune_taggings", prune_taggings),
+        ("compact_concept_revisions", compact_concept_revisions),
+        ("compact_mindmaps", compact_mindmaps),
+        ("score_journal_entries", score_journal_entries),
+        ("incremental_vacuum", incremental_vacuum),
+        ("optimize", optimize),
+    )
+]
+
+
+def try_acquire_lease(db: Session, name: str, holder: str, ttl: int) -> bool:
+    """Take or renew the named lease; returns whether ``holder`` now owns it."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    updated = db.query(SchedulerLease).filter(
+        SchedulerLease.name == name,
+        or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now)
+    ).update({SchedulerLease.holder: holder, SchedulerLease.expires_at: expires_at}, synchronize_session=False)
+    if updated:
+        db.commit()
+        return True
+    try:
+        db.add(SchedulerLease(name=name, holder=holder, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        # Someone else holds a live lease
+        db.rollback()
+        return False
+
+
+def release_lease(db: Session, name: str, holder: str) -> None:
+    db.query(SchedulerLease).filter(
+        SchedulerLease.name == name,
+        SchedulerLease.holder == holder
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+class MaintenanceScheduler:
+    def __init__(
+        self,
+        jobs: List[MaintenanceJob] = JOBS,
+        session_factory: Callable[[], Session] = SessionLocal,
+        tick: int = settings.MAINTENANCE_TICK_SECONDS,
+        lease_ttl: int = settings.MAINTENANCE_LEASE_SECONDS,
+    ):
+        self.jobs = jobs
+        self.session_factory = session_factory
+        self.tick = tick
+        self.lease_ttl = lease_ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.is_leader:
+            await asyncio.to_thread(self._release)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.run_pending)
+            except Exception as e:
+                logger.error(f"Maintenance tick failed: {e}", exc_info=True)
+            await asyncio.sleep(self.tick)
+
+    def _release(self) -> None:
+        db = self.session_factory()
+        try:
+            release_lease(db, LEASE_NAME, self.holder)
+        finally:
+            db.close()
+        self.is_leader = False
+
+    def run_pending(self) -> List[str]:
+        """Run every job that is due if this worker holds the lease; returns the names run.
+
+        The lease is renewed before each job, so it only has to outlast the
+        longest single job; a worker that lost it meanwhile stops there.
+        """
+        db = self.session_factory()
+        try:
+            self.is_leader = try_acquire_lease(db, LEASE_NAME, self.holder, self.lease_ttl)
+            if not self.is_leader:
+                return []
+            last_runs = {run.name: run for run in db.query(MaintenanceJobRun).all()}
+            now = datetime.utcnow()
+            ran = []
+            for job in self.jobs:
+                last = last_runs.get(job.name)
+                if last and last.last_run_at and now - last.last_run_at < timedelta(seconds=job.interval):
+                    continue
+                if ran:
+                    self.is_leader = try_acquire_lease(db, LEASE_NAME, self.holder, self.lease_ttl)
+                    if not self.is_leader:
+                        break
+                self.run_job(db, job, last)
+                ran.append(job.name)
+            return ran
+        finally:
+            db.close()
+
+    def run_job(self, db: Session, job: MaintenanceJob, record: Optional[MaintenanceJobRun] = None) -> Dict:
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        result, error = None, None
+        try:
+            result = job.run(db)
+        except Exception as e:
+            db.rollback()
+            error = str(e)
+            logger.error(f"Maintenance job {job.name} failed: {e}", exc_info=True)
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        logger.info(f"Maintenance job {job.name} finished in {duration_ms}ms: {error or result}")
+
+        if record is None:
+            record = db.query(MaintenanceJobRun).filter(MaintenanceJobRun.name == job.name).first()
+        if record is None:
+            record = MaintenanceJobRun(name=job.name)
+            db.add(record)
+        record.last_run_at = started_at
+        record.last_duration_ms = duration_ms
+        record.last_result = result
+        record.last_error = error
+        db.commit()
+
+        return _run_summary(record)
+
+    def status(self, db: Session) -> Dict:
+        """Last run of every job, as recorded by whichever worker was leader."""
+        runs = db.query(MaintenanceJobRun).order_by(MaintenanceJobRun.name).all()
+        return {"leader": self.is_leader, "jobs": {run.name: _run_summary(run) for run in runs}}
+
+
+def _run_summary(run: MaintenanceJobRun) -> Dict:
+    return {
+        "last_run_at": run.last_run_at.isoformat() if run.last_run_at else None,
+        "duration_ms": run.last_duration_ms,
+        "result": run.last_result,
+        "error": run.last_error,
+    }
+
+
+scheduler = MaintenanceScheduler()
@@ -0,0 +1,331 @@
+"""Real-time mindmap collaboration over WebSockets.
+
+Everyone editing a mindmap joins its room. Clients send batches of node and
+edge operations stamped with Lamport clocks; the room merges them into its
+``LWWDocument`` (``services.mindmap_crdt``), acknowledges the batch and
+forwards the part that took effect to the other clients in one message, so
+concurrent edits converge without locking or reloading.
+
+Persistence is write-coalesced: merged operations only mark their elements
+dirty, and every ``MINDMAP_COLLAB_FLUSH_MS`` the room writes the current
+value of each dirty element once, however many times it changed in between (a
+dragged node is one write per interval, not one per mouse move). Maps in
+document storage get one JSON Patch (``services.mindmap_patches``), maps in
+normalized storage one row per element (``services.mindmap_graph``).
+
+Rooms live in the worker that accepted the connections. Between flushes a
+room checks the map's version, and when it was changed elsewhere (REST saves
+or a room in another worker) reloads it and sends the clients a snapshot, so
+several workers converge at flush granularity; sticky routing by mindmap
+keeps everyone in one room.
+
+Protocol (JSON messages)::
+
+    server -> client  {"type": "hello", "client": id, "clock": n, "version": v, "document": {...}}
+    client -> server  {"type": "ops", "ops": [op, ...]}
+    server -> client  {"type": "ack", "clock": n}
+    server -> others  {"type": "ops", "client": id, "ops": [op, ...]}
+    server -> client  {"type": "snapshot", "clock": n, "version": v, "document": {...}}
+    server -> client  {"type": "error", "detail": "..."}
+"""
+import asyncio
+import bisect
+import copy
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session, defer
+from starlette.websockets import WebSocket
+
+from config import get_settings
+from database import SessionLocal
+from models.mindmap import Mindmap
+from services import json_patch, mindmap_graph
+from services.mindmap_crdt import KINDS, Key, LWWDocument
+from services.mindmap_patches import VersionConflict, apply_patch, current_document, replace_document
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class InvalidMessage(ValueError):
+    """A client message that does not follow the protocol."""
+
+
+@dataclass
+class Connection:
+    websocket: WebSocket
+    client: str
+    last_counter: int = 0
+
+    async def send(self, message: dict) -> None:
+        await self.websocket.send_json(message)
+
+
+def parse_op(raw: Any, connection: Connection) -> dict:
+    """Validate a client operation and stamp it with the connection's clock."""
+    if not isinstance(raw, dict):
+        raise InvalidMessage("Operations must be objects")
+    kind, key, op, counter = raw.get("kind"), raw.get("id"), raw.get("op"), raw.get("clock")
+    if kind not in KINDS:
+        raise InvalidMessage("'kind' must be 'node' or 'edge'")
+    if not isinstance(key, (str, int)) or isinstance(key, bool) or not 0 < len(str(key)) <= 100:
+        raise InvalidMessage("'id' must be a non-empty string of at most 100 characters")
+    if op not in ("set", "delete"):
+        raise InvalidMessage("'op' must be 'set' or 'delete'")
+    if isinstance(counter, list) and counter:
+        counter = counter[0]
+    if not isinstance(counter, int) or isinstance(counter, bool) or counter <= connection.last_counter:
+        raise InvalidMessage("'clock' must be an integer above the previous one")
+    parsed = {"kind": kind, "id": str(key), "op": op, "clock": [counter, connection.client]}
+    if op == "set":
+        fields = raw.get("fields")
+        if not isinstance(fields, dict) or "id" in fields:
+            raise InvalidMessage("'fields' must be an object without 'id'")
+        parsed["fields"] = fields
+    connection.last_counter = counter
+    return parsed
+
+
+def patch_ops(document: dict, changes: Dict[Key, Optional[dict]]) -> List[dict]:
+    """JSON Patch writing ``changes`` (element -> value, ``None`` to delete) into ``document``."""
+    ops = []
+    for kind, name in KINDS.items():
+        values = {key: value for (element_kind, key), value in changes.items() if element_kind == kind}
+        items = document.get(name)
+        if not isinstance(items, list):
+            if not any(value is not None for value in values.values()):
+                continue
+            ops.append({"op": "add", "path": f"/{name}", "value": []})
+            items = []
+        positions = {str(item["id"]): index for index, item in enumerate(items) if isinstance(item, dict) and "id" in item}
+        removed = sorted(positions[key] for key, value in values.items() if value is None and key in positions)
+        # Highest first, so the earlier indexes stay valid
+        ops.extend({"op": "remove", "path": f"/{name}/{index}"} for index in reversed(removed))
+        for key, value in values.items():
+            if value is None:
+                continue
+            if key in positions:
+                index = positions[key] - bisect.bisect_left(removed, positions[key])
+                ops.append({"op": "replace", "path": f"/{name}/{index}", "value": value})
+            else:
+                ops.append({"op": "add", "path": f"/{name}/-", "value": value})
+    return ops
+
+
+class Room:
+    """The connections to one mindmap, its merged state and the pending writes."""
+
+    def __init__(
+        self,
+        mindmap_id: int,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval: float = settings.MINDMAP_COLLAB_FLUSH_MS / 1000,
+    ):
+        self.mindmap_id = mindmap_id
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.connections: Dict[str, Connection] = {}
+        self.state: Optional[LWWDocument] = None
+        # The document as last read or written, for the positions of its elements
+        self.stored: dict = {}
+        self.version: Optional[int] = None
+        self.dirty: Set[Key] = set()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # Database -----------------------------------------------------------
+
+    def _read(self) -> Optional[tuple]:
+        db = self.session_factory()
+        try:
+            return current_document(db, self.mindmap_id)
+        finally:
+            db.close()
+
+    def _read_version(self) -> Optional[int]:
+        db = self.session_factory()
+        try:
+            return db.query(Mindmap.version).filter(Mindmap.id == self.mindmap_id).scalar()
+        finally:
+            db.close()
+
+    def _write_rows(self, db: Session, mindmap: Mindmap, changes: Dict[Key, Optional[dict]]) -> None:
+        # Nodes before the edges that need them, edges removed before their nodes
+        order = [("node", True), ("edge", True), ("edge", False), ("node", False)]
+        for kind, present in order:
+            for (element_kind, key), value in changes.items():
+                if element_kind != kind or (value is not None) != present:
+                    continue
+                try:
+                    if value is None:
+                        (mindmap_graph.delete_node if kind == "node" else mindmap_graph.delete_edge)(db, mindmap, key)
+                    else:
+                        (mindmap_graph.put_node if kind == "node" else mindmap_graph.put_edge)(db, mindmap, key, value)
+                except ValueError as e:
+                    # An edge whose node was deleted meanwhile
+                    logger.warning(f"Skipped {kind} '{key}' of mindmap {self.mindmap_id}: {e}")
+
+    def _persist(self, changes: Dict[Key, Optional[dict]]) -> Optional[int]:
+        """Write ``changes`` at ``self.version``; returns the new version, or
+        ``None`` when the map is gone."""
+        db = self.session_factory()
+        try:
+            mindmap = db.query(Mindmap).options(defer(Mindmap.data)).filter(Mindmap.id == self.mindmap_id).first()
+            if mindmap is None:
+                return None
+            if mindmap.version != self.version:
+                raise VersionConflict(mindmap.version)
+            patchable = isinstance(self.stored, dict)
+            ops = patch_ops(self.stored if patchable else {}, changes)
+            if mindmap.storage == mindmap_graph.NORMALIZED:
+                self._write_rows(db, mindmap, changes)
+                db.commit()
+                version = db.query(Mindmap.version).filter(Mindmap.id == self.mindmap_id).scalar()
+            elif patchable:
+                version = apply_patch(db, mindmap, self.version, ops)
+            else:
+                # Not a JSON object, so not patchable: saved whole
+                mindmap.data = json_patch.apply({}, ops)
+                replace_document(db, mindmap)
+                db.commit()
+                version = db.query(Mindmap.version).filter(Mindmap.id == self.mindmap_id).scalar()
+            # Patched in place: only the changed elements are copied
+            self.stored = json_patch.apply(self.stored if patchable else {}, ops)
+            return version
+        finally:
+            db.close()
+
+    # Merging ------------------------------------------------------------
+
+    async def load(self) -> bool:
+        current = await asyncio.to_thread(self._read)
+        if current is None:
+            return False
+        self.version, self.stored = current
+        self.state = LWWDocument(copy.deepcopy(self.stored))
+        return True
+
+    async def receive(self, connection: Connection, message: Any) -> None:
+        if not isinstance(message, dict) or message.get("type") != "ops" or not isinstance(message.get("ops"), list):
+            raise InvalidMessage("Expected {\"type\": \"ops\", \"ops\": [...]}")
+        if len(message["ops"]) > settings.MINDMAP_COLLAB_MAX_OPS:
+            raise InvalidMessage(f"At most {settings.MINDMAP_COLLAB_MAX_OPS} operations per message")
+        # Validated up front, so a bad operation rejects the whole batch
+        ops = [parse_op(raw, connection) for raw in message["ops"]]
+        applied = []
+        for op in ops:
+            result = self.state.apply(op)
+            if result is not None:
+                applied.append(result)
+                self.dirty.add((op["kind"], op["id"]))
+        await connection.send({"type": "ack", "clock": self.state.counter})
+        if applied:
+            await self.broadcast({"type": "ops", "client": connection.client, "ops": applied}, skip=connection)
+
+    async def broadcast(self, message: dict, skip: Optional[Connection] = None) -> None:
+        targets = [c for c in self.connections.values() if c is not skip]
+        # A client that went away is removed by its own receive loop
+        await asyncio.gather(*(c.send(message) for c in targets), return_exceptions=True)
+
+    def snapshot(self, kind: str = "snapshot") -> dict:
+        return {"type": kind, "clock": self.state.counter, "version": self.version, "document": self.state.document()}
+
+    async def _reload(self) -> None:
+        """Take in changes made outside the room, keeping the unsaved ones."""
+        current = await asyncio.to_thread(self._read)
+        if current is None:
+            return
+        self.version, self.stored = current
+        # Stamped after every clock seen, so the stored content wins
+        self.state.load(copy.deepcopy(self.stored), (self.state.counter + 1, ""), keep=self.dirty)
+        await self.broadcast(self.snapshot())
+
+    # Flushing -----------------------------------------------------------
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self.dirty:
+                version = await asyncio.to_thread(self._read_version)
+                if version is not None and version != self.version:
+                    await self._reload()
+                return
+            keys, self.dirty = self.dirty, set()
+            changes = {key: self.state.get(key) for key in keys}
+            try:
+                version = await asyncio.to_thread(self._persist, changes)
+            except VersionConflict:
+                self.dirty |= keys
+                await self._reload()
+                return
+            except Exception as e:
+                self.dirty |= keys
+                logger.error(f"Failed to save mindmap {self.mindmap_id}: {e}", exc_info=True)
+                return
+            if version is not None:
+                self.version = version
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flush loop and write what is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+class CollaborationHub:
+    """The open rooms of this worker, by mindmap id."""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self.rooms: Dict[int, Room] = {}
+        self._lock = asyncio.Lock()
+
+    async def join(self, mindmap_id: int, websocket: WebSocket) -> Optional[tuple]:
+        """Add an accepted connection to the mindmap's room and greet it;
+        ``None`` when the mindmap does not exist."""
+        async with self._lock:
+            room = self.rooms.get(mindmap_id)
+            if room is None:
+                room = Room(mindmap_id, self.session_factory)
+                if not await room.load():
+                    return None
+                self.rooms[mindmap_id] = room
+                room.start()
+            connection = Connection(websocket, uuid.uuid4().hex[:8])
+            room.connections[connection.client] = connection
+        await connection.send({**room.snapshot("hello"), "client": connection.client})
+        return room, connection
+
+    async def leave(self, room: Room, connection: Connection) -> None:
+        async with self._lock:
+            room.connections.pop(connection.client, None)
+            if room.connections:
+                return
+            self.rooms.pop(room.mindmap_id, None)
+            await room.close()
+
+    async def close(self) -> None:
+        """Flush every room; called at shutdown."""
+        async with self._lock:
+            rooms, self.rooms = list(self.rooms.values()), {}
+        for room in rooms:
+            await room.close()
+
+
+collaboration_hub = CollaborationHub()
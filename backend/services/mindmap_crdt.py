@@ -0,0 +1,107 @@
+"""A last-writer-wins CRDT over the nodes and edges of a mindmap.
+
+Every node and edge is an element keyed by ``(kind, id)``. Each of its fields
+(the keys of the node object other than ``id``) is a register stamped with a
+Lamport clock ``(counter, client)``, and a write only lands when its clock is
+later than the field's. Deleting an element stamps a tombstone and drops the
+fields written before it; the element exists while its latest ``set`` is
+later than its tombstone. Replicas that apply the same operations end in the
+same state whatever the order they arrive in, so two people editing one node
+both keep their change (one moves it, the other renames it) and for the same
+field the later clock wins.
+
+Operations look like::
+
+    {"kind": "node", "id": "n1", "op": "set", "fields": {"label": "Idea"}, "clock": [12, "a1b2c3d4"]}
+    {"kind": "edge", "id": "e1", "op": "delete", "clock": [13, "a1b2c3d4"]}
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Clock = Tuple[int, str]
+Key = Tuple[str, str]
+
+# Element kind -> list of the document holding them
+KINDS = {"node": "nodes", "edge": "edges"}
+
+
+@dataclass
+class Element:
+    fields: Dict[str, Tuple[Clock, Any]] = field(default_factory=dict)
+    written: Optional[Clock] = None
+    deleted: Optional[Clock] = None
+
+    @property
+    def visible(self) -> bool:
+        return self.written is not None and (self.deleted is None or self.written > self.deleted)
+
+    def value(self, key: str) -> dict:
+        return {"id": key, **{name: value for name, (_, value) in self.fields.items()}}
+
+
+class LWWDocument:
+    """The merged state of one mindmap document."""
+
+    def __init__(self, document: Any, clock: Clock = (0, "")):
+        self.elements: Dict[Key, Element] = {}
+        self.rest: dict = {}
+        self.counter = clock[0]
+        self.load(document, clock)
+
+    def load(self, document: Any, clock: Clock, keep: Iterable[Key] = ()) -> None:
+        """Reset every element but those in ``keep`` to its content in
+        ``document``, written at ``clock``; elements missing from it are deleted."""
+        keep = set(keep)
+        document = document if isinstance(document, dict) else {}
+        self.rest = {name: value for name, value in document.items() if name not in KINDS.values()}
+        self.counter = max(self.counter, clock[0])
+        seen = set()
+        for kind, name in KINDS.items():
+            for item in document.get(name) or []:
+                if not isinstance(item, dict) or item.get("id") is None:
+                    continue
+                key = (kind, str(item["id"]))
+                seen.add(key)
+                if key not in keep:
+                    self.elements[key] = Element({f: (clock, v) for f, v in item.items() if f != "id"}, clock)
+        for key, element in self.elements.items():
+            if key not in seen and key not in keep:
+                element.fields, element.written, element.deleted = {}, None, clock
+
+    def apply(self, op: dict) -> Optional[dict]:
+        """Merge one operation; returns the part of it that changed the state,
+        or ``None`` when it was superseded."""
+        clock = (int(op["clock"][0]), str(op["clock"][1]))
+        self.counter = max(self.counter, clock[0])
+        element = self.elements.setdefault((op["kind"], op["id"]), Element())
+        stamped = {"kind": op["kind"], "id": op["id"], "op": op["op"], "clock": list(clock)}
+        if op["op"] == "delete":
+            if element.deleted is not None and clock <= element.deleted:
+                return None
+            element.deleted = clock
+            element.fields = {name: entry for name, entry in element.fields.items() if entry[0] > clock}
+            return stamped
+        if element.deleted is not None and clock <= element.deleted:
+            return None
+        written = element.written is None or clock > element.written
+        if written:
+            element.written = clock
+        changed = {}
+        for name, value in op["fields"].items():
+            current = element.fields.get(name)
+            if current is None or clock > current[0]:
+                element.fields[name] = (clock, value)
+                changed[name] = value
+        return {**stamped, "fields": changed} if written or changed else None
+
+    def get(self, key: Key) -> Optional[dict]:
+        """The element's current value, or ``None`` when it is deleted."""
+        element = self.elements.get(key)
+        return element.value(key[1]) if element is not None and element.visible else None
+
+    def document(self) -> dict:
+        lists: Dict[str, List[dict]] = {name: [] for name in KINDS.values()}
+        for (kind, key), element in self.elements.items():
+            if element.visible:
+                lists[KINDS[kind]].append(element.value(key))
+        return {**self.rest, **lists}
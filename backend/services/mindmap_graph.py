@@ -0,0 +1,238 @@
+"""Normalized mindmap storage: one row per node and per edge.
+
+Maps switched to ``normalized`` storage keep their nodes and edges in
+``mindmap_nodes`` and ``mindmap_edges`` and everything else of the document in
+``Mindmap.data``. Editing a node writes one row, and ``viewport`` returns only
+the nodes and edges inside a rectangle, found through the SQLite R-trees kept
+by the triggers in ``models.mindmap_graph``. The whole document can still be
+read (``assemble``) and saved, so existing clients keep working.
+
+Every edit bumps the mindmap's version, keeping it equal to
+``snapshot_version``: normalized maps have no JSON Patch log.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from models.mindmap import Mindmap
+from models.mindmap_graph import MindmapEdge, MindmapNode, node_coordinates
+from utils.summary import json_size
+
+DOCUMENT = "document"
+NORMALIZED = "normalized"
+
+_node_index = sa.table("mindmap_node_index", *(sa.column(name) for name in ("id", "min_x", "max_x", "min_y", "max_y", "min_m", "max_m")))
+_edge_index = sa.table("mindmap_edge_index", *(sa.column(name) for name in ("id", "min_x", "max_x", "min_y", "max_y", "min_m", "max_m")))
+
+
+class StorageMismatch(Exception):
+    """The operation does not apply to the mindmap's storage mode."""
+
+
+def _key(item: Any, kind: str) -> str:
+    key = item.get("id") if isinstance(item, dict) else None
+    if not isinstance(key, (str, int)) or isinstance(key, bool) or str(key) == "":
+        raise ValueError(f"Every {kind} needs an id")
+    return str(key)
+
+
+def _body(item: dict) -> dict:
+    return {name: value for name, value in item.items() if name != "id"}
+
+
+def _entry_size(key: str, body: dict) -> int:
+    # Its share of the document's JSON, separator included
+    return json_size({"id": key, **body}) + 2
+
+
+def write_graph(db: Session, mindmap: Mindmap, document: Any) -> None:
+    """Store ``document``'s nodes and edges as rows, replacing the existing
+    ones, and switch the map to normalized storage. Does not commit."""
+    if not isinstance(document, dict):
+        raise ValueError("A normalized mindmap must be a JSON object")
+    node_rows, edge_rows = {}, {}
+    for node in document.get("nodes") or []:
+        key = _key(node, "node")
+        x, y = node_coordinates(node)
+        node_rows[key] = {"mindmap_id": mindmap.id, "key": key, "x": x, "y": y, "data": _body(node)}
+    for edge in document.get("edges") or []:
+        key = _key(edge, "edge")
+        source, target = edge.get("source"), edge.get("target")
+        if source is None or target is None:
+            raise ValueError(f"Edge '{key}' needs a source and a target")
+        edge_rows[key] = {"mindmap_id": mindmap.id, "key": key, "source": str(source), "target": str(target), "data": _body(edge)}
+
+    db.query(MindmapEdge).filter(MindmapEdge.mindmap_id == mindmap.id).delete(synchronize_session=False)
+    db.query(MindmapNode).filter(MindmapNode.mindmap_id == mindmap.id).delete(synchronize_session=False)
+    # Nodes first: the edge triggers look up their endpoints
+    if node_rows:
+        db.execute(MindmapNode.__table__.insert(), list(node_rows.values()))
+    if edge_rows:
+        db.execute(MindmapEdge.__table__.insert(), list(edge_rows.values()))
+    size = json_size(document)
+    mindmap.data = {name: value for name, value in document.items() if name not in ("nodes", "edges")}
+    # Assigning ``data`` recomputed these from what is left of the document
+    mindmap.size, mindmap.node_count = size, len(node_rows)
+    mindmap.storage = NORMALIZED
+
+
+def assemble(db: Session, mindmap_id: int, rest: Optional[dict]) -> dict:
+    """The whole document of a normalized map."""
+    nodes = db.query(MindmapNode.key, MindmapNode.data).filter(
+        MindmapNode.mindmap_id == mindmap_id
+    ).order_by(MindmapNode.id)
+    edges = db.query(MindmapEdge.key, MindmapEdge.data).filter(
+        MindmapEdge.mindmap_id == mindmap_id
+    ).order_by(MindmapEdge.id)
+    return {
+        **(rest or {}),
+        "nodes": [{"id": key, **body} for key, body in nodes],
+        "edges": [{"id": key, **body} for key, body in edges],
+    }
+
+
+def release_graph(db: Session, mindmap: Mindmap) -> None:
+    """Fold the rows back into ``data`` and switch the map to document storage. Does not commit."""
+    document = assemble(db, mindmap.id, mindmap.data)
+    db.query(MindmapEdge).filter(MindmapEdge.mindmap_id == mindmap.id).delete(synchronize_session=False)
+    db.query(MindmapNode).filter(MindmapNode.mindmap_id == mindmap.id).delete(synchronize_session=False)
+    mindmap.data = document
+    mindmap.storage = DOCUMENT
+
+
+def _touch(db: Session, mindmap_id: int, nodes: int = 0, size: int = 0) -> None:
+    db.query(Mindmap).filter(Mindmap.id == mindmap_id).update({
+        Mindmap.version: Mindmap.version + 1,
+        Mindmap.snapshot_version: Mindmap.version + 1,
+        Mindmap.node_count: Mindmap.node_count + nodes,
+        Mindmap.size: Mindmap.size + size,
+    }, synchronize_session=False)
+
+
+def _check(mindmap: Mindmap) -> None:
+    if mindmap.storage != NORMALIZED:
+        raise StorageMismatch("Mindmap does not use normalized storage")
+
+
+def put_node(db: Session, mindmap: Mindmap, key: str, node: dict) -> dict:
+    """Create or replace one node. Does not commit."""
+    _check(mindmap)
+    body = _body(node)
+    row = db.query(MindmapNode).filter(MindmapNode.mindmap_id == mindmap.id, MindmapNode.key == key).first()
+    if row is None:
+        db.add(MindmapNode(mindmap_id=mindmap.id, key=key, data=body))
+        _touch(db, mindmap.id, nodes=1, size=_entry_size(key, body))
+    else:
+        size = _entry_size(key, body) - _entry_size(key, row.data)
+        row.data = body
+        _touch(db, mindmap.id, size=size)
+    db.flush()
+    return {"id": key, **body}
+
+
+def delete_node(db: Session, mindmap: Mindmap, key: str) -> bool:
+    """Delete one node and the edges attached to it. Does not commit."""
+    _check(mindmap)
+    row = db.query(MindmapNode).filter(MindmapNode.mindmap_id == mindmap.id, MindmapNode.key == key).first()
+    if row is None:
+        return False
+    edges = db.query(MindmapEdge).filter(
+        MindmapEdge.mindmap_id == mindmap.id,
+        or_(MindmapEdge.source == key, MindmapEdge.target == key)
+    ).all()
+    size = _entry_size(key, row.data) + sum(_entry_size(edge.key, edge.data) for edge in edges)
+    for edge in edges:
+        db.delete(edge)
+    db.delete(row)
+    _touch(db, mindmap.id, nodes=-1, size=-size)
+    db.flush()
+    return True
+
+
+def put_edge(db: Session, mindmap: Mindmap, key: str, edge: dict) -> dict:
+    """Create or replace one edge between existing nodes. Does not commit."""
+    _check(mindmap)
+    body = _body(edge)
+    source, target = body.get("source"), body.get("target")
+    if source is None or target is None:
+        raise ValueError(f"Edge '{key}' needs a source and a target")
+    source, target = str(source), str(target)
+    known = {node_key for node_key, in db.query(MindmapNode.key).filter(
+        MindmapNode.mindmap_id == mindmap.id,
+        MindmapNode.key.in_({source, target})
+    )}
+    for node_key in (source, target):
+        if node_key not in known:
+            raise ValueError(f"Unknown node '{node_key}'")
+    row = db.query(MindmapEdge).filter(MindmapEdge.mindmap_id == mindmap.id, MindmapEdge.key == key).first()
+    if row is None:
+        db.add(MindmapEdge(mindmap_id=mindmap.id, key=key, source=source, target=target, data=body))
+        _touch(db, mindmap.id, size=_entry_size(key, body))
+    else:
+        size = _entry_size(key, body) - _entry_size(key, row.data)
+        row.source, row.target, row.data = source, target, body
+        _touch(db, mindmap.id, size=size)
+    db.flush()
+    return {"id": key, **body}
+
+
+def delete_edge(db: Session, mindmap: Mindmap, key: str) -> bool:
+    """Delete one edge. Does not commit."""
+    _check(mindmap)
+    row = db.query(MindmapEdge).filter(MindmapEdge.mindmap_id == mindmap.id, MindmapEdge.key == key).first()
+    if row is None:
+        return False
+    db.delete(row)
+    _touch(db, mindmap.id, size=-_entry_size(key, row.data))
+    db.flush()
+    return True
+
+
+def viewport(
+    db: Session,
+    mindmap: Mindmap,
+    min_x: float,
+    min_y: float,
+    max_x: float,
+    max_y: float,
+    limit: int,
+) -> Tuple[List[Dict], List[Dict], bool]:
+    """Nodes inside the rectangle and edges crossing it, at most ``limit`` of
+    each; the flag tells whether either list was cut off."""
+    _check(mindmap)
+    if db.get_bind().dialect.name == "sqlite":
+        def inside(index):
+            return sa.and_(
+                index.c.min_m <= mindmap.id, index.c.max_m >= mindmap.id,
+                index.c.max_x >= min_x, index.c.min_x <= max_x,
+                index.c.max_y >= min_y, index.c.min_y <= max_y,
+            )
+        nodes = db.query(MindmapNode.key, MindmapNode.data).join(
+            _node_index, _node_index.c.id == MindmapNode.id
+        ).filter(inside(_node_index), MindmapNode.mindmap_id == mindmap.id)
+        edges = db.query(MindmapEdge.key, MindmapEdge.data).join(
+            _edge_index, _edge_index.c.id == MindmapEdge.id
+        ).filter(inside(_edge_index), MindmapEdge.mindmap_id == mindmap.id)
+    else:
+        # Without R-trees: a range scan over the map's nodes, and the edges touching them
+        condition = sa.and_(
+            MindmapNode.mindmap_id == mindmap.id,
+            MindmapNode.x.between(min_x, max_x),
+            MindmapNode.y.between(min_y, max_y)
+        )
+        nodes = db.query(MindmapNode.key, MindmapNode.data).filter(condition)
+        keys = sa.select(MindmapNode.key).where(condition)
+        edges = db.query(MindmapEdge.key, MindmapEdge.data).filter(
+            MindmapEdge.mindmap_id == mindmap.id,
+            or_(MindmapEdge.source.in_(keys), MindmapEdge.target.in_(keys))
+        )
+    node_rows = nodes.limit(limit + 1).all()
+    edge_rows = edges.limit(limit + 1).all()
+    truncated = len(node_rows) > limit or len(edge_rows) > limit
+    return (
+        [{"id": key, **body} for key, body in node_rows[:limit]],
+        [{"id": key, **body} for key, body in edge_rows[:limit]],
+        truncated,
+    )
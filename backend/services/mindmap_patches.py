@@ -0,0 +1,203 @@
+"""Incremental mindmap updates with JSON Patch.
+
+A mindmap's ``data`` column holds the document as of ``snapshot_version``.
+Every patch applied since is a row in ``mindmap_operations``, so an autosave
+writes the handful of operations it carries instead of rewriting a
+multi-megabyte document. The current document is the snapshot with the logged
+patches replayed. Once ``MINDMAP_COMPACT_AFTER_OPS`` patches are pending it is
+written back as the new snapshot and the log is cleared; ``compact_mindmaps``
+does the same for maps left with a few pending patches. Maps in normalized
+storage (``services.mindmap_graph``) are edited row by row instead.
+
+Patches carry the version they were made against and are rejected when the
+map has moved on. The document each worker last patched is cached by
+(mindmap, version), so consecutive autosaves do not reload it; a version
+number is only ever produced by one successful patch or full save, so a
+cached document is valid wherever its version is current.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from config import get_settings
+from models.mindmap import Mindmap, count_nodes
+from models.mindmap_operation import MindmapOperation
+from services import json_patch
+from services.mindmap_graph import NORMALIZED, StorageMismatch, assemble
+from utils.summary import json_size
+
+settings = get_settings()
+
+
+class VersionConflict(Exception):
+    """The mindmap is no longer at the version a patch was made against."""
+
+    def __init__(self, version: Optional[int]):
+        super().__init__(f"Mindmap is at version {version}")
+        self.version = version
+
+
+class DocumentCache:
+    """LRU of the latest patched document per mindmap.
+
+    Documents are patched in place, so ``take`` removes the entry: a document
+    is only ever held by the one request patching it.
+    """
+
+    def __init__(self, max_documents: int = settings.MINDMAP_DOCUMENT_CACHE_SIZE):
+        self.max_documents = max_documents
+        self._documents: "OrderedDict[int, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, mindmap_id: int, version: int) -> Optional[Any]:
+        with self._lock:
+            cached = self._documents.pop(mindmap_id, None)
+        if cached is None or cached[0] != version:
+            return None
+        return cached[1]
+
+    def put(self, mindmap_id: int, version: int, document: Any) -> None:
+        with self._lock:
+            cached = self._documents.get(mindmap_id)
+            if cached is not None and cached[0] > version:
+                return
+            self._documents[mindmap_id] = (version, document)
+            self._documents.move_to_end(mindmap_id)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+
+    def forget(self, mindmap_id: int) -> None:
+        with self._lock:
+            self._documents.pop(mindmap_id, None)
+
+
+document_cache = DocumentCache()
+
+
+def current_document(db: Session, mindmap_id: int) -> Optional[Tuple[int, Any]]:
+    """``(version, document)`` of a mindmap, rebuilt from its snapshot and log."""
+    # The snapshot and the log are read separately; a compaction committed in
+    # between shows up as a gap in the log and the read is retried
+    for _ in range(3):
+        row = db.query(Mindmap.data, Mindmap.snapshot_version, Mindmap.version, Mindmap.storage).filter(
+            Mindmap.id == mindmap_id
+        ).first()
+        if row is None:
+            return None
+        document, snapshot_version, version, storage = row
+        if storage == NORMALIZED:
+            return version, assemble(db, mindmap_id, document)
+        if version == snapshot_version:
+            return version, document
+        operations = db.query(MindmapOperation.version, MindmapOperation.ops).filter(
+            MindmapOperation.mindmap_id == mindmap_id,
+            MindmapOperation.version > snapshot_version,
+            MindmapOperation.version <= version
+        ).order_by(MindmapOperation.version).all()
+        if [number for number, _ in operations] == list(range(snapshot_version + 1, version + 1)):
+            for _, ops in operations:
+                document = json_patch.apply(document, ops)
+            return version, document
+    raise VersionConflict(None)
+
+
+def load_documents(db: Session, mindmaps: Iterable[Mindmap]) -> None:
+    """Replace the snapshots loaded with ``mindmaps`` by their current documents."""
+    for mindmap in mindmaps:
+        if mindmap.version == mindmap.snapshot_version and mindmap.storage != NORMALIZED:
+            continue
+        current = current_document(db, mindmap.id)
+        if current is not None:
+            # Not an assignment: the row is not marked dirty and the summary
+            # columns keep the values stored with it
+            set_committed_value(mindmap, "version", current[0])
+            set_committed_value(mindmap, "data", current[1])
+
+
+def write_snapshot(db: Session, mindmap_id: int, version: int, document: Any) -> bool:
+    """Store ``document`` as the snapshot at ``version`` and drop the patches it
+    includes. Does nothing when a later snapshot exists; does not commit."""
+    updated = db.query(Mindmap).filter(
+        Mindmap.id == mindmap_id,
+        Mindmap.snapshot_version < version
+    ).update({
+        Mindmap.data: document,
+        Mindmap.snapshot_version: version,
+        Mindmap.size: json_size(document),
+        Mindmap.node_count: count_nodes(document),
+    }, synchronize_session=False)
+    if not updated:
+        return False
+    db.query(MindmapOperation).filter(
+        MindmapOperation.mindmap_id == mindmap_id,
+        MindmapOperation.version <= version
+    ).delete(synchronize_session=False)
+    return True
+
+
+def apply_patch(db: Session, mindmap: Mindmap, base_version: int, ops: Sequence[dict]) -> int:
+    """Apply ``ops`` to the mindmap at ``base_version`` and commit; returns the new version.
+
+    Raises ``VersionConflict`` when the map is at another version,
+    ``json_patch.JsonPatchError`` when the patch does not apply and
+    ``StorageMismatch`` for maps in normalized storage.
+    """
+    if mindmap.storage == NORMALIZED:
+        raise StorageMismatch("Mindmap uses normalized storage; edit its nodes and edges instead")
+    if mindmap.version != base_version:
+        raise VersionConflict(mindmap.version)
+    document = document_cache.take(mindmap.id, base_version)
+    if document is None:
+        current = current_document(db, mindmap.id)
+        if current is None or current[0] != base_version:
+            raise VersionConflict(current and current[0])
+        document = current[1]
+    document = json_patch.apply(document, ops)
+
+    version = base_version + 1
+    # Conditional on the base version, so concurrent patches cannot both apply
+    updated = db.query(Mindmap).filter(
+        Mindmap.id == mindmap.id,
+        Mindmap.version == base_version
+    ).update({
+        Mindmap.version: version,
+        Mindmap.node_count: count_nodes(document),
+    }, synchronize_session=False)
+    if not updated:
+        db.rollback()
+        raise VersionConflict(db.query(Mindmap.version).filter(Mindmap.id == mindmap.id).scalar())
+    db.add(MindmapOperation(mindmap_id=mindmap.id, version=version, ops=list(ops), created_at=datetime.utcnow()))
+    db.flush()
+    if version - mindmap.snapshot_version >= settings.MINDMAP_COMPACT_AFTER_OPS:
+        write_snapshot(db, mindmap.id, version, document)
+    db.commit()
+    document_cache.put(mindmap.id, version, document)
+    return version
+
+
+def replace_document(db: Session, mindmap: Mindmap) -> None:
+    """Make a full save of ``mindmap.data`` the new snapshot, superseding the
+    log. Call after assigning ``data``; does not commit."""
+    # Evaluated by the database, so a patch committed meanwhile is superseded too
+    mindmap.version = Mindmap.version + 1
+    mindmap.snapshot_version = Mindmap.version + 1
+    db.query(MindmapOperation).filter(MindmapOperation.mindmap_id == mindmap.id).delete(synchronize_session=False)
+    document_cache.forget(mindmap.id)
+
+
+def compact_mindmaps(db: Session) -> str:
+    """Maintenance job: fold the pending patches of every mindmap into its snapshot."""
+    mindmap_ids = [mindmap_id for mindmap_id, in db.query(Mindmap.id).filter(
+        Mindmap.version > Mindmap.snapshot_version
+    )]
+    compacted = 0
+    for mindmap_id in mindmap_ids:
+        current = current_document(db, mindmap_id)
+        if current is not None and write_snapshot(db, mindmap_id, *current):
+            compacted += 1
+        db.commit()
+    return f"compacted {compacted} mindmaps"
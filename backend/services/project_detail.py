@@ -0,0 +1,126 @@
+"""Composite project detail: a project with its tasks, ideas, concept notes
+and mindmaps in one response.
+
+Ownership is checked once. Every requested section is then loaded in a worker
+thread on its own session, and therefore its own pooled connection, and the
+sections are written to the response body as they complete. The slowest query
+bounds the latency instead of the sum of all of them.
+"""
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from database import SessionLocal
+from models.concept import ConceptNote
+from models.idea import Idea
+from models.mindmap import Mindmap
+from models.project import Project
+from models.project_idea import project_ideas
+from models.task import Task
+from schemas.concept import ConceptNote as ConceptNoteSchema
+from schemas.idea import IdeaResponse
+from schemas.mindmap import MindmapResponse
+from schemas.project import Project as ProjectSchema
+from schemas.task import TaskResponse
+from services.mindmap_patches import load_documents
+from services.project_stats import attach_stats
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("tasks", "ideas", "concepts", "mindmaps")
+
+
+def parse_include(include: str) -> List[str]:
+    """Split ``include`` into known section names; raises ``ValueError`` for unknown ones."""
+    sections = []
+    for name in (part.strip() for part in include.split(",")):
+        if not name or name in sections:
+            continue
+        if name not in SECTIONS:
+            raise ValueError(f"Unknown section '{name}', expected one of: {', '.join(SECTIONS)}")
+        sections.append(name)
+    return sections
+
+
+def load_project(db: Session, project_id: int, owner_id: int) -> Optional[Dict]:
+    project = db.query(Project).options(joinedload(Project.stats)).filter(
+        Project.id == project_id,
+        Project.owner_id == owner_id,
+        Project.deleted_at.is_(None)
+    ).first()
+    if project is None:
+        return None
+    attach_stats(db, [project])
+    return ProjectSchema.model_validate(project, from_attributes=True).model_dump(mode="json")
+
+
+def _section_query(db: Session, name: str, project_id: int):
+    if name == "tasks":
+        query = db.query(Task).filter(Task.project_id == project_id)
+        return query.order_by(Task.created_at.desc(), Task.id.desc()), TaskResponse
+    if name == "ideas":
+        query = db.query(Idea).join(project_ideas, project_ideas.c.idea_id == Idea.id).filter(
+            project_ideas.c.project_id == project_id
+        ).options(selectinload(Idea.tags)).order_by(project_ideas.c.created_at.desc(), Idea.id.desc())
+        return query, IdeaResponse
+    if name == "concepts":
+        query = db.query(ConceptNote).filter(ConceptNote.project_id == project_id)
+        return query.order_by(ConceptNote.created_at.desc(), ConceptNote.id.desc()), ConceptNoteSchema
+    return db.query(Mindmap).filter(Mindmap.project_id == project_id).order_by(Mindmap.id.desc()), MindmapResponse
+
+
+def load_section(db: Session, name: str, project_id: int, limit: int) -> Dict:
+    """Newest ``limit`` rows of one section; ``has_more`` tells whether rows were cut off."""
+    query, schema = _section_query(db, name, project_id)
+    rows = query.limit(limit + 1).all()
+    if name == "mindmaps":
+        load_documents(db, rows[:limit])
+    return {
+        "items": [schema.model_validate(row, from_attributes=True).model_dump(mode="json") for row in rows[:limit]],
+        "has_more": len(rows) > limit,
+    }
+
+
+def _load_section_in_session(session_factory: Callable[[], Session], name: str, project_id: int, limit: int) -> Dict:
+    db = session_factory()
+    try:
+        return load_section(db, name, project_id, limit)
+    finally:
+        db.close()
+
+
+async def stream_project(
+    project: Dict,
+    sections: List[str],
+    limit: int,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> AsyncIterator[bytes]:
+    """Yield the JSON object ``{"project": ..., "<section>": {...}, ...}`` piece by piece.
+
+    ``session_factory`` should bind to the request's database (see the
+    router). If the client goes away the pending sections are cancelled, but
+    a worker thread cannot be interrupted: a query already running finishes
+    and its rows are dropped. Each is a single query of at most ``limit + 1``
+    rows, which bounds that work.
+    """
+    async def run(name: str):
+        try:
+            return name, await asyncio.to_thread(_load_section_in_session, session_factory, name, project["id"], limit)
+        except Exception as e:
+            logger.error(f"Failed to load {name} of project {project['id']}: {e}", exc_info=True)
+            # Headers are already sent, so report the failure inside the body
+            return name, {"error": f"Failed to load {name}"}
+
+    pending = [asyncio.ensure_future(run(name)) for name in sections]
+    try:
+        yield b'{"project":' + json.dumps(project).encode()
+        for finished in asyncio.as_completed(pending):
+            name, section = await finished
+            yield f',"{name}":'.encode() + json.dumps(section).encode()
+        yield b"}"
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,138 @@
+"""Denormalized per-project counters.
+
+``project_stats`` holds one row per project with its task counts by status,
+linked ideas, concept notes and the time of the last change to any of them,
+so project cards do not have to load every child row. Single-row writes
+adjust the counters with relative UPDATEs in the same transaction as the
+change itself; set-based writes (bulk task updates) recount the affected
+projects instead. Rows missing for projects created before the counters
+existed are computed on read and stored by the project's next write.
+
+Callers apply their change to the session first and commit afterwards.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.concept import ConceptNote
+from models.project import Project
+from models.project_idea import project_ideas
+from models.project_stats import ProjectStats
+from models.task import Task, TaskStatus
+
+STATUS_COLUMNS = {
+    TaskStatus.TODO: "tasks_todo",
+    TaskStatus.IN_PROGRESS: "tasks_in_progress",
+    TaskStatus.DONE: "tasks_done",
+}
+
+
+def _status_column(status) -> str:
+    return STATUS_COLUMNS[TaskStatus(status) if status is not None else TaskStatus.TODO]
+
+
+def adjust(db: Session, project_id: Optional[int], **deltas: int) -> None:
+    """Add ``deltas`` (column name -> change) to a project's counters and mark it active."""
+    if project_id is None:
+        return
+    values = {
+        getattr(ProjectStats, column): getattr(ProjectStats, column) + delta
+        for column, delta in deltas.items() if delta
+    }
+    values[ProjectStats.last_activity_at] = datetime.utcnow()
+    updated = db.query(ProjectStats).filter(
+        ProjectStats.project_id == project_id
+    ).update(values, synchronize_session=False)
+    if not updated:
+        recount(db, [project_id], activity_at=datetime.utcnow())
+
+
+def task_changed(
+    db: Session,
+    old_project_id: Optional[int],
+    old_status,
+    new_project_id: Optional[int],
+    new_status,
+) -> None:
+    """Move one task between status (and project) buckets; pass ``None`` projects for inserts and deletes."""
+    old_column, new_column = _status_column(old_status), _status_column(new_status)
+    if old_project_id == new_project_id:
+        if old_column == new_column:
+            adjust(db, new_project_id)
+        else:
+            adjust(db, new_project_id, **{old_column: -1, new_column: 1})
+        return
+    adjust(db, old_project_id, **{old_column: -1})
+    adjust(db, new_project_id, **{new_column: 1})
+
+
+def _count(db: Session, project_ids: Iterable[int]) -> Dict[int, ProjectStats]:
+    """Counters of ``project_ids`` computed from the child tables, as unsaved rows."""
+    db.flush()
+    projects = dict(db.query(Project.id, Project.updated_at).filter(Project.id.in_(project_ids)))
+    stats = {project_id: ProjectStats(project_id=project_id, tasks_todo=0, tasks_in_progress=0, tasks_done=0,
+                                      idea_count=0, concept_note_count=0, last_activity_at=updated_at)
+             for project_id, updated_at in projects.items()}
+
+    def touch(project_id, timestamp):
+        if timestamp is not None and (stats[project_id].last_activity_at is None
+                                      or timestamp > stats[project_id].last_activity_at):
+            stats[project_id].last_activity_at = timestamp
+
+    rows = db.query(Task.project_id, Task.status, func.count(Task.id), func.max(Task.updated_at)).filter(
+        Task.project_id.in_(projects)
+    ).group_by(Task.project_id, Task.status)
+    for project_id, status, count, updated_at in rows:
+        setattr(stats[project_id], _status_column(status), count)
+        touch(project_id, updated_at)
+
+    rows = db.query(project_ideas.c.project_id, func.count(), func.max(project_ideas.c.created_at)).filter(
+        project_ideas.c.project_id.in_(projects)
+    ).group_by(project_ideas.c.project_id)
+    for project_id, count, created_at in rows:
+        stats[project_id].idea_count = count
+        touch(project_id, created_at)
+
+    rows = db.query(ConceptNote.project_id, func.count(ConceptNote.id), func.max(ConceptNote.updated_at)).filter(
+        ConceptNote.project_id.in_(projects)
+    ).group_by(ConceptNote.project_id)
+    for project_id, count, updated_at in rows:
+        stats[project_id].concept_note_count = count
+        touch(project_id, updated_at)
+    return stats
+
+
+def recount(db: Session, project_ids: Iterable[int], activity_at: Optional[datetime] = None) -> Dict[int, ProjectStats]:
+    """Rebuild and store the counters of ``project_ids``.
+
+    ``last_activity_at`` is set to ``activity_at``, or derived from the newest
+    child or project timestamp when not given.
+    """
+    project_ids = {project_id for project_id in project_ids if project_id is not None}
+    if not project_ids:
+        return {}
+    stats = _count(db, project_ids)
+    for project_id, row in stats.items():
+        if activity_at is not None:
+            row.last_activity_at = activity_at
+        stats[project_id] = db.merge(row)
+    return stats
+
+
+def attach_stats(db: Session, projects: List[Project]) -> List[Project]:
+    """Make sure every project in ``projects`` carries its counters.
+
+    Projects are expected to be loaded with ``joinedload(Project.stats)``;
+    rows missing for older projects are computed on the fly (and stored by
+    the project's next write).
+    """
+    missing = [project.id for project in projects if project.stats is None]
+    if missing:
+        computed = _count(db, missing)
+        for project in projects:
+            if project.id in computed:
+                set_committed_value(project, "stats", computed[project.id])
+    return projects
@@ -0,0 +1,194 @@
+"""Chunked deletion of large projects and user accounts.
+
+Small projects are deleted with a single statement and ``ON DELETE CASCADE``.
+Deleting a project with thousands of tasks that way, or a whole account,
+would hold SQLite's write lock for the entire cascade, so these are recorded
+as a ``PurgeJob`` and deleted children-first in batches of
+``MAINTENANCE_DELETE_CHUNK_SIZE`` rows, committing after every batch. The job
+starts right after the request returns and the ``run_purges`` maintenance job
+resumes any purge interrupted by a restart; every step is idempotent.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Column, Table, select
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from database import SessionLocal
+from models.activity import Activity, JournalEntry
+from models.concept import ConceptNote
+from models.concept_revision import ConceptNoteRevision
+from models.development import Goal, GoalProgress, Habit, HabitTracking
+from models.idea import Idea
+from models.journal_stats import JournalDailyStats
+from models.maintenance import PurgeJob
+from models.mindmap import Mindmap
+from models.mindmap_graph import MindmapEdge, MindmapNode
+from models.mindmap_operation import MindmapOperation
+from models.password_reset import PasswordReset
+from models.profile import Profile
+from models.project import Project
+from models.project_idea import project_ideas
+from models.project_stats import ProjectStats
+from models.refresh_token import RefreshToken
+from models.task import Task
+from models.task_dependency import TaskDependency, TaskSchedule
+from models.tag_usage import TagUsage
+from models.tagging import TagPosting, Tagging
+from models.task_recurrence import TaskOccurrenceException, TaskRecurrence
+from models.user import User
+from services.tag_index import tag_suggester
+from services.tagging import untag
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PurgeStep:
+    """Rows of ``column.table`` whose ``column`` equals the target id, deleted in
+    chunks after the rows that reference them through ``dependents``. Rows of
+    a taggable ``entity_type`` have their taggings dropped with ``untag``."""
+    column: Column
+    dependents: Sequence[Column] = ()
+    entity_type: Optional[str] = None
+
+    @property
+    def table(self) -> Table:
+        return self.column.table
+
+
+TASK_DEPENDENTS = (
+    TaskDependency.task_id,
+    TaskDependency.depends_on_id,
+    TaskSchedule.task_id,
+    TaskOccurrenceException.task_id,
+    TaskRecurrence.task_id,
+)
+
+PROJECT_STEPS = [
+    PurgeStep(Task.project_id, TASK_DEPENDENTS, "task"),
+    PurgeStep(ConceptNote.project_id, (ConceptNoteRevision.concept_id,), "concept"),
+    PurgeStep(Mindmap.project_id, (MindmapOperation.mindmap_id, MindmapEdge.mindmap_id, MindmapNode.mindmap_id)),
+    PurgeStep(TaskDependency.project_id),
+    PurgeStep(TaskSchedule.project_id),
+]
+# Bounded per project; deleted in one statement each before the project row
+PROJECT_TAIL = [project_ideas.c.project_id, ProjectStats.project_id]
+
+USER_STEPS = [
+    PurgeStep(Tagging.user_id),
+    PurgeStep(Task.user_id, TASK_DEPENDENTS),
+    PurgeStep(ConceptNote.user_id, (ConceptNoteRevision.concept_id,)),
+    PurgeStep(Idea.user_id, (project_ideas.c.idea_id,)),
+    PurgeStep(Activity.user_id),
+    PurgeStep(JournalEntry.user_id),
+    PurgeStep(Goal.user_id, (GoalProgress.goal_id,)),
+    PurgeStep(Habit.user_id, (HabitTracking.habit_id,)),
+    PurgeStep(RefreshToken.user_id),
+    PurgeStep(PasswordReset.user_id),
+    PurgeStep(Profile.user_id),
+]
+# Composite primary keys, bounded by the number of tags; one statement each
+USER_TAIL = [TagUsage.user_id, TagPosting.user_id, JournalDailyStats.user_id]
+
+
+def purge_rows(db: Session, step: PurgeStep, target_id: int, chunk_size: int) -> int:
+    """Delete the rows of ``step`` for ``target_id`` one chunk (and one commit) at a time."""
+    table = step.table
+    key, = table.primary_key.columns
+    deleted = 0
+    while True:
+        ids = db.execute(select(key).where(step.column == target_id).limit(chunk_size)).scalars().all()
+        if not ids:
+            return deleted
+        users = untag(db, step.entity_type, ids) if step.entity_type else set()
+        for dependent in step.dependents:
+            db.execute(dependent.table.delete().where(dependent.in_(ids)))
+        db.execute(table.delete().where(key.in_(ids)))
+        db.commit()
+        for user_id in users:
+            tag_suggester.forget(user_id)
+        deleted += len(ids)
+
+
+def purge_project(db: Session, project_id: int, chunk_size: int) -> int:
+    deleted = sum(purge_rows(db, step, project_id, chunk_size) for step in PROJECT_STEPS)
+    for column in PROJECT_TAIL:
+        db.execute(column.table.delete().where(column == project_id))
+    deleted += db.execute(Project.__table__.delete().where(Project.id == project_id)).rowcount
+    db.commit()
+    return deleted
+
+
+def purge_user(db: Session, user_id: int, chunk_size: int) -> int:
+    deleted = 0
+    for project_id in db.execute(select(Project.id).where(Project.owner_id == user_id)).scalars().all():
+        deleted += purge_project(db, project_id, chunk_size)
+    deleted += sum(purge_rows(db, step, user_id, chunk_size) for step in USER_STEPS)
+    for column in USER_TAIL:
+        db.execute(column.table.delete().where(column == user_id))
+    deleted += db.execute(User.__table__.delete().where(User.id == user_id)).rowcount
+    db.commit()
+    return deleted
+
+
+PURGES = {"project": purge_project, "user": purge_user}
+
+
+def schedule_purge(db: Session, kind: str, target_id: int) -> PurgeJob:
+    """Record a purge; the caller commits and then runs it with ``run_purge_job``."""
+    job = PurgeJob(kind=kind, target_id=target_id, deleted_rows=0)
+    db.add(job)
+    db.flush()
+    return job
+
+
+def run_purge(db: Session, job: PurgeJob, chunk_size: int = settings.MAINTENANCE_DELETE_CHUNK_SIZE) -> int:
+    job_id = job.id
+    try:
+        deleted = PURGES[job.kind](db, job.target_id, chunk_size)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Purge {job_id} failed: {e}", exc_info=True)
+        db.query(PurgeJob).filter(PurgeJob.id == job_id).update({PurgeJob.last_error: str(e)})
+        db.commit()
+        raise
+    db.query(PurgeJob).filter(PurgeJob.id == job_id).update({
+        PurgeJob.deleted_rows: PurgeJob.deleted_rows + deleted,
+        PurgeJob.finished_at: datetime.utcnow(),
+        PurgeJob.last_error: None,
+    })
+    db.commit()
+    return deleted
+
+
+def run_purge_job(job_id: int) -> None:
+    """Entry point for ``BackgroundTasks``."""
+    db = SessionLocal()
+    try:
+        job = db.query(PurgeJob).filter(PurgeJob.id == job_id, PurgeJob.finished_at.is_(None)).first()
+        if job is not None:
+            run_purge(db, job)
+    except Exception:
+        # Logged by run_purge; the maintenance job retries it
+        pass
+    finally:
+        db.close()
+
+
+def run_purges(db: Session) -> str:
+    """Maintenance job: finish purges that were interrupted."""
+    # Recent jobs are most likely still running in the worker that accepted them
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.MAINTENANCE_LEASE_SECONDS)
+    jobs: List[PurgeJob] = db.query(PurgeJob).filter(
+        PurgeJob.finished_at.is_(None),
+        PurgeJob.created_at < cutoff
+    ).order_by(PurgeJob.id).all()
+    deleted = 0
+    for job in jobs:
+        deleted += run_purge(db, job)
+    return f"finished {len(jobs)} purges, deleted {deleted} rows"
@@ -0,0 +1,127 @@
+"""Virtual expansion of recurring tasks.
+
+A recurring task is stored once, with a ``TaskRecurrence`` holding its RRULE.
+Occurrences inside a requested window are generated on the fly and merged with
+the ``TaskOccurrenceException`` rows of occurrences that were skipped,
+completed or moved; nothing else is materialized.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from dateutil.rrule import DAILY, MONTHLY, WEEKLY, YEARLY, rrule, rrulestr
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from models.task import Task, TaskStatus
+from models.task_recurrence import TaskOccurrenceException, TaskRecurrence
+
+# Upper bound on occurrences generated per task and request
+MAX_OCCURRENCES = 1000
+ALLOWED_FREQUENCIES = {YEARLY, MONTHLY, WEEKLY, DAILY}
+
+OCCURRENCE_FIELDS = (
+    "id", "user_id", "title", "description", "priority", "project_id",
+    "estimated_hours", "created_at", "updated_at", "tags",
+)
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(rule: str, dtstart: datetime) -> rrule:
+    """Parse an RRULE (``FREQ=WEEKLY;BYDAY=MO`` or ``RRULE:...``); raises ``ValueError``."""
+    parsed = rrulestr(rule, dtstart=dtstart)
+    if not isinstance(parsed, rrule):
+        raise ValueError("Only a single RRULE is supported")
+    if parsed._freq not in ALLOWED_FREQUENCIES:
+        raise ValueError("Recurrence must be daily, weekly, monthly or yearly")
+    return parsed
+
+
+def occurrence_dates(rule: str, dtstart: datetime, start: datetime, end: datetime) -> List[datetime]:
+    """Occurrences of ``rule`` between ``start`` and ``end`` inclusive."""
+    dates = []
+    for date in parse_rule(rule, dtstart).xafter(start, count=MAX_OCCURRENCES, inc=True):
+        if date > end:
+            break
+        dates.append(date)
+    return dates
+
+
+def is_occurrence(recurrence: TaskRecurrence, date: datetime) -> bool:
+    return date in occurrence_dates(recurrence.rule, recurrence.dtstart, date, date)
+
+
+def _occurrence(master: Task, date: datetime, exception: Optional[TaskOccurrenceException]) -> Dict:
+    occurrence = {field: getattr(master, field) for field in OCCURRENCE_FIELDS}
+    occurrence.update({
+        "occurrence_date": date,
+        "due_date": date,
+        "status": TaskStatus.TODO,
+        "completed_at": None,
+    })
+    if exception is not None:
+        if exception.due_date is not None:
+            occurrence["due_date"] = exception.due_date
+        if exception.status is not None:
+            occurrence["status"] = exception.status
+        occurrence["completed_at"] = exception.completed_at
+        if exception.updated_at and exception.updated_at > occurrence["updated_at"]:
+            occurrence["updated_at"] = exception.updated_at
+    return occurrence
+
+
+def expand_task(
+    master: Task,
+    recurrence: TaskRecurrence,
+    exceptions: Iterable[TaskOccurrenceException],
+    start: datetime,
+    end: datetime,
+) -> List[Dict]:
+    """Occurrences of ``master`` whose (possibly moved) due date falls in the window."""
+    by_date = {exception.occurrence_date: exception for exception in exceptions}
+    occurrences = []
+    for date in occurrence_dates(recurrence.rule, recurrence.dtstart, start, end):
+        exception = by_date.pop(date, None)
+        if exception is not None and exception.skipped:
+            continue
+        occurrences.append(_occurrence(master, date, exception))
+    # Occurrences moved into the window from outside it
+    for date, exception in by_date.items():
+        if not exception.skipped and exception.due_date is not None:
+            occurrences.append(_occurrence(master, date, exception))
+    return [o for o in occurrences if start <= o["due_date"] <= end]
+
+
+def expand_occurrences(db: Session, masters: List[Task], start: datetime, end: datetime) -> List[Dict]:
+    """Expand every recurring task in ``masters`` over ``[start, end]``."""
+    if not masters:
+        return []
+    ids = [master.id for master in masters]
+    recurrences = {r.task_id: r for r in db.query(TaskRecurrence).filter(TaskRecurrence.task_id.in_(ids))}
+    exceptions: Dict[int, List[TaskOccurrenceException]] = {}
+    rows = db.query(TaskOccurrenceException).filter(
+        TaskOccurrenceException.task_id.in_(ids),
+        or_(
+            and_(TaskOccurrenceException.occurrence_date >= start, TaskOccurrenceException.occurrence_date <= end),
+            and_(TaskOccurrenceException.due_date >= start, TaskOccurrenceException.due_date <= end)
+        )
+    )
+    for exception in rows:
+        exceptions.setdefault(exception.task_id, []).append(exception)
+
+    occurrences = []
+    for master in masters:
+        recurrence = recurrences.get(master.id)
+        if recurrence is not None:
+            occurrences.extend(expand_task(master, recurrence, exceptions.get(master.id, ()), start, end))
+    return occurrences
+
+
+def delete_recurrences(db: Session, task_ids: Iterable[int]) -> None:
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    db.query(TaskOccurrenceException).filter(
+        TaskOccurrenceException.task_id.in_(task_ids)
+    ).delete(synchronize_session=False)
+    db.query(TaskRecurrence).filter(TaskRecurrence.task_id.in_(task_ids)).delete(synchronize_session=False)
@@ -0,0 +1,362 @@
+"""Due-date and habit reminders.
+
+Upcoming reminders live in an in-memory min-heap ordered by fire time, so the
+engine sleeps until the next one is due instead of polling the tasks table.
+The heap only covers the next ``REMINDER_HORIZON_HOURS``; it is (re)built from
+one range query over ``tasks.due_date`` (plus habits with a reminder time) at
+startup and every ``REMINDER_RELOAD_SECONDS``, and updated in place whenever
+a task or habit changes in this worker.
+
+Workers each keep their own heap. Before a reminder is sent the task or habit
+is re-read and a row is claimed in ``reminder_deliveries``, so stale entries
+are dropped and a reminder is delivered once even with several workers. The
+claim is dropped again if sending fails, leaving the reminder to the next
+reload while it is within the grace period.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from database import SessionLocal
+from models.development import Habit
+from models.reminder import ReminderDelivery
+from models.task import Task, TaskStatus
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+@dataclass
+class Reminder:
+    kind: str  # task, habit
+    target_id: int
+    user_id: int
+    fire_at: datetime
+    title: str
+    due_at: datetime
+    cancelled: bool = field(default=False, compare=False)
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.kind, self.target_id
+
+    def payload(self) -> Dict:
+        return {
+            "type": f"{self.kind}_reminder",
+            f"{self.kind}_id": self.target_id,
+            "user_id": self.user_id,
+            "title": self.title,
+            "due_at": self.due_at.isoformat(),
+            "fire_at": self.fire_at.isoformat(),
+        }
+
+
+class LogNotifier:
+    async def send(self, reminder: Reminder) -> None:
+        logger.info(f"Reminder: {reminder.payload()}")
+
+    async def aclose(self) -> None:
+        pass
+
+
+class WebhookNotifier:
+    """POSTs each reminder as JSON to a URL, e.g. a local notification relay."""
+
+    def __init__(self, url: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url
+        self._client = httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(5.0))
+
+    async def send(self, reminder: Reminder) -> None:
+        response = await self._client.post(self.url, json=reminder.payload())
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def create_notifier():
+    if settings.REMINDER_NOTIFIER == "webhook":
+        return WebhookNotifier(settings.REMINDER_WEBHOOK_URL)
+    return LogNotifier()
+
+
+def task_reminder(task: Task) -> Optional[Reminder]:
+    if task.due_date is None or task.status == TaskStatus.DONE:
+        return None
+    return Reminder(
+        kind="task",
+        target_id=task.id,
+        user_id=task.user_id,
+        fire_at=task.due_date - timedelta(minutes=settings.REMINDER_LEAD_MINUTES),
+        title=task.title,
+        due_at=task.due_date,
+    )
+
+
+def _habit_due_on(habit: Habit, day: date) -> bool:
+    if habit.frequency == "weekly":
+        days = [d.lower() for d in (habit.target_days or [])]
+        if days:
+            return WEEKDAYS[day.weekday()] in days
+        return habit.created_at is None or day.weekday() == habit.created_at.weekday()
+    if habit.frequency == "monthly":
+        return habit.created_at is None or day.day == habit.created_at.day
+    return True
+
+
+def habit_reminder(habit: Habit, after: datetime) -> Optional[Reminder]:
+    """Next reminder of ``habit`` at or after ``after``."""
+    if habit.reminder_time is None:
+        return None
+    reminder_time = habit.reminder_time.replace(tzinfo=None)
+    for offset in range(366):
+        day = after.date() + timedelta(days=offset)
+        fire_at = datetime.combine(day, reminder_time)
+        if fire_at >= after and _habit_due_on(habit, day):
+            return Reminder(kind="habit", target_id=habit.id, user_id=habit.user_id,
+                            fire_at=fire_at, title=habit.name, due_at=fire_at)
+    return None
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        notifier=None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        horizon: timedelta = timedelta(hours=settings.REMINDER_HORIZON_HOURS),
+        grace: timedelta = timedelta(minutes=settings.REMINDER_GRACE_MINUTES),
+        reload_interval: int = settings.REMINDER_RELOAD_SECONDS,
+    ):
+        self.notifier = notifier
+        self.session_factory = session_factory
+        self.horizon = horizon
+        self.grace = grace
+        self.reload_interval = reload_interval
+        self._heap: List[Tuple[datetime, int, Reminder]] = []
+        self._entries: Dict[Tuple[str, int], Reminder] = {}
+        self._counter = itertools.count()
+        # Route handlers call in from the threadpool
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Heap maintenance ---------------------------------------------------
+
+    def schedule(self, reminder: Optional[Reminder], key: Optional[Tuple[str, int]] = None) -> None:
+        """Add or replace the reminder for ``key`` (``None`` removes it)."""
+        key = reminder.key if reminder is not None else key
+        if reminder is not None and reminder.fire_at > datetime.utcnow() + self.horizon:
+            # Picked up by a later reload once it gets close
+            reminder = None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                # Lazy deletion: the heap entry is skipped when popped
+                previous.cancelled = True
+            if reminder is None:
+                return
+            self._entries[key] = reminder
+            earliest = not self._heap or reminder.fire_at < self._heap[0][0]
+            heapq.heappush(self._heap, (reminder.fire_at, next(self._counter), reminder))
+        if earliest:
+            self._wake()
+
+    def cancel(self, kind: str, target_id: int) -> None:
+        self.schedule(None, key=(kind, target_id))
+
+    def task_changed(self, task: Task) -> None:
+        self.schedule(task_reminder(task), key=("task", task.id))
+
+    def tasks_removed(self, task_ids: Iterable[int]) -> None:
+        for task_id in task_ids:
+            self.cancel("task", task_id)
+
+    def refresh_tasks(self, db: Session, task_ids: Iterable[int]) -> None:
+        """Reschedule tasks changed by a bulk statement."""
+        task_ids = list(task_ids)
+        found = set()
+        for task in db.query(Task).filter(Task.id.in_(task_ids)):
+            found.add(task.id)
+            self.task_changed(task)
+        self.tasks_removed(set(task_ids) - found)
+
+    def habit_changed(self, habit: Habit) -> None:
+        self.schedule(habit_reminder(habit, datetime.utcnow()), key=("habit", habit.id))
+
+    def pop_due(self, now: datetime) -> List[Reminder]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, reminder = heapq.heappop(self._heap)
+                if reminder.cancelled:
+                    continue
+                self._entries.pop(reminder.key, None)
+                due.append(reminder)
+        return due
+
+    def next_fire_at(self) -> Optional[datetime]:
+        with self._lock:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    # Loading ------------------------------------------------------------
+
+    def load(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Rebuild the heap from the database: one range scan over due dates plus habits with a reminder."""
+        now = now or datetime.utcnow()
+        lead = timedelta(minutes=settings.REMINDER_LEAD_MINUTES)
+        tasks = db.query(Task).filter(
+            Task.due_date >= now - self.grace + lead,
+            Task.due_date <= now + self.horizon + lead,
+            Task.status != TaskStatus.DONE
+        ).all()
+        habits = db.query(Habit).filter(Habit.reminder_time.isnot(None)).all()
+
+        reminders = [task_reminder(task) for task in tasks]
+        reminders += [habit_reminder(habit, now - self.grace) for habit in habits]
+        reminders = [r for r in reminders if r is not None and r.fire_at <= now + self.horizon]
+        with self._lock:
+            for reminder in self._entries.values():
+                reminder.cancelled = True
+            self._entries = {r.key: r for r in reminders}
+            self._heap = [(r.fire_at, next(self._counter), r) for r in reminders]
+            heapq.heapify(self._heap)
+        self._wake()
+        return len(reminders)
+
+    def _reload(self) -> int:
+        db = self.session_factory()
+        try:
+            return self.load(db)
+        finally:
+            db.close()
+
+    # Delivery -----------------------------------------------------------
+
+    def claim(self, db: Session, reminder: Reminder) -> bool:
+        """Check the reminder still matches the database and reserve its delivery."""
+        if reminder.kind == "task":
+            task = db.query(Task).filter(Task.id == reminder.target_id).first()
+            current = task_reminder(task) if task is not None else None
+        else:
+            habit = db.query(Habit).filter(Habit.id == reminder.target_id).first()
+            current = habit_reminder(habit, reminder.fire_at) if habit is not None else None
+        if current is None or current.fire_at != reminder.fire_at:
+            return False
+        try:
+            db.add(ReminderDelivery(kind=reminder.kind, target_id=reminder.target_id, fire_at=reminder.fire_at))
+            db.commit()
+            return True
+        except IntegrityError:
+            # Already delivered by another worker
+            db.rollback()
+            return False
+
+    def _claim(self, reminder: Reminder) -> Tuple[bool, Optional[Reminder]]:
+        db = self.session_factory()
+        try:
+            claimed = self.claim(db, reminder)
+            following = None
+            if reminder.kind == "habit":
+                habit = db.query(Habit).filter(Habit.id == reminder.target_id).first()
+                if habit is not None:
+                    following = habit_reminder(habit, reminder.fire_at + timedelta(seconds=1))
+            return claimed, following
+        finally:
+            db.close()
+
+    def _release(self, reminder: Reminder) -> None:
+        """Drop the claim of a reminder that could not be sent, so a later reload retries it."""
+        db = self.session_factory()
+        try:
+            db.query(ReminderDelivery).filter(
+                ReminderDelivery.kind == reminder.kind,
+                ReminderDelivery.target_id == reminder.target_id,
+                ReminderDelivery.fire_at == reminder.fire_at
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    async def deliver(self, reminder: Reminder) -> bool:
+        claimed, following = await asyncio.to_thread(self._claim, reminder)
+        if following is not None:
+            self.schedule(following)
+        if not claimed:
+            return False
+        try:
+            await self.notifier.send(reminder)
+        except Exception as e:
+            logger.error(f"Failed to send {reminder.kind} reminder {reminder.target_id}: {e}")
+            await asyncio.to_thread(self._release, reminder)
+            return False
+        return True
+
+    # Event loop ---------------------------------------------------------
+
+    def _wake(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        if self.notifier is None:
+            self.notifier = create_notifier()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+        await self.notifier.aclose()
+
+    async def _run(self) -> None:
+        reload_at = datetime.min
+        while True:
+            now = datetime.utcnow()
+            try:
+                if now >= reload_at:
+                    loaded = await asyncio.to_thread(self._reload)
+                    logger.debug(f"Loaded {loaded} reminders")
+                    reload_at = now + timedelta(seconds=self.reload_interval)
+                for reminder in self.pop_due(now):
+                    await self.deliver(reminder)
+            except Exception as e:
+                logger.error(f"Reminder loop failed: {e}", exc_info=True)
+
+            next_fire = self.next_fire_at()
+            wake_at = min(next_fire, reload_at) if next_fire else reload_at
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max((wake_at - datetime.utcnow()).total_seconds(), 0))
+            except asyncio.TimeoutError:
+                pass
+
+
+reminder_scheduler = ReminderScheduler()
@@ -0,0 +1,156 @@
+"""Per-user tag usage counts and prefix autocomplete.
+
+``tag_usage`` counts, per user and tag, the items carrying the tag and when
+it was last applied; ``services.tagging`` keeps it current through ``adjust_usage``.
+Suggestions are served from an in-memory index per user: tag names sorted
+case-insensitively, so the tags starting with a prefix are one ``bisect``
+away. Indexes are loaded on first use, updated in place by this worker's
+writes and reloaded after ``TAG_INDEX_TTL_SECONDS`` to pick up other workers'.
+"""
+import heapq
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models.idea import Tag
+from models.tag_usage import TagUsage
+
+settings = get_settings()
+
+
+@dataclass
+class TagSuggestion:
+    name: str
+    count: int
+    last_used_at: Optional[datetime]
+
+
+def score(count: int, last_used_at: Optional[datetime], now: datetime) -> float:
+    """Usage count decayed by half every ``TAG_RECENCY_HALF_LIFE_DAYS`` since last use."""
+    if last_used_at is None:
+        return float(count)
+    age_days = max((now - last_used_at).total_seconds(), 0) / 86400
+    return count * math.pow(0.5, age_days / settings.TAG_RECENCY_HALF_LIFE_DAYS)
+
+
+class TagPrefixIndex:
+    """One user's tags, sorted by lowercased name for prefix lookups."""
+
+    def __init__(self, usages: Iterable[Tuple[str, int, Optional[datetime]]] = ()):
+        self._keys: List[Tuple[str, str]] = []
+        self._usage: Dict[str, Tuple[int, Optional[datetime]]] = {}
+        for name, count, last_used_at in usages:
+            if count > 0:
+                self._usage[name] = (count, last_used_at)
+        self._keys = sorted((name.lower(), name) for name in self._usage)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def apply(self, name: str, delta: int, used_at: Optional[datetime] = None) -> None:
+        count, last_used_at = self._usage.get(name, (0, None))
+        count += delta
+        if used_at is not None:
+            last_used_at = used_at
+        key = (name.lower(), name)
+        if count <= 0:
+            if self._usage.pop(name, None) is not None:
+                del self._keys[bisect_left(self._keys, key)]
+            return
+        if name not in self._usage:
+            insort(self._keys, key)
+        self._usage[name] = (count, last_used_at)
+
+    def suggest(self, prefix: str, limit: int, now: Optional[datetime] = None) -> List[TagSuggestion]:
+        now = now or datetime.utcnow()
+        prefix = prefix.lower()
+        start = bisect_left(self._keys, (prefix,))
+        matches = []
+        for lowered, name in self._keys[start:]:
+            if not lowered.startswith(prefix):
+                break
+            matches.append(name)
+        best = heapq.nlargest(
+            limit, matches,
+            key=lambda name: (score(*self._usage[name], now), self._usage[name][0], name)
+        )
+        return [TagSuggestion(name, *self._usage[name]) for name in best]
+
+
+class TagSuggester:
+    """LRU of per-user ``TagPrefixIndex`` instances."""
+
+    def __init__(self, max_users: int = settings.TAG_INDEX_MAX_USERS, ttl: float = settings.TAG_INDEX_TTL_SECONDS):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._indexes: "OrderedDict[int, Tuple[float, TagPrefixIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, user_id: int) -> TagPrefixIndex:
+        rows = db.query(Tag.name, TagUsage.count, TagUsage.last_used_at).join(
+            TagUsage, TagUsage.tag_id == Tag.id
+        ).filter(TagUsage.user_id == user_id)
+        return TagPrefixIndex(rows)
+
+    def index(self, db: Session, user_id: int) -> TagPrefixIndex:
+        with self._lock:
+            cached = self._indexes.get(user_id)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                self._indexes.move_to_end(user_id)
+                return cached[1]
+        index = self._load(db, user_id)
+        with self._lock:
+            self._indexes[user_id] = (time.monotonic(), index)
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+        return index
+
+    def suggest(self, db: Session, user_id: int, prefix: str, limit: int) -> List[TagSuggestion]:
+        index = self.index(db, user_id)
+        with self._lock:
+            return index.suggest(prefix, limit)
+
+    def apply(self, user_id: int, deltas: Dict[str, int], used_at: datetime) -> None:
+        """Mirror committed usage changes into a cached index."""
+        with self._lock:
+            cached = self._indexes.get(user_id)
+            if cached is None:
+                return
+            for name, delta in deltas.items():
+                cached[1].apply(name, delta, used_at if delta > 0 else None)
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._indexes.pop(user_id, None)
+
+
+tag_suggester = TagSuggester()
+
+
+def adjust_usage(db: Session, user_id: int, deltas: Dict[int, int], used_at: Optional[datetime] = None) -> None:
+    """Add ``deltas`` (tag id -> change) to the user's usage counts; positive
+    changes also mark the tag as used at ``used_at``. Does not commit."""
+    used_at = used_at or datetime.utcnow()
+    for tag_id, delta in deltas.items():
+        if not delta:
+            continue
+        values = {TagUsage.count: TagUsage.count + delta}
+        if delta > 0:
+            values[TagUsage.last_used_at] = used_at
+        updated = db.query(TagUsage).filter(
+            TagUsage.user_id == user_id,
+            TagUsage.tag_id == tag_id
+        ).update(values, synchronize_session=False)
+        if not updated and delta > 0:
+            db.add(TagUsage(user_id=user_id, tag_id=tag_id, count=delta, last_used_at=used_at))
+    db.flush()
+    db.query(TagUsage).filter(TagUsage.user_id == user_id, TagUsage.count <= 0).delete(synchronize_session=False)
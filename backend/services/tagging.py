@@ -0,0 +1,280 @@
+"""Tags on tasks, ideas, journal entries and concept notes.
+
+Every tag application is a row in ``taggings``. Next to it, ``tag_postings``
+keeps one bitset per (user, tag, entity type) with bit ``n`` set when entity
+``n`` carries the tag, stored as a Python integer's little-endian bytes
+compressed with zlib. Tag filters combine those bitsets with ``&``, ``|`` and
+``~`` and only the resulting ids are looked up, so a query over several tags
+costs a handful of primary-key reads however many items carry each tag.
+
+Postings are updated in the transaction that changes the taggings, after the
+``taggings`` rows are written: on SQLite that write already holds the
+database's write lock, so the read-modify-write of the bitset cannot race
+another writer. Taggings of rows removed by ``ON DELETE CASCADE`` (a project
+with its tasks and concept notes) are cleaned up by ``prune_taggings``.
+"""
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models.activity import JournalEntry
+from models.concept import ConceptNote
+from models.idea import Idea, Tag
+from models.tagging import TagPosting, Tagging
+from models.task import Task
+from services.tag_index import adjust_usage, tag_suggester
+
+settings = get_settings()
+
+ENTITY_MODELS = {
+    "task": Task,
+    "idea": Idea,
+    "journal": JournalEntry,
+    "concept": ConceptNote,
+}
+
+
+def encode_bitmap(bits: int) -> bytes:
+    return zlib.compress(bits.to_bytes((bits.bit_length() + 7) // 8, "little"))
+
+
+def decode_bitmap(data: Optional[bytes]) -> int:
+    return int.from_bytes(zlib.decompress(data), "little") if data else 0
+
+
+def bitmap_from_ids(ids: Iterable[int]) -> int:
+    ids = list(ids)
+    if not ids:
+        return 0
+    # Setting bits on a bytearray stays linear; ``bits |= 1 << n`` copies the integer every time
+    data = bytearray(max(ids) // 8 + 1)
+    for entity_id in ids:
+        data[entity_id >> 3] |= 1 << (entity_id & 7)
+    return int.from_bytes(data, "little")
+
+
+def bitmap_ids(bits: int, descending: bool = True) -> List[int]:
+    """Positions of the set bits, newest (highest) id first by default."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    ids = []
+    for offset, byte in enumerate(data):
+        if byte:
+            base = offset * 8
+            ids.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    if descending:
+        ids.reverse()
+    return ids
+
+
+def get_or_create_tags(db: Session, names: Iterable[str]) -> List[Tag]:
+    """``Tag`` rows for ``names`` in order, without blanks or duplicates."""
+    wanted = []
+    for name in names:
+        name = name.strip()
+        if name and name not in wanted:
+            wanted.append(name)
+    if not wanted:
+        return []
+    existing = {tag.name: tag for tag in db.query(Tag).filter(Tag.name.in_(wanted))}
+    tags = []
+    for name in wanted:
+        tag = existing.get(name)
+        if tag is None:
+            tag = Tag(name=name)
+            db.add(tag)
+        tags.append(tag)
+    db.flush()
+    return tags
+
+
+def _write_postings(db: Session, user_id: int, entity_type: str, changes: Dict[int, Tuple[Set[int], Set[int]]]) -> None:
+    """Apply ``tag_id -> (ids to set, ids to clear)`` to the user's postings of ``entity_type``."""
+    if not changes:
+        return
+    rows = {
+        row.tag_id: row for row in db.query(TagPosting).filter(
+            TagPosting.user_id == user_id,
+            TagPosting.entity_type == entity_type,
+            TagPosting.tag_id.in_(changes)
+        )
+    }
+    for tag_id, (added, removed) in changes.items():
+        row = rows.get(tag_id)
+        bits = decode_bitmap(row.bitmap) if row is not None else 0
+        bits = (bits | bitmap_from_ids(added)) & ~bitmap_from_ids(removed)
+        if not bits:
+            if row is not None:
+                db.delete(row)
+            continue
+        if row is None:
+            row = TagPosting(user_id=user_id, tag_id=tag_id, entity_type=entity_type)
+            db.add(row)
+        row.bitmap = encode_bitmap(bits)
+        row.cardinality = bin(bits).count("1")
+    db.flush()
+
+
+def set_tags(db: Session, user_id: int, entity_type: str, entity_id: int, names: Iterable[str]) -> Dict[str, int]:
+    """Replace the tags of one entity with ``names``.
+
+    Flushes but does not commit; returns the usage deltas by tag name to pass
+    to ``tag_suggester.apply`` once the transaction is committed.
+    """
+    tags = {tag.id: tag for tag in get_or_create_tags(db, names)}
+    current = {
+        tagging.tag_id: tagging for tagging in db.query(Tagging).filter(
+            Tagging.entity_type == entity_type,
+            Tagging.entity_id == entity_id
+        )
+    }
+    added = [tag_id for tag_id in tags if tag_id not in current]
+    removed = [tag_id for tag_id in current if tag_id not in tags]
+    if not added and not removed:
+        return {}
+    for tag_id in removed:
+        db.delete(current[tag_id])
+    now = datetime.utcnow()
+    db.add_all(
+        Tagging(user_id=user_id, tag_id=tag_id, entity_type=entity_type, entity_id=entity_id, created_at=now)
+        for tag_id in added
+    )
+    db.flush()
+    changes = {tag_id: ({entity_id}, set()) for tag_id in added}
+    changes.update({tag_id: (set(), {entity_id}) for tag_id in removed})
+    _write_postings(db, user_id, entity_type, changes)
+
+    deltas = {tag_id: 1 for tag_id in added}
+    deltas.update({tag_id: -1 for tag_id in removed})
+    adjust_usage(db, user_id, deltas, now)
+    names_by_id = dict(db.query(Tag.id, Tag.name).filter(Tag.id.in_(removed))) if removed else {}
+    names_by_id.update({tag_id: tag.name for tag_id, tag in tags.items()})
+    return {names_by_id[tag_id]: delta for tag_id, delta in deltas.items()}
+
+
+def remove_taggings(db: Session, condition) -> Set[int]:
+    """Delete the taggings matching ``condition`` and update postings and usage counts.
+
+    Returns the ids of the users whose tags changed; their cached suggestion
+    indexes should be dropped with ``tag_suggester.forget`` after commit.
+    """
+    rows = db.query(Tagging.id, Tagging.user_id, Tagging.tag_id, Tagging.entity_type, Tagging.entity_id).filter(
+        condition
+    ).all()
+    if not rows:
+        return set()
+    db.query(Tagging).filter(Tagging.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+    postings: Dict[Tuple[int, str], Dict[int, Tuple[Set[int], Set[int]]]] = defaultdict(dict)
+    usage: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for row in rows:
+        postings[row.user_id, row.entity_type].setdefault(row.tag_id, (set(), set()))[1].add(row.entity_id)
+        usage[row.user_id][row.tag_id] -= 1
+    for (user_id, entity_type), changes in postings.items():
+        _write_postings(db, user_id, entity_type, changes)
+    for user_id, deltas in usage.items():
+        adjust_usage(db, user_id, deltas)
+    return set(usage)
+
+
+def untag(db: Session, entity_type: str, entity_ids: Sequence[int]) -> Set[int]:
+    """Drop all tags of deleted entities; see ``remove_taggings``."""
+    if not entity_ids:
+        return set()
+    return remove_taggings(db, and_(Tagging.entity_type == entity_type, Tagging.entity_id.in_(entity_ids)))
+
+
+def _postings(db: Session, user_id: int, entity_type: str, tag_ids: Iterable[int]) -> Dict[int, int]:
+    rows = db.query(TagPosting.tag_id, TagPosting.bitmap).filter(
+        TagPosting.user_id == user_id,
+        TagPosting.entity_type == entity_type,
+        TagPosting.tag_id.in_(list(tag_ids))
+    )
+    return {tag_id: decode_bitmap(bitmap) for tag_id, bitmap in rows}
+
+
+def match(
+    db: Session,
+    user_id: int,
+    entity_type: str,
+    all_tags: Sequence[str] = (),
+    any_tags: Sequence[str] = (),
+    not_tags: Sequence[str] = (),
+) -> int:
+    """Bitset of the user's ``entity_type`` ids tagged with every tag in
+    ``all_tags``, at least one in ``any_tags`` and none in ``not_tags``."""
+    names = set(all_tags) | set(any_tags) | set(not_tags)
+    tag_ids = dict(db.query(Tag.name, Tag.id).filter(Tag.name.in_(names))) if names else {}
+    if any(name not in tag_ids for name in all_tags):
+        return 0
+    postings = _postings(db, user_id, entity_type, tag_ids.values())
+
+    def posting(name: str) -> int:
+        return postings.get(tag_ids.get(name), 0)
+
+    if all_tags or any_tags:
+        bits = -1
+        for name in all_tags:
+            bits &= posting(name)
+        if any_tags:
+            either = 0
+            for name in any_tags:
+                either |= posting(name)
+            bits &= either
+    else:
+        # Only exclusions: start from every entity of the user
+        model = ENTITY_MODELS[entity_type]
+        bits = bitmap_from_ids(db.execute(select(model.id).where(model.user_id == user_id)).scalars())
+    for name in not_tags:
+        bits &= ~posting(name)
+    return bits
+
+
+def search(
+    db: Session,
+    user_id: int,
+    entity_type: str,
+    all_tags: Sequence[str] = (),
+    any_tags: Sequence[str] = (),
+    not_tags: Sequence[str] = (),
+    limit: int = 50,
+) -> Tuple[List[int], int]:
+    """Newest ``limit`` matching ids (that still exist) and the total match count."""
+    ids = bitmap_ids(match(db, user_id, entity_type, all_tags, any_tags, not_tags))
+    model = ENTITY_MODELS[entity_type]
+    page: List[int] = []
+    # Postings can briefly hold ids of rows removed by a cascade
+    for start in range(0, len(ids), limit):
+        chunk = ids[start:start + limit]
+        existing = set(db.execute(
+            select(model.id).where(model.id.in_(chunk), model.user_id == user_id)
+        ).scalars())
+        page.extend(entity_id for entity_id in chunk if entity_id in existing)
+        if len(page) >= limit:
+            break
+    return page[:limit], len(ids)
+
+
+def prune_taggings(db: Session) -> str:
+    """Maintenance job: drop taggings whose entity was deleted by a cascade."""
+    removed = 0
+    users: Set[int] = set()
+    for entity_type, model in ENTITY_MODELS.items():
+        while True:
+            ids = db.execute(
+                select(Tagging.id).where(
+                    Tagging.entity_type == entity_type,
+                    ~select(model.id).where(model.id == Tagging.entity_id).exists()
+                ).limit(settings.MAINTENANCE_DELETE_CHUNK_SIZE)
+            ).scalars().all()
+            if not ids:
+                break
+            users |= remove_taggings(db, Tagging.id.in_(ids))
+            db.commit()
+            removed += len(ids)
+    for user_id in users:
+        tag_suggester.forget(user_id)
+    return f"removed {removed} stale taggings"
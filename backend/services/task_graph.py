@@ -0,0 +1,371 @@
+"""Task dependency graph and critical-path scheduling.
+
+Schedules are expressed in hours from the project's start date. The forward
+pass gives every task its earliest start/finish, the backward pass its latest
+start/finish given its successors, the project end and the task's own due
+date; tasks without slack form the critical path.
+
+Recomputation is incremental: a changed edge or duration only re-runs the
+forward pass over the descendants of the affected task, and the backward
+pass over the ancestors, unless the project end moves (then every latest
+time shifts and the backward pass covers the whole graph). ``update_schedule``
+loads only that part of the graph, found with recursive queries over the
+edges, plus its direct neighbours.
+"""
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from models.project import Project
+from models.task import Task
+from models.task_dependency import TaskDependency, TaskSchedule
+
+DEFAULT_ESTIMATE_HOURS = 1.0
+EPSILON = 1e-9
+# Beyond this many affected tasks the whole project loads faster than long IN lists
+MAX_SUBGRAPH_TASKS = 2000
+
+
+@dataclass
+class Schedule:
+    earliest_start: float
+    earliest_finish: float
+    latest_start: float
+    latest_finish: float
+
+    @property
+    def slack(self) -> float:
+        return self.latest_start - self.earliest_start
+
+    @property
+    def is_critical(self) -> bool:
+        return self.slack <= EPSILON
+
+
+class TaskGraph:
+    """Directed acyclic graph of tasks; an edge ``(before, after)`` means
+    ``after`` cannot start until ``before`` is finished."""
+
+    def __init__(
+        self,
+        durations: Dict[int, float],
+        edges: Iterable[Tuple[int, int]] = (),
+        deadlines: Optional[Dict[int, float]] = None,
+    ):
+        self.durations = dict(durations)
+        self.deadlines = dict(deadlines or {})
+        self.successors: Dict[int, Set[int]] = defaultdict(set)
+        self.predecessors: Dict[int, Set[int]] = defaultdict(set)
+        for before, after in edges:
+            self.add_edge(before, after)
+
+    def add_edge(self, before: int, after: int) -> None:
+        self.successors[before].add(after)
+        self.predecessors[after].add(before)
+
+    def remove_edge(self, before: int, after: int) -> None:
+        self.successors[before].discard(after)
+        self.predecessors[after].discard(before)
+
+    def _reachable(self, seeds: Iterable[int], adjacency: Dict[int, Set[int]]) -> Set[int]:
+        seen = set(seeds)
+        stack = list(seen)
+        while stack:
+            for neighbour in adjacency.get(stack.pop(), ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+        return seen
+
+    def descendants(self, seeds: Iterable[int]) -> Set[int]:
+        """``seeds`` and every task that (transitively) depends on them."""
+        return self._reachable(seeds, self.successors)
+
+    def ancestors(self, seeds: Iterable[int]) -> Set[int]:
+        """``seeds`` and every task they (transitively) depend on."""
+        return self._reachable(seeds, self.predecessors)
+
+    def creates_cycle(self, before: int, after: int) -> bool:
+        """Whether adding ``before -> after`` would close a cycle."""
+        if before == after:
+            return True
+        return before in self.descendants([after])
+
+    def _ordered(self, nodes: Set[int], incoming: Dict[int, Set[int]], outgoing: Dict[int, Set[int]]) -> List[int]:
+        """Kahn's algorithm restricted to ``nodes``; edges from outside the set are ignored."""
+        pending = {node: sum(1 for other in incoming.get(node, ()) if other in nodes) for node in nodes}
+        ready = deque(node for node, count in pending.items() if count == 0)
+        order = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for other in outgoing.get(node, ()):
+                if other in pending:
+                    pending[other] -= 1
+                    if pending[other] == 0:
+                        ready.append(other)
+        return order
+
+    def compute(
+        self,
+        previous: Optional[Dict[int, Schedule]] = None,
+        forward_seeds: Iterable[int] = (),
+        backward_seeds: Iterable[int] = (),
+        outside_end: Optional[float] = None,
+    ) -> Dict[int, Schedule]:
+        """Return the schedule of every task.
+
+        With ``previous`` only the parts reachable from the seeds are
+        recomputed; tasks missing from ``previous`` are treated as seeds.
+        ``outside_end`` is the latest earliest finish of tasks left out of a
+        partial graph, which the project end includes.
+        """
+        nodes = set(self.durations)
+        previous = {node: schedule for node, schedule in (previous or {}).items() if node in nodes}
+        missing = nodes - previous.keys()
+        if not previous:
+            forward, backward_roots = nodes, nodes
+        else:
+            forward = self.descendants(set(forward_seeds) | missing) & nodes
+            backward_roots = (set(backward_seeds) | missing) & nodes
+
+        schedules = {node: Schedule(**vars(schedule)) for node, schedule in previous.items()}
+        for node in self._ordered(forward, self.predecessors, self.successors):
+            start = max((schedules[p].earliest_finish for p in self.predecessors.get(node, ())), default=0.0)
+            finish = start + self.durations[node]
+            if node in schedules:
+                schedules[node].earliest_start, schedules[node].earliest_finish = start, finish
+            else:
+                schedules[node] = Schedule(start, finish, 0.0, 0.0)
+
+        outside = [] if outside_end is None else [outside_end]
+        end = max([s.earliest_finish for s in schedules.values()] + outside, default=0.0)
+        previous_end = max([s.earliest_finish for s in previous.values()] + outside, default=None)
+        if previous_end is None or abs(end - previous_end) > EPSILON:
+            backward = nodes
+        else:
+            backward = self.ancestors(backward_roots) & nodes
+
+        for node in reversed(self._ordered(backward, self.predecessors, self.successors)):
+            finish = min((schedules[s].latest_start for s in self.successors.get(node, ())), default=end)
+            deadline = self.deadlines.get(node)
+            if deadline is not None:
+                finish = min(finish, deadline)
+            schedules[node].latest_finish = finish
+            schedules[node].latest_start = finish - self.durations[node]
+        return schedules
+
+
+def critical_path(schedules: Dict[int, Schedule]) -> List[int]:
+    return sorted(
+        (node for node, schedule in schedules.items() if schedule.is_critical),
+        key=lambda node: (schedules[node].earliest_start, node)
+    )
+
+
+def _project_start(project: Project) -> datetime:
+    return project.start_date or project.created_at or datetime.utcnow()
+
+
+def _closure(db: Session, project_id: int, seeds: Set[int], downstream: bool) -> Set[int]:
+    """``seeds`` and every task reachable from them along the project's edges
+    (towards dependents when ``downstream``), in one recursive query."""
+    if not seeds:
+        return set()
+    if downstream:
+        source, target = TaskDependency.depends_on_id, TaskDependency.task_id
+    else:
+        source, target = TaskDependency.task_id, TaskDependency.depends_on_id
+    reached = select(target.label("id")).where(
+        TaskDependency.project_id == project_id,
+        source.in_(seeds)
+    ).cte("reached", recursive=True)
+    reached = reached.union(
+        select(target).join(reached, source == reached.c.id).where(TaskDependency.project_id == project_id)
+    )
+    return seeds | {task_id for task_id, in db.execute(select(reached.c.id))}
+
+
+def load_graph(db: Session, project: Project, task_ids: Optional[Set[int]] = None) -> TaskGraph:
+    """The project's graph, or only ``task_ids``, their edges and the tasks at the other end."""
+    edges = db.query(TaskDependency.depends_on_id, TaskDependency.task_id).filter(
+        TaskDependency.project_id == project.id
+    )
+    rows = db.query(Task.id, Task.estimated_hours, Task.due_date).filter(Task.project_id == project.id)
+    if task_ids is not None:
+        edges = edges.filter(or_(
+            TaskDependency.task_id.in_(task_ids),
+            TaskDependency.depends_on_id.in_(task_ids)
+        ))
+    edges = edges.all()
+    if task_ids is not None:
+        rows = rows.filter(Task.id.in_(task_ids.union(*edges)))
+
+    start = _project_start(project)
+    durations, deadlines = {}, {}
+    for task_id, estimate, due_date in rows:
+        durations[task_id] = estimate if estimate is not None else DEFAULT_ESTIMATE_HOURS
+        if due_date is not None:
+            deadlines[task_id] = (due_date - start).total_seconds() / 3600
+    return TaskGraph(durations, edges, deadlines)
+
+
+def _previous(stored: Dict[int, TaskSchedule]) -> Dict[int, Schedule]:
+    return {
+        task_id: Schedule(row.earliest_start, row.earliest_finish, row.latest_start, row.latest_finish)
+        for task_id, row in stored.items()
+    }
+
+
+def _affected_schedules(
+    db: Session,
+    project: Project,
+    forward_seeds: Set[int],
+    backward_seeds: Set[int],
+    removed_finish: Optional[float],
+) -> Optional[Tuple[Dict[int, Schedule], Dict[int, TaskSchedule]]]:
+    """Recompute the seeds' part of the graph, or ``None`` if the whole project is needed."""
+    has_edges = db.query(TaskDependency.id).filter(TaskDependency.project_id == project.id).first() is not None
+    if has_edges:
+        affected = _closure(db, project.id, forward_seeds, True) | _closure(db, project.id, backward_seeds, False)
+    else:
+        # Without edges every task is scheduled on its own
+        affected = forward_seeds | backward_seeds
+    if len(affected) > MAX_SUBGRAPH_TASKS:
+        return None
+
+    graph = load_graph(db, project, affected)
+    stored = {row.task_id: row for row in db.query(TaskSchedule).filter(TaskSchedule.task_id.in_(list(graph.durations)))}
+    outside_end = db.query(func.max(TaskSchedule.earliest_finish)).filter(
+        TaskSchedule.project_id == project.id,
+        TaskSchedule.task_id.notin_(list(graph.durations))
+    ).scalar()
+    previous = _previous(stored)
+    schedules = graph.compute(previous, forward_seeds, backward_seeds, outside_end)
+
+    # A new project end shifts every latest time, not only those loaded here
+    outside = [] if outside_end is None else [outside_end]
+    end = max([s.earliest_finish for s in schedules.values()] + outside, default=0.0)
+    removed = [] if removed_finish is None else [removed_finish]
+    previous_end = max([s.earliest_finish for s in previous.values()] + outside + removed, default=None)
+    if previous_end is None or abs(end - previous_end) > EPSILON:
+        return None
+    return schedules, stored
+
+
+def update_schedule(
+    db: Session,
+    project_id: int,
+    forward_seeds: Iterable[int] = (),
+    backward_seeds: Iterable[int] = (),
+    full: bool = False,
+    removed_finish: Optional[float] = None,
+) -> Dict[int, Schedule]:
+    """Recompute a project's schedule and write back the rows that changed.
+
+    Unless ``full`` is set, only the tasks downstream of ``forward_seeds``
+    and upstream of ``backward_seeds`` are loaded, and the returned schedules
+    cover just those and their neighbours. ``removed_finish`` is the latest
+    earliest finish of tasks taken out of the project since the last update
+    (see ``detach_tasks``), whose rows no longer tell whether the project end
+    moved. The caller commits.
+    """
+    db.flush()
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if project is None:
+        return {}
+    forward_seeds, backward_seeds = set(forward_seeds), set(backward_seeds)
+    partial = None if full else _affected_schedules(db, project, forward_seeds, backward_seeds, removed_finish)
+    if partial is not None:
+        schedules, stored = partial
+    else:
+        graph = load_graph(db, project)
+        stored = {row.task_id: row for row in db.query(TaskSchedule).filter(TaskSchedule.project_id == project_id)}
+        # The project end may have left with removed tasks; start over then
+        from_scratch = full or removed_finish is not None
+        schedules = graph.compute(None if from_scratch else _previous(stored), forward_seeds, backward_seeds)
+
+    inserts, updates = [], []
+    for task_id, schedule in schedules.items():
+        values = {
+            "task_id": task_id,
+            "project_id": project_id,
+            "earliest_start": schedule.earliest_start,
+            "earliest_finish": schedule.earliest_finish,
+            "latest_start": schedule.latest_start,
+            "latest_finish": schedule.latest_finish,
+            "slack": schedule.slack,
+            "is_critical": schedule.is_critical,
+        }
+        row = stored.get(task_id)
+        if row is None:
+            inserts.append(values)
+        elif any(getattr(row, key) != value for key, value in values.items()):
+            updates.append(values)
+    if inserts:
+        db.bulk_insert_mappings(TaskSchedule, inserts)
+    if updates:
+        db.bulk_update_mappings(TaskSchedule, updates)
+    removed = stored.keys() - schedules.keys()
+    if removed:
+        db.query(TaskSchedule).filter(TaskSchedule.task_id.in_(removed)).delete(synchronize_session=False)
+    return schedules
+
+
+@dataclass
+class Detached:
+    """What taking tasks out of one project leaves to reschedule; see ``detach_tasks``."""
+    forward_seeds: Set[int] = field(default_factory=set)
+    backward_seeds: Set[int] = field(default_factory=set)
+    finish: Optional[float] = None
+
+
+def detach_tasks(db: Session, task_ids: Iterable[int]) -> Dict[int, Detached]:
+    """Drop the dependency edges and schedule rows of tasks that are deleted or leave their project.
+
+    Returns, by project, the remaining tasks on the other end of those edges
+    (their successors as forward seeds, predecessors as backward seeds) and
+    the latest earliest finish among the detached tasks, to pass on to
+    ``update_schedule``.
+    """
+    task_ids = set(task_ids)
+    if not task_ids:
+        return {}
+    detached: Dict[int, Detached] = defaultdict(Detached)
+    edges = db.query(TaskDependency.project_id, TaskDependency.depends_on_id, TaskDependency.task_id).filter(or_(
+        TaskDependency.task_id.in_(task_ids),
+        TaskDependency.depends_on_id.in_(task_ids)
+    )).all()
+    for project_id, before, after in edges:
+        if after not in task_ids:
+            detached[project_id].forward_seeds.add(after)
+        if before not in task_ids:
+            detached[project_id].backward_seeds.add(before)
+    finishes = db.query(TaskSchedule.project_id, func.max(TaskSchedule.earliest_finish)).filter(
+        TaskSchedule.task_id.in_(task_ids)
+    ).group_by(TaskSchedule.project_id)
+    for project_id, finish in finishes:
+        detached[project_id].finish = finish
+
+    db.query(TaskDependency).filter(or_(
+        TaskDependency.task_id.in_(task_ids),
+        TaskDependency.depends_on_id.in_(task_ids)
+    )).delete(synchronize_session=False)
+    db.query(TaskSchedule).filter(TaskSchedule.task_id.in_(task_ids)).delete(synchronize_session=False)
+    return dict(detached)
+
+
+def reschedule(db: Session, project_id: int, detached: Optional[Detached] = None, seeds: Iterable[int] = ()) -> None:
+    """``update_schedule`` after tasks left (``detached``) or joined or changed (``seeds``) the project."""
+    detached = detached or Detached()
+    seeds = set(seeds)
+    update_schedule(
+        db, project_id,
+        detached.forward_seeds | seeds,
+        detached.backward_seeds | seeds,
+        removed_finish=detached.finish,
+    )
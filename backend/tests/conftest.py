@@ -1,15 +1,69 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
-from ..database import Base, get_db
-from ..main import app
+from database import Base, get_db
+import models, models.development, models.profile  # noqa: F401 - register all mappers
 
 SQLALCHEMY_DATABASE_URL = "sqlite://"
 
+@pytest.fixture
+def engine():
+    """An in-memory database with every table, shared by all its sessions."""
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    yield db
+    db.close()
+
+@pytest.fixture
+def user(db):
+    """A user in ``db``."""
+    from models.user import User
+
+    user = User(username="alice", email="alice@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+@pytest.fixture
+def project(db, user):
+    """A project of ``user``."""
+    from models.project import Project
+
+    project = Project(title="P", owner_id=user.id)
+    db.add(project)
+    db.commit()
+    return project
+
 @pytest.fixture
 def test_db():
+    # Imported here: loading the app creates the tables of the configured database
+    from main import app
+    from auth.revocation import revocation_cache
+
+    # Users of earlier test databases must not leak into this one
+    revocation_cache.clear()
+
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL,
         connect_args={"check_same_thread": False},
@@ -17,41 +71,54 @@ def test_db():
     )
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base.metadata.create_all(bind=engine)
-    
+
     def override_get_db():
         try:
             db = TestingSessionLocal()
             yield db
         finally:
             db.close()
-    
+
     app.dependency_overrides[get_db] = override_get_db
     yield engine
+    app.dependency_overrides.pop(get_db, None)
     Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture
 def client(test_db):
+    from main import app
+
     with TestClient(app) as test_client:
         yield test_client
 
 @pytest.fixture
-def test_user(client):
-    user_data = {
-        "email": "test@example.com",
-        "password": "testpassword123",
-        "full_name": "Test User"
-    }
-    response = client.post("/api/auth/register", json=user_data)
-    assert response.status_code == 201
-    return response.json()
+def test_user(test_db):
+    from auth.utils import get_password_hash
+    from models.user import User
+
+    db = sessionmaker(bind=test_db)()
+    try:
+        user = User(
+            username="test",
+            email="test@example.com",
+            full_name="Test User",
+            hashed_password=get_password_hash("testpassword123")
+        )
+        db.add(user)
+        db.commit()
+        return {"id": user.id, "username": user.username, "email": user.email}
+    finally:
+        db.close()
 
 @pytest.fixture
 def auth_headers(test_user, client):
-    login_data = {
-        "username": "test@example.com",
-        "password": "testpassword123"
-    }
-    response = client.post("/api/auth/login", data=login_data)
-    assert response.status_code == 200
-    token = response.json()["access_token"]
+    from auth.utils import create_access_token
+    from config import settings
+
+    token = create_access_token({
+        "sub": test_user["username"],
+        "uid": test_user["id"],
+        "ver": 0,
+        "scopes": list(settings.ACCESS_TOKEN_SCOPES),
+    })
     return {"Authorization": f"Bearer {token}"}
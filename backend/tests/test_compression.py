@@ -0,0 +1,61 @@
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from middleware.compression import CompressionMiddleware, negotiate_encoding
+
+def make_client(**kwargs):
+    async def stream():
+        for i in range(5):
+            yield b'{"chunk": %d}' % i + b" " * 512
+
+    app = Starlette(routes=[
+        Route("/small", lambda request: JSONResponse({"ok": True})),
+        Route("/large", lambda request: JSONResponse(
+            {"items": ["x" * 100] * 50}, headers={"ETag": 'W/"v1"'}
+        )),
+        Route("/stream", lambda request: StreamingResponse(stream(), media_type="application/json")),
+    ])
+    app.add_middleware(CompressionMiddleware, **kwargs)
+    return TestClient(app)
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip;q=0.5, br", ["br", "gzip"]) == "br"
+    assert negotiate_encoding("gzip", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("*", ["gzip"]) == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity", ["gzip"]) is None
+
+def test_small_responses_are_not_compressed():
+    client = make_client(minimum_size=1024)
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+def test_large_response_compressed_once():
+    client = make_client(minimum_size=100)
+    for _ in range(2):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["items"]) == 50
+    middleware = client.app.middleware_stack
+    while not isinstance(middleware, CompressionMiddleware):
+        middleware = middleware.app
+    assert len(middleware.cache._entries) == 1
+
+def test_cache_never_serves_another_body_for_the_same_etag():
+    bodies = iter([["a" * 100] * 50, ["b" * 100] * 50])
+    app = Starlette(routes=[
+        Route("/user", lambda request: JSONResponse({"items": next(bodies)}, headers={"ETag": 'W/"v1"'})),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    client = TestClient(app)
+    first = client.get("/user", headers={"Accept-Encoding": "gzip"}).json()
+    second = client.get("/user", headers={"Accept-Encoding": "gzip"}).json()
+    assert first["items"][0][0] == "a"
+    assert second["items"][0][0] == "b"
+
+def test_streaming_response_compressed():
+    client = make_client(minimum_size=100)
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content.startswith(b'{"chunk": 0}')
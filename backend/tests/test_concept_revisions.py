@@ -0,0 +1,60 @@
+import pytest
+
+from models.concept import ConceptNote
+from models.concept_revision import ConceptNoteRevision
+from services import concept_revisions
+from services.concept_revisions import apply_delta, make_delta, settings
+
+@pytest.fixture
+def note(db, user, project):
+    note = ConceptNote(title="Note", content="", project_id=project.id, user_id=user.id)
+    db.add(note)
+    db.flush()
+    return note
+
+def version(i):
+    # A long note where every save edits one line
+    return "".join(f"line {n} {'edited ' * (n == i % 40)}{i if n == i % 40 else ''}\n" for n in range(40))
+
+def test_delta_roundtrip():
+    old = "a\nb\nc\nd"
+    for new in ("a\nB\nc\nd", "", "x\n" + old, "a\nd\ne", old + "\n"):
+        assert apply_delta(old, make_delta(old, new)) == new
+
+def test_every_revision_rebuilds_and_chains_stay_bounded(db, user, note, monkeypatch):
+    monkeypatch.setattr(settings, "CONCEPT_REVISION_SNAPSHOT_INTERVAL", 5)
+    previous = None
+    for i in range(1, 13):
+        note.content = version(i)
+        concept_revisions.record_revision(db, note, previous, user.id)
+        previous = note.content
+    db.commit()
+
+    revisions = db.query(ConceptNoteRevision).order_by(ConceptNoteRevision.number).all()
+    assert [r.kind[0] for r in revisions] == list("sdddds" "dddds" "d")
+    assert max(r.chain_length for r in revisions) == 4
+    assert sum(len(r.content) for r in revisions) < 12 * len(version(1)) // 2
+    for i in range(1, 13):
+        assert concept_revisions.rebuild(db, note.id, i)[1] == version(i)
+    assert concept_revisions.rebuild(db, note.id, 13) is None
+
+    # Lowering the interval and the kept count: compaction rebases the chains
+    monkeypatch.setattr(settings, "CONCEPT_REVISION_SNAPSHOT_INTERVAL", 3)
+    monkeypatch.setattr(settings, "CONCEPT_REVISION_MAX_KEPT", 8)
+    assert concept_revisions.compact_concept_revisions(db).startswith("compacted 1 notes")
+    revisions = db.query(ConceptNoteRevision).order_by(ConceptNoteRevision.number).all()
+    assert [r.number for r in revisions] == list(range(5, 13))
+    assert [r.kind[0] for r in revisions] == list("sddsddsd")
+    for i in range(5, 13):
+        assert concept_revisions.rebuild(db, note.id, i)[1] == version(i)
+    assert concept_revisions.compact_concept_revisions(db) == "compacted 0 notes, rewrote 0 revisions"
+
+def test_history_starts_from_the_text_before_the_first_tracked_save(db, user, note):
+    note.content = version(0)
+    db.flush()
+    note.content = version(1)
+    concept_revisions.record_revision(db, note, version(0), user.id)
+    assert concept_revisions.rebuild(db, note.id, 1)[1] == version(0)
+    assert concept_revisions.rebuild(db, note.id, 2)[1] == version(1)
+    lines = concept_revisions.diff("Note", version(0), "Note", version(1), "revision 1", "revision 2")
+    assert "-line 0 edited 0" in lines and "+line 1 edited 1" in lines
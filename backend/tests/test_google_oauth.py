@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from auth.google import GoogleOAuthClient, cache_lifetime
+
+CLIENT_ID = "client-123"
+ISSUER = "https://idp.test"
+
+def make_key(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    public.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return pem, public
+
+class StubIdP:
+    """Token and JWKS endpoints of a fake provider served through httpx.MockTransport."""
+
+    def __init__(self):
+        self.pem, public = make_key("k1")
+        self.keys = [public]
+        self.calls = {"/token": 0, "/certs": 0, "/userinfo": 0}
+
+    def id_token(self, **claims):
+        now = int(time.time())
+        payload = {"iss": ISSUER, "aud": CLIENT_ID, "sub": "42", "email": "alice@example.com",
+                   "email_verified": True, "name": "Alice", "iat": now, "exp": now + 300}
+        payload.update(claims)
+        return jwt.encode(payload, self.pem, algorithm="RS256", headers={"kid": "k1"})
+
+    def handler(self, request):
+        self.calls[request.url.path] += 1
+        if request.url.path == "/token":
+            return httpx.Response(200, json={"access_token": "at", "id_token": self.id_token()})
+        if request.url.path == "/certs":
+            return httpx.Response(200, json={"keys": self.keys},
+                                  headers={"Cache-Control": "public, max-age=600, must-revalidate"})
+        return httpx.Response(200, json={"id": "42", "email": "alice@example.com"})
+
+def make_client(idp):
+    return GoogleOAuthClient(
+        client_id=CLIENT_ID,
+        client_secret="secret",
+        token_url=f"{ISSUER}/token",
+        jwks_url=f"{ISSUER}/certs",
+        userinfo_url=f"{ISSUER}/userinfo",
+        issuers=(ISSUER,),
+        transport=httpx.MockTransport(idp.handler),
+    )
+
+def test_cache_lifetime():
+    assert cache_lifetime("public, max-age=21600, must-revalidate", 60) == 21600
+    assert cache_lifetime("no-store", 60) == 0
+    assert cache_lifetime(None, 60) == 60
+
+def test_fetch_identity_verifies_id_token_locally():
+    idp = StubIdP()
+    client = make_client(idp)
+
+    async def login_twice():
+        first = await client.fetch_identity("code", "http://localhost/callback")
+        second = await client.fetch_identity("code", "http://localhost/callback")
+        await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(login_twice())
+    assert first["email"] == second["email"] == "alice@example.com"
+    # Keys are cached per Cache-Control and userinfo is never called
+    assert idp.calls == {"/token": 2, "/certs": 1, "/userinfo": 0}
+
+def test_verify_id_token_rejects_wrong_audience_and_unknown_keys():
+    idp = StubIdP()
+    client = make_client(idp)
+    other_pem, _ = make_key("k2")
+    foreign = jwt.encode({"iss": ISSUER, "aud": CLIENT_ID, "exp": int(time.time()) + 60},
+                         other_pem, algorithm="RS256", headers={"kid": "k2"})
+
+    async def verify(token):
+        try:
+            return await client.verify_id_token(token)
+        finally:
+            await client.aclose()
+
+    with pytest.raises(HTTPException):
+        asyncio.run(verify(idp.id_token(aud="someone-else")))
+    with pytest.raises(HTTPException):
+        asyncio.run(verify(foreign))
+    # An unknown kid forces one early JWKS refresh
+    assert idp.calls["/certs"] == 2
@@ -0,0 +1,92 @@
+import random
+from datetime import date, datetime, timedelta
+
+from models.activity import JournalEntry
+from models.journal_stats import JournalDailyStats
+from services import journal_stats
+from utils.sentiment import analyze
+
+MOODS = ["happy", "calm", "sad", None]
+TEXTS = ["a great day", "tired and stressed", "not bad at all", "nothing much", "I don't feel happy"]
+
+def rows(db):
+    db.expire_all()
+    return sorted(
+        (row.user_id, row.day, row.mood, row.entry_count, row.scored_count, row.word_count, round(row.sentiment_sum, 4))
+        for row in db.query(JournalDailyStats) if row.entry_count
+    )
+
+def test_analyze_counts_words_and_flips_negated_sentiment():
+    assert analyze("What a great, happy day") == (5, 1.0)
+    assert analyze("not happy, just tired") == (4, -1.0)
+    assert analyze("good but stressful") == (3, 0.0)
+    assert analyze(None) == (0, 0.0)
+
+def test_incremental_rows_match_recount(db, user):
+    rng = random.Random(5)
+
+    entries = []
+    for step in range(300):
+        action = rng.random()
+        if entries and action < 0.25:
+            entry = entries.pop(rng.randrange(len(entries)))
+            before = journal_stats.contribution(entry)
+            db.delete(entry)
+            db.flush()
+            journal_stats.entry_changed(db, before, None)
+        elif entries and action < 0.5:
+            entry = rng.choice(entries)
+            before = journal_stats.contribution(entry)
+            entry.mood = rng.choice(MOODS)
+            entry.content = rng.choice(TEXTS)
+            db.flush()
+            journal_stats.entry_changed(db, before, journal_stats.contribution(entry))
+        else:
+            written = datetime(2026, 1, 1, 12) + timedelta(days=rng.randrange(10), hours=rng.randrange(-12, 12))
+            entry = JournalEntry(user_id=user.id, content=rng.choice(TEXTS), mood=rng.choice(MOODS), created_at=written)
+            db.add(entry)
+            db.flush()
+            journal_stats.entry_changed(db, None, journal_stats.contribution(entry))
+            entries.append(entry)
+        db.commit()
+
+    incremental = rows(db)
+    db.query(JournalDailyStats).delete()
+    journal_stats.recount(db, user.id, [date(2025, 12, 31) + timedelta(days=n) for n in range(12)])
+    db.commit()
+    assert incremental == rows(db)
+
+def test_timeline_rebuckets_days_by_week_and_month(db, user):
+    # 2026-01-04 is a Sunday, 2026-01-05 a Monday
+    for day, mood, content in [(4, "happy", "great"), (5, "sad", "sad"), (6, "sad", "stressed"), (31, None, "fine")]:
+        entry = JournalEntry(user_id=user.id, content=content, mood=mood, created_at=datetime(2026, 1, day, 9))
+        db.add(entry)
+        db.flush()
+        journal_stats.entry_changed(db, None, journal_stats.contribution(entry))
+    db.commit()
+
+    weeks = journal_stats.timeline(db, user.id, "week", date(2026, 1, 1), date(2026, 12, 31))
+    assert [(week["period"], week["entries"], week["moods"]) for week in weeks] == [
+        (date(2025, 12, 29), 1, {"happy": 1}),
+        (date(2026, 1, 5), 2, {"sad": 2}),
+        (date(2026, 1, 26), 1, {}),
+    ]
+    months = journal_stats.timeline(db, user.id, "month", date(2026, 1, 1), date(2026, 12, 31))
+    assert len(months) == 1
+    assert months[0]["period"] == date(2026, 1, 1)
+    assert months[0]["entries"] == 4
+    assert months[0]["sentiment"] == 0.0
+    assert journal_stats.timeline(db, user.id, "day", date(2026, 1, 5), date(2026, 1, 5))[0]["sentiment"] == -1.0
+
+def test_scoring_old_entries_does_not_mark_them_edited(db, user):
+    # Written before scoring existed: no word count, sentiment or edit time
+    db.execute(JournalEntry.__table__.insert(), [
+        {"user_id": user.id, "content": text, "created_at": datetime(2026, 1, 2, 9)} for text in TEXTS
+    ])
+    db.commit()
+
+    assert journal_stats.score_journal_entries(db) == f"scored {len(TEXTS)} journal entries"
+    entries = db.query(JournalEntry).order_by(JournalEntry.id).all()
+    assert [(entry.word_count, entry.sentiment) for entry in entries] == [analyze(text) for text in TEXTS]
+    assert all(entry.updated_at is None for entry in entries)
+    assert [row[:5] for row in rows(db)] == [(user.id, date(2026, 1, 2), "", len(TEXTS), len(TEXTS))]
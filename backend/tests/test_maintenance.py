@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from models.refresh_token import RefreshToken
+from models.maintenance import MaintenanceJobRun
+from services.maintenance import JOBS, MaintenanceJob, MaintenanceScheduler, try_acquire_lease
+
+def test_lease_has_a_single_holder(db):
+    assert try_acquire_lease(db, "maintenance", "worker-a", ttl=60)
+    assert not try_acquire_lease(db, "maintenance", "worker-b", ttl=60)
+    assert try_acquire_lease(db, "maintenance", "worker-a", ttl=60)
+    # An expired lease can be taken over
+    assert try_acquire_lease(db, "maintenance", "worker-a", ttl=-1)
+    assert try_acquire_lease(db, "maintenance", "worker-b", ttl=60)
+
+def test_scheduler_purges_tokens_and_records_runs(session_factory, db, user):
+    now = datetime.utcnow()
+    db.add_all([
+        RefreshToken(token="live", expires_at=now + timedelta(days=1), user_id=user.id),
+        RefreshToken(token="revoked", expires_at=now + timedelta(days=1), revoked=True, user_id=user.id),
+        RefreshToken(token="expired", expires_at=now - timedelta(days=1), user_id=user.id),
+    ])
+    db.commit()
+
+    leader = MaintenanceScheduler(session_factory=session_factory)
+    follower = MaintenanceScheduler(session_factory=session_factory)
+    assert leader.run_pending() == [job.name for job in JOBS]
+    assert follower.run_pending() == []
+    # Nothing is due again until the interval has passed
+    assert leader.run_pending() == []
+
+    assert [t.token for t in db.query(RefreshToken).all()] == ["live"]
+    status = leader.status(db)
+    assert status["leader"] is True
+    assert status["jobs"]["purge_refresh_tokens"]["result"] == "deleted 2 refresh tokens"
+    assert all(run.last_duration_ms is not None for run in db.query(MaintenanceJobRun).all())
+
+def test_leader_stops_once_its_lease_is_taken_over(session_factory):
+    follower = MaintenanceScheduler(jobs=[], session_factory=session_factory)
+
+    def slow(db):
+        # Outlives the lease, which another worker then takes
+        try_acquire_lease(db, "maintenance", leader.holder, ttl=-1)
+        assert follower.run_pending() == [] and follower.is_leader
+        return "done"
+
+    jobs = [MaintenanceJob("slow", 60, slow), MaintenanceJob("next", 60, lambda db: "done")]
+    leader = MaintenanceScheduler(jobs=jobs, session_factory=session_factory)
+    assert leader.run_pending() == ["slow"]
+    assert not leader.is_leader
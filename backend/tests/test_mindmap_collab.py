@@ -0,0 +1,122 @@
+import asyncio
+import copy
+import random
+
+from auth.utils import create_access_token
+from models.mindmap import Mindmap
+from models.mindmap_operation import MindmapOperation
+from models.user import User
+from routers.mindmaps import _may_edit
+from services import json_patch
+from services.mindmap_collab import Connection, Room, patch_ops
+from services.mindmap_crdt import LWWDocument
+from services.mindmap_patches import current_document
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+def random_ops(rng, count):
+    ops = []
+    for counter in range(1, count + 1):
+        client = rng.choice("abc")
+        key = f"n{rng.randrange(5)}"
+        if rng.random() < 0.2:
+            ops.append({"kind": "node", "id": key, "op": "delete", "clock": [counter, client]})
+        else:
+            fields = {name: rng.randrange(100) for name in rng.sample(["label", "x", "y", "color"], 2)}
+            ops.append({"kind": "node", "id": key, "op": "set", "fields": fields, "clock": [counter, client]})
+    return ops
+
+def test_replicas_converge_whatever_the_order():
+    rng = random.Random(3)
+    start = {"nodes": [{"id": "n0", "label": "root"}], "edges": []}
+    ops = random_ops(rng, 200)
+    expected = None
+    for _ in range(10):
+        shuffled = ops[:] + rng.sample(ops, 20)  # duplicates are harmless too
+        rng.shuffle(shuffled)
+        replica = LWWDocument(copy.deepcopy(start))
+        for op in shuffled:
+            replica.apply(op)
+        document = replica.document()
+        document["nodes"].sort(key=lambda node: node["id"])
+        if expected is None:
+            expected = document
+        assert document == expected
+
+def test_concurrent_field_edits_both_survive_and_deletes_win_over_older_writes():
+    state = LWWDocument({"nodes": [{"id": "n1", "label": "A", "x": 0}]})
+    state.apply({"kind": "node", "id": "n1", "op": "set", "fields": {"x": 10}, "clock": [1, "a"]})
+    state.apply({"kind": "node", "id": "n1", "op": "set", "fields": {"label": "B"}, "clock": [1, "b"]})
+    assert state.get(("node", "n1")) == {"id": "n1", "label": "B", "x": 10}
+
+    assert state.apply({"kind": "node", "id": "n1", "op": "delete", "clock": [3, "a"]}) is not None
+    # Made before the delete: superseded
+    assert state.apply({"kind": "node", "id": "n1", "op": "set", "fields": {"x": 5}, "clock": [2, "b"]}) is None
+    assert state.get(("node", "n1")) is None
+    state.apply({"kind": "node", "id": "n1", "op": "set", "fields": {"label": "C"}, "clock": [4, "b"]})
+    assert state.get(("node", "n1")) == {"id": "n1", "label": "C"}
+
+def test_patch_ops_write_changes_into_the_document():
+    document = {"nodes": [{"id": f"n{i}"} for i in range(6)], "edges": [{"id": "e", "source": "n0", "target": "n5"}]}
+    changes = {
+        ("node", "n1"): None,
+        ("node", "n3"): None,
+        ("node", "n4"): {"id": "n4", "label": "four"},
+        ("node", "n9"): {"id": "n9"},
+        ("edge", "e"): None,
+    }
+    patched = json_patch.apply(copy.deepcopy(document), patch_ops(document, changes))
+    assert patched == {
+        "nodes": [{"id": "n0"}, {"id": "n2"}, {"id": "n4", "label": "four"}, {"id": "n5"}, {"id": "n9"}],
+        "edges": [],
+    }
+
+def test_room_coalesces_edits_into_one_patch_per_flush(session_factory):
+    db = session_factory()
+    mindmap = Mindmap(title="M", data={"nodes": [{"id": "a", "x": 0}], "edges": []})
+    db.add(mindmap)
+    db.commit()
+    mindmap_id = mindmap.id
+    db.close()
+
+    async def session():
+        room = Room(mindmap_id, session_factory, flush_interval=60)
+        assert await room.load()
+        alice, bob = Connection(FakeSocket(), "alice"), Connection(FakeSocket(), "bob")
+        room.connections = {"alice": alice, "bob": bob}
+        # A drag: many moves of one node, then a new node
+        for x in range(1, 51):
+            await room.receive(alice, {"type": "ops", "ops": [{"kind": "node", "id": "a", "op": "set", "fields": {"x": x}, "clock": x}]})
+        await room.receive(bob, {"type": "ops", "ops": [{"kind": "node", "id": "b", "op": "set", "fields": {"x": 7}, "clock": 1}]})
+        await room.flush()
+        assert len(bob.websocket.sent) == 51 and bob.websocket.sent[-1]["type"] == "ack"
+        await room.close()
+
+    asyncio.run(session())
+    db = session_factory()
+    assert db.query(MindmapOperation).filter(MindmapOperation.mindmap_id == mindmap_id).count() == 1
+    version, document = current_document(db, mindmap_id)
+    assert version == 1
+    assert document["nodes"] == [{"id": "a", "x": 50}, {"id": "b", "x": 7}]
+
+def test_only_the_project_owner_may_join(db, user, project):
+    bob = User(username="bob", email="bob@example.com", hashed_password="x")
+    db.add(bob)
+    db.flush()
+    mindmap = Mindmap(title="M", data={"nodes": [], "edges": []}, project_id=project.id)
+    orphan = Mindmap(title="Loose", data={"nodes": [], "edges": []})
+    db.add_all([mindmap, orphan])
+    db.commit()
+
+    def token(account):
+        return create_access_token({"sub": account.username, "uid": account.id, "ver": 0})
+
+    assert _may_edit(db, mindmap.id, token(user))
+    assert not _may_edit(db, mindmap.id, token(bob))
+    assert not _may_edit(db, orphan.id, token(user))
+    assert not _may_edit(db, mindmap.id, "not a token")
@@ -0,0 +1,91 @@
+import random
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from models.mindmap import Mindmap
+from models.project import Project
+from services import mindmap_graph
+from services.mindmap_patches import current_document
+
+def make_document(rng, nodes):
+    return {
+        "viewport": {"zoom": 1},
+        "nodes": [{"id": f"n{i}", "position": {"x": rng.uniform(-1000, 1000), "y": rng.uniform(-1000, 1000)}} for i in range(nodes)],
+        "edges": [{"id": f"e{i}", "source": f"n{rng.randrange(i)}", "target": f"n{i}"} for i in range(1, nodes)],
+    }
+
+def make_mindmaps(db, project, documents):
+    mindmaps = [Mindmap(title=f"M{i}", data=document, project_id=project.id) for i, document in enumerate(documents)]
+    db.add_all(mindmaps)
+    db.flush()
+    for mindmap, document in zip(mindmaps, documents):
+        mindmap_graph.write_graph(db, mindmap, document)
+    db.commit()
+    return mindmaps
+
+def brute_force(document, box):
+    min_x, min_y, max_x, max_y = box
+    position = {node["id"]: (node["position"]["x"], node["position"]["y"]) for node in document["nodes"]}
+    nodes = {key for key, (x, y) in position.items() if min_x <= x <= max_x and min_y <= y <= max_y}
+    edges = set()
+    for edge in document["edges"]:
+        (x1, y1), (x2, y2) = position[edge["source"]], position[edge["target"]]
+        if min(x1, x2) <= max_x and max(x1, x2) >= min_x and min(y1, y2) <= max_y and max(y1, y2) >= min_y:
+            edges.add(edge["id"])
+    return nodes, edges
+
+def test_viewport_matches_a_full_scan(db, project):
+    rng = random.Random(7)
+    documents = [make_document(rng, 300), make_document(rng, 300)]
+    mindmap, other = make_mindmaps(db, project, documents)
+    assert current_document(db, mindmap.id) == (mindmap.version, documents[0])
+    assert (mindmap.node_count, mindmap.data) == (300, {"viewport": {"zoom": 1}})
+
+    for _ in range(20):
+        x, y = rng.uniform(-1000, 800), rng.uniform(-1000, 800)
+        box = (x, y, x + rng.uniform(10, 400), y + rng.uniform(10, 400))
+        nodes, edges, truncated = mindmap_graph.viewport(db, mindmap, *box, limit=1000)
+        assert not truncated
+        assert ({n["id"] for n in nodes}, {e["id"] for e in edges}) == brute_force(documents[0], box)
+
+def test_single_row_edits_keep_the_indexes_current(db, project):
+    document = {"nodes": [{"id": "a", "x": 0, "y": 0}, {"id": "b", "x": 10, "y": 10}], "edges": [{"id": "ab", "source": "a", "target": "b"}]}
+    mindmap, = make_mindmaps(db, project, [document])
+    version = mindmap.version
+
+    # Moving b far away stretches the edge's box with it
+    mindmap_graph.put_node(db, mindmap, "b", {"x": 500, "y": 500})
+    db.commit()
+    nodes, edges, _ = mindmap_graph.viewport(db, mindmap, 400, 400, 600, 600, limit=10)
+    assert [n["id"] for n in nodes] == ["b"] and [e["id"] for e in edges] == ["ab"]
+    assert mindmap.version == version + 1
+
+    assert mindmap_graph.delete_node(db, mindmap, "a")
+    db.commit()
+    assert mindmap_graph.viewport(db, mindmap, -1000, -1000, 1000, 1000, limit=10)[1] == []
+    assert (mindmap.node_count, mindmap.version) == (1, version + 2)
+
+    db.delete(mindmap)
+    db.commit()
+    assert db.execute(text("SELECT count(*) FROM mindmap_node_index")).scalar() == 0
+
+def test_node_and_edge_edits_require_the_owning_user(client, auth_headers, test_user, test_db):
+    db = sessionmaker(bind=test_db)()
+    project = Project(title="Mine", owner_id=test_user["id"])
+    db.add(project)
+    db.flush()
+    mindmap = Mindmap(title="M", data={"nodes": [{"id": "a"}], "edges": []}, project_id=project.id)
+    orphan = Mindmap(title="Loose", data={"nodes": [], "edges": []})
+    db.add_all([mindmap, orphan])
+    db.commit()
+    url = f"/api/mindmaps/{mindmap.id}"
+    assert client.put(f"{url}/storage", json={"storage": "normalized"}, headers=auth_headers).status_code == 200
+
+    assert client.put(f"{url}/nodes/b", json={"x": 1, "y": 1}).status_code == 401
+    assert client.delete(f"{url}/edges/ab").status_code == 401
+    assert client.put(f"/api/mindmaps/{orphan.id}/nodes/b", json={"x": 1, "y": 1}, headers=auth_headers).status_code == 404
+    assert client.put(f"{url}/nodes/b", json={"x": 1, "y": 1}, headers=auth_headers).status_code == 200
+    assert client.put(f"{url}/edges/ab", json={"source": "a", "target": "b"}, headers=auth_headers).status_code == 200
+    assert client.delete(f"{url}/nodes/b", headers=auth_headers).status_code == 200
+    db.close()
@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from models.mindmap import Mindmap
+from models.mindmap_operation import MindmapOperation
+from models.project import Project
+from models.user import User
+from services import json_patch, mindmap_patches
+from services.json_patch import JsonPatchError, JsonPatchTestFailed
+from services.mindmap_patches import VersionConflict, apply_patch, compact_mindmaps, current_document, document_cache
+
+def test_rfc6902_operations():
+    doc = {"foo": ["bar", "baz"], "a/b": 1, "m~n": {"x": True}}
+    doc = json_patch.apply(doc, [
+        {"op": "add", "path": "/foo/1", "value": "qux"},
+        {"op": "remove", "path": "/foo/0"},
+        {"op": "replace", "path": "/a~1b", "value": 2},
+        {"op": "copy", "from": "/m~0n", "path": "/copy"},
+        {"op": "move", "from": "/foo", "path": "/moved"},
+        {"op": "add", "path": "/moved/-", "value": "end"},
+        {"op": "test", "path": "/copy/x", "value": True},
+    ])
+    assert doc == {"moved": ["qux", "baz", "end"], "a/b": 2, "m~n": {"x": True}, "copy": {"x": True}}
+    doc["copy"]["x"] = False
+    assert doc["m~n"]["x"] is True
+    assert json_patch.apply({"a": 1}, [{"op": "replace", "path": "", "value": [1]}]) == [1]
+
+    with pytest.raises(JsonPatchTestFailed):
+        json_patch.apply({"a": 1}, [{"op": "test", "path": "/a", "value": True}])
+    for op in (
+        {"op": "remove", "path": "/missing"},
+        {"op": "add", "path": "/list/01", "value": 1},
+        {"op": "replace", "path": "/list/2", "value": 1},
+        {"op": "move", "from": "/list", "path": "/list/0"},
+        {"op": "add", "path": "no-slash", "value": 1},
+        {"op": "add", "path": "/x"},
+        {"op": "frobnicate", "path": "/x"},
+    ):
+        with pytest.raises(JsonPatchError):
+            json_patch.apply({"list": [1, 2]}, [op])
+
+def test_patches_are_logged_compacted_and_versioned(db, project, monkeypatch):
+    monkeypatch.setattr(mindmap_patches.settings, "MINDMAP_COMPACT_AFTER_OPS", 3)
+    mindmap = Mindmap(title="M", data={"nodes": [], "edges": []}, project_id=project.id)
+    db.add(mindmap)
+    db.commit()
+    for version in range(5):
+        assert apply_patch(db, mindmap, version, [{"op": "add", "path": "/nodes/-", "value": {"id": version}}]) == version + 1
+        if version == 2:
+            # A worker without the document in memory rebuilds it from the log
+            document_cache.forget(mindmap.id)
+
+    assert (mindmap.version, mindmap.snapshot_version, mindmap.node_count) == (5, 3, 5)
+    assert [v for v, in db.query(MindmapOperation.version)] == [4, 5]
+    assert current_document(db, mindmap.id) == (5, {"nodes": [{"id": n} for n in range(5)], "edges": []})
+
+    with pytest.raises(VersionConflict) as conflict:
+        apply_patch(db, mindmap, 4, [{"op": "remove", "path": "/nodes/0"}])
+    assert conflict.value.version == 5
+    # A failed patch changes nothing, in the database or in the cached document
+    with pytest.raises(JsonPatchError):
+        apply_patch(db, mindmap, 5, [{"op": "remove", "path": "/nodes/0"}, {"op": "remove", "path": "/nope"}])
+    assert len(current_document(db, mindmap.id)[1]["nodes"]) == 5
+    assert apply_patch(db, mindmap, 5, [{"op": "remove", "path": "/nodes/0"}]) == 6
+    assert apply_patch(db, mindmap, 6, [{"op": "remove", "path": "/nodes/0"}]) == 7
+
+    assert compact_mindmaps(db) == "compacted 1 mindmaps"
+    db.refresh(mindmap)
+    assert mindmap.snapshot_version == 7 and len(mindmap.data["nodes"]) == 3
+    assert db.query(MindmapOperation).count() == 0
+
+def test_patch_requires_the_owning_user(client, auth_headers, test_user, test_db):
+    db = sessionmaker(bind=test_db)()
+    mine = Project(title="Mine", owner_id=test_user["id"])
+    other_user = User(username="bob", email="bob@example.com", hashed_password="x")
+    db.add_all([mine, other_user])
+    db.flush()
+    theirs = Project(title="Theirs", owner_id=other_user.id)
+    db.add(theirs)
+    db.flush()
+    mindmaps = [Mindmap(title="M", data={"nodes": []}, project_id=project.id) for project in (mine, theirs)]
+    db.add_all(mindmaps)
+    db.commit()
+    patch = {"base_version": 0, "ops": [{"op": "add", "path": "/nodes/-", "value": {"id": "a"}}]}
+
+    assert client.patch(f"/api/mindmaps/{mindmaps[0].id}", json=patch).status_code == 401
+    assert client.patch(f"/api/mindmaps/{mindmaps[1].id}", json=patch, headers=auth_headers).status_code == 404
+    response = client.patch(f"/api/mindmaps/{mindmaps[0].id}", json=patch, headers=auth_headers)
+    assert response.status_code == 200 and response.json()["version"] == 1
+    db.close()
@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.concept import ConceptNote
+from models.project import Project
+from models.task import Task
+from models.user import User
+from services.project_detail import load_project, parse_include, stream_project
+
+def test_parse_include():
+    assert parse_include("tasks, ideas,tasks,") == ["tasks", "ideas"]
+    with pytest.raises(ValueError):
+        parse_include("tasks,secrets")
+
+def test_stream_project_sections(tmp_path):
+    # A file database, since every section runs on its own connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'detail.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    owner = User(username="alice", email="alice@example.com", hashed_password="x")
+    other = User(username="bob", email="bob@example.com", hashed_password="x")
+    db.add_all([owner, other])
+    db.flush()
+    project = Project(title="P", owner_id=owner.id)
+    db.add(project)
+    db.flush()
+    db.add_all([Task(title=f"t{i}", user_id=owner.id, project_id=project.id) for i in range(3)])
+    db.add(ConceptNote(title="n", content="c", project_id=project.id, user_id=owner.id))
+    db.commit()
+
+    assert load_project(db, project.id, other.id) is None
+    header = load_project(db, project.id, owner.id)
+    assert header["stats"]["task_count"] == 3
+
+    async def collect():
+        return b"".join([chunk async for chunk in stream_project(header, ["tasks", "concepts"], 2, Session)])
+
+    body = json.loads(asyncio.run(collect()))
+    assert set(body) == {"project", "tasks", "concepts"}
+    assert len(body["tasks"]["items"]) == 2 and body["tasks"]["has_more"]
+    assert [note["title"] for note in body["concepts"]["items"]] == ["n"]
+    assert not body["concepts"]["has_more"]
@@ -0,0 +1,42 @@
+from models.concept import ConceptNote
+from models.project import Project
+from models.project_stats import ProjectStats
+from models.task import Task, TaskStatus
+from services import project_stats
+
+def counters(db, project_id):
+    db.expire_all()
+    row = db.query(ProjectStats).filter(ProjectStats.project_id == project_id).one()
+    return row.tasks_todo, row.tasks_in_progress, row.tasks_done, row.concept_note_count
+
+def test_incremental_counters_match_recount(db, user):
+    first, second = Project(title="A", owner_id=user.id), Project(title="B", owner_id=user.id)
+    db.add_all([first, second])
+    db.commit()
+
+    task = Task(title="t", user_id=user.id, project_id=first.id)
+    db.add(task)
+    db.flush()
+    # No stats row yet: the first adjustment builds it from the tables
+    project_stats.task_changed(db, None, None, first.id, task.status)
+    db.add(Task(title="u", user_id=user.id, project_id=first.id))
+    db.flush()
+    project_stats.task_changed(db, None, None, first.id, TaskStatus.TODO)
+    db.add(ConceptNote(title="n", content="c", project_id=first.id, user_id=user.id))
+    db.flush()
+    project_stats.adjust(db, first.id, concept_note_count=1)
+    db.commit()
+    assert counters(db, first.id) == (2, 0, 0, 1)
+
+    task.status = TaskStatus.DONE
+    project_stats.task_changed(db, first.id, TaskStatus.TODO, first.id, task.status)
+    task.project_id = second.id
+    project_stats.task_changed(db, first.id, TaskStatus.DONE, second.id, task.status)
+    db.commit()
+    assert counters(db, first.id) == (1, 0, 0, 1)
+    assert counters(db, second.id) == (0, 0, 1, 0)
+
+    incremental = {p: counters(db, p) for p in (first.id, second.id)}
+    project_stats.recount(db, [first.id, second.id])
+    db.commit()
+    assert {p: counters(db, p) for p in (first.id, second.id)} == incremental
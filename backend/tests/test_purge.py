@@ -0,0 +1,95 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func
+
+from auth.revocation import revocation_cache
+from auth.utils import create_access_token, get_current_principal
+
+from models.concept import ConceptNote
+from models.development import Habit, HabitTracking
+from models.idea import Idea
+from models.maintenance import PurgeJob
+from models.project import Project
+from models.task import Task
+from models.tagging import Tagging
+from models.task_dependency import TaskDependency
+from models.user import User
+from services import tagging
+from services.purge import run_purge, schedule_purge
+from services.tagging import set_tags
+
+def add_account(db, name):
+    user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    project = Project(title=f"{name} project", owner_id=user.id)
+    db.add(project)
+    db.flush()
+    tasks = [Task(title=f"t{i}", user_id=user.id, project_id=project.id) for i in range(5)]
+    tasks.append(Task(title="loose", user_id=user.id))
+    db.add_all(tasks)
+    db.flush()
+    db.add(TaskDependency(task_id=tasks[1].id, depends_on_id=tasks[0].id, project_id=project.id))
+    db.add(ConceptNote(title="n", content="c", project_id=project.id, user_id=user.id))
+    idea = Idea(title="i", description="d", user_id=user.id)
+    idea.projects.append(project)
+    habit = Habit(name="h", frequency="daily", user_id=user.id)
+    habit.tracking.append(HabitTracking())
+    db.add_all([idea, habit])
+    db.commit()
+    return user, project
+
+def test_project_delete_cascades_in_the_database(db):
+    user, project = add_account(db, "alice")
+    db.delete(project)
+    db.commit()
+    assert db.query(Task).filter(Task.project_id.isnot(None)).count() == 0
+    assert db.query(TaskDependency).count() == 0
+    assert db.query(ConceptNote).count() == 0
+    # The idea itself survives; only the link goes
+    assert db.query(Idea).count() == 1
+
+def test_user_purge_in_chunks(db):
+    alice_id = add_account(db, "alice")[0].id
+    bob_id = add_account(db, "bob")[0].id
+    job = schedule_purge(db, "user", alice_id)
+    db.commit()
+
+    run_purge(db, job, chunk_size=2)
+    assert db.query(User).filter(User.id == alice_id).first() is None
+    for model, column in ((Task, Task.user_id), (Idea, Idea.user_id), (Habit, Habit.user_id), (Project, Project.owner_id)):
+        assert db.query(model).filter(column == alice_id).count() == 0
+        assert db.query(model).filter(column == bob_id).count() > 0
+    assert db.query(func.count(HabitTracking.id)).scalar() == 1
+    job = db.query(PurgeJob).one()
+    assert job.finished_at is not None and job.deleted_rows > 0
+
+def test_project_purge_drops_taggings(db):
+    user, project = add_account(db, "alice")
+    for task in db.query(Task).filter(Task.user_id == user.id):
+        set_tags(db, user.id, "task", task.id, ["urgent"])
+    db.commit()
+    job = schedule_purge(db, "project", project.id)
+    db.commit()
+
+    run_purge(db, job, chunk_size=2)
+    # Only the task outside the project keeps its tag
+    loose = db.query(Task).one()
+    assert [row.entity_id for row in db.query(Tagging)] == [loose.id]
+    assert tagging.search(db, user.id, "task", all_tags=["urgent"]) == ([loose.id], 1)
+
+def test_purged_user_ids_are_not_reused(db):
+    alice_id = add_account(db, "alice")[0].id
+    token = create_access_token({"sub": "alice", "uid": alice_id, "ver": 0})
+    job = schedule_purge(db, "user", alice_id)
+    db.commit()
+    run_purge(db, job)
+
+    carol = User(username="carol", email="carol@example.com", hashed_password="x")
+    db.add(carol)
+    db.commit()
+    assert carol.id > alice_id
+    revocation_cache.clear()
+    with pytest.raises(HTTPException) as error:
+        get_current_principal(token, db)
+    assert error.value.status_code == 401
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from models.task import TaskPriority, TaskStatus
+from services.recurrence import expand_task, occurrence_dates, parse_rule
+
+START = datetime(2024, 1, 1, 9, 0)
+
+def make_master():
+    return SimpleNamespace(
+        id=1, user_id=1, title="Standup", description=None, priority=TaskPriority.MEDIUM,
+        project_id=None, estimated_hours=None, created_at=START, updated_at=START, tags=[]
+    )
+
+def make_exception(date, **fields):
+    values = {"occurrence_date": date, "skipped": False, "status": None, "due_date": None,
+              "completed_at": None, "updated_at": START}
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+def test_occurrence_dates_in_window():
+    dates = occurrence_dates("FREQ=WEEKLY;BYDAY=MO,WE", START, START, START + timedelta(days=13))
+    assert [d.day for d in dates] == [1, 3, 8, 10]
+
+def test_rejects_sub_daily_rules():
+    with pytest.raises(ValueError):
+        parse_rule("FREQ=HOURLY", START)
+
+def test_expand_task_merges_exceptions():
+    recurrence = SimpleNamespace(rule="FREQ=DAILY", dtstart=START)
+    exceptions = [
+        make_exception(START, status=TaskStatus.DONE, completed_at=START),
+        make_exception(START + timedelta(days=1), skipped=True),
+        # Moved out of the window
+        make_exception(START + timedelta(days=2), due_date=START + timedelta(days=30)),
+        # Moved into the window from before it
+        make_exception(START - timedelta(days=5), due_date=START + timedelta(hours=1)),
+    ]
+    occurrences = expand_task(make_master(), recurrence, exceptions, START, START + timedelta(days=3))
+
+    by_date = {o["occurrence_date"]: o for o in occurrences}
+    assert sorted(by_date) == [START - timedelta(days=5), START, START + timedelta(days=3)]
+    assert by_date[START]["status"] == TaskStatus.DONE
+    assert by_date[START - timedelta(days=5)]["due_date"] == START + timedelta(hours=1)
+    assert by_date[START + timedelta(days=3)]["status"] == TaskStatus.TODO
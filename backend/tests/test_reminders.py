@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, time, timedelta
+
+from models.development import Habit
+from models.reminder import ReminderDelivery
+from models.task import Task, TaskStatus
+from services.reminders import Reminder, ReminderScheduler, habit_reminder
+
+class FailingNotifier:
+    async def send(self, reminder):
+        raise RuntimeError("webhook down")
+
+    async def aclose(self):
+        pass
+
+class RecordingNotifier:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, reminder):
+        self.sent.append(reminder.key)
+
+    async def aclose(self):
+        pass
+
+def reminder(target_id, fire_at):
+    return Reminder("task", target_id, 1, fire_at, f"task {target_id}", fire_at)
+
+def test_heap_pops_in_order_and_skips_replaced_entries():
+    scheduler = ReminderScheduler(horizon=timedelta(days=1))
+    now = datetime.utcnow()
+    scheduler.schedule(reminder(1, now + timedelta(minutes=30)))
+    scheduler.schedule(reminder(2, now + timedelta(minutes=10)))
+    scheduler.schedule(reminder(3, now + timedelta(minutes=20)))
+    # Moving task 1 earlier and cancelling task 3 leaves stale heap entries behind
+    scheduler.schedule(reminder(1, now + timedelta(minutes=5)))
+    scheduler.cancel("task", 3)
+    # Outside the horizon: left for a later reload
+    scheduler.schedule(reminder(4, now + timedelta(days=2)))
+
+    assert len(scheduler) == 2
+    assert scheduler.next_fire_at() == now + timedelta(minutes=5)
+    due = scheduler.pop_due(now + timedelta(hours=1))
+    assert [r.target_id for r in due] == [1, 2]
+    assert scheduler.next_fire_at() is None
+
+def test_habit_reminder_follows_frequency():
+    monday = datetime(2026, 10, 19, 8, 0)
+    daily = Habit(id=1, user_id=1, name="Read", frequency="daily", reminder_time=time(7, 30))
+    assert habit_reminder(daily, monday).fire_at == datetime(2026, 10, 20, 7, 30)
+
+    weekly = Habit(id=2, user_id=1, name="Run", frequency="weekly",
+                   target_days=["Wednesday", "saturday"], reminder_time=time(18, 0))
+    assert habit_reminder(weekly, monday).fire_at == datetime(2026, 10, 21, 18, 0)
+
+    monthly = Habit(id=3, user_id=1, name="Budget", frequency="monthly",
+                    created_at=datetime(2026, 1, 3), reminder_time=time(9, 0))
+    assert habit_reminder(monthly, monday).fire_at == datetime(2026, 11, 3, 9, 0)
+
+    assert habit_reminder(Habit(id=4, frequency="daily"), monday) is None
+
+def test_load_and_deliver_once(session_factory, db, user):
+    now = datetime.utcnow()
+    db.add_all([
+        Task(title="soon", user_id=user.id, due_date=now + timedelta(minutes=20)),
+        Task(title="done", user_id=user.id, due_date=now + timedelta(minutes=20), status=TaskStatus.DONE),
+        Task(title="later", user_id=user.id, due_date=now + timedelta(days=3)),
+        Task(title="undated", user_id=user.id),
+    ])
+    db.commit()
+
+    notifier = RecordingNotifier()
+    scheduler = ReminderScheduler(notifier=notifier, session_factory=session_factory, horizon=timedelta(hours=1))
+    assert scheduler.load(db, now) == 1
+    due = scheduler.pop_due(now + timedelta(hours=1))
+    assert [r.title for r in due] == ["soon"]
+
+    # A second worker holding the same reminder does not send it again
+    other = ReminderScheduler(notifier=notifier, session_factory=session_factory)
+    assert asyncio.run(scheduler.deliver(due[0]))
+    assert not asyncio.run(other.deliver(due[0]))
+    assert notifier.sent == [("task", due[0].target_id)]
+
+    # Reminders for tasks completed since they were queued are dropped
+    task = db.query(Task).filter(Task.title == "later").one()
+    stale = reminder(task.id, task.due_date - timedelta(minutes=15))
+    task.status = TaskStatus.DONE
+    db.commit()
+    assert not asyncio.run(scheduler.deliver(stale))
+
+def test_failed_send_releases_the_claim(session_factory, db, user):
+    task = Task(title="soon", user_id=user.id, due_date=datetime.utcnow() + timedelta(minutes=20))
+    db.add(task)
+    db.commit()
+    due = reminder(task.id, task.due_date - timedelta(minutes=15))
+
+    failing = ReminderScheduler(notifier=FailingNotifier(), session_factory=session_factory)
+    assert not asyncio.run(failing.deliver(due))
+    assert db.query(ReminderDelivery).count() == 0
+
+    # The next attempt still sends it
+    notifier = RecordingNotifier()
+    assert asyncio.run(ReminderScheduler(notifier=notifier, session_factory=session_factory).deliver(due))
+    assert notifier.sent == [("task", task.id)]
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import event
+
+from models.activity import Activity, JournalEntry
+from models.concept import ConceptNote
+from models.mindmap import Mindmap
+from routers.concepts import get_project_concepts
+from routers.mindmaps import get_project_mindmaps
+from utils.summary import EXCERPT_LENGTH, excerpt
+
+@pytest.fixture
+def statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+def test_excerpt():
+    assert excerpt(None) == ""
+    assert excerpt("  two\n\nlines  ") == "two lines"
+    long = excerpt("word " * 100)
+    assert len(long) <= EXCERPT_LENGTH and long.endswith("word…")
+    assert len(excerpt("x" * 500)) == EXCERPT_LENGTH
+
+def test_derived_columns_follow_assignments():
+    note = ConceptNote(title="T", content="hello   world")
+    assert (note.excerpt, note.size) == ("hello world", 13)
+    note.content = "x" * 300
+    assert note.size == 300 and len(note.excerpt) == EXCERPT_LENGTH
+    assert JournalEntry(content="dear diary").excerpt == "dear diary"
+    assert Activity(data={"a": 1}).size == len('{"a": 1}')
+    mindmap = Mindmap(title="M", data={"nodes": [{"id": "n1"}, {"id": "n2"}], "edges": []})
+    assert mindmap.node_count == 2 and mindmap.size > 0
+
+def test_summary_views_do_not_load_bodies(db, user, project, statements):
+    db.add(ConceptNote(title="Note", content="body " * 1000, project_id=project.id, user_id=user.id))
+    db.add(Mindmap(title="Map", data={"nodes": [{"id": "n1"}]}, project_id=project.id))
+    db.commit()
+    project_id = project.id
+    db.expunge_all()
+    statements.clear()
+
+    [note] = get_project_concepts(project_id, view="summary", current_user=user, db=db)
+    [mindmap] = get_project_mindmaps(project_id, view="summary", db=db)
+    assert note.size == 5000 and note.excerpt.startswith("body body")
+    assert (mindmap.node_count, mindmap.title) == (1, "Map")
+    assert not any("concept_notes.content" in s or "mindmaps.data" in s for s in statements)
+
+    [full] = get_project_concepts(project_id, view="full", current_user=user, db=db)
+    assert full.content == "body " * 1000
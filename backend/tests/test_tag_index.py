@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from models.idea import Tag
+from models.tag_usage import TagUsage
+from services.tag_index import TagPrefixIndex, TagSuggester, adjust_usage
+
+def test_prefix_match_is_case_insensitive_and_ranked():
+    now = datetime.utcnow()
+    index = TagPrefixIndex([
+        ("Product", 3, now),
+        ("project", 5, now - timedelta(days=120)),
+        ("prototype", 2, now - timedelta(days=1)),
+        ("python", 9, now),
+    ])
+    names = [s.name for s in index.suggest("PR", 10, now)]
+    # project has the highest count but decayed over four half-lives
+    assert names == ["Product", "prototype", "project"]
+    assert [s.name for s in index.suggest("pr", 1, now)] == ["Product"]
+    assert index.suggest("x", 10, now) == []
+
+    index.apply("prototype", -2)
+    index.apply("press", 1, now)
+    assert [s.name for s in index.suggest("pr", 10, now)] == ["Product", "press", "project"]
+
+def test_usage_counts_and_cached_index_agree(db, user):
+    work, home = Tag(name="work"), Tag(name="home")
+    db.add_all([work, home])
+    db.commit()
+    suggester = TagSuggester(max_users=1, ttl=3600)
+    assert suggester.suggest(db, user.id, "", 10) == []
+
+    adjust_usage(db, user.id, {work.id: 1, home.id: 1})
+    db.commit()
+    suggester.apply(user.id, {"work": 1, "home": 1}, datetime.utcnow())
+    adjust_usage(db, user.id, {work.id: 1, home.id: -1})
+    db.commit()
+    suggester.apply(user.id, {"work": 1, "home": -1}, datetime.utcnow())
+
+    assert dict(db.query(TagUsage.tag_id, TagUsage.count)) == {work.id: 2}
+    cached = [(s.name, s.count) for s in suggester.suggest(db, user.id, "", 10)]
+    suggester.forget(user.id)
+    assert cached == [(s.name, s.count) for s in suggester.suggest(db, user.id, "", 10)] == [("work", 2)]
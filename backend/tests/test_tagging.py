@@ -0,0 +1,66 @@
+from models.activity import JournalEntry
+from models.idea import Idea
+from models.tag_usage import TagUsage
+from models.tagging import TagPosting
+from models.task import Task
+from models.user import User
+from services import tagging
+
+def test_bitmap_roundtrip():
+    ids = [1, 7, 8, 64, 1000, 123457]
+    bits = tagging.bitmap_from_ids(ids)
+    assert tagging.decode_bitmap(tagging.encode_bitmap(bits)) == bits
+    assert tagging.bitmap_ids(bits) == ids[::-1]
+    assert tagging.bitmap_ids(0) == [] and tagging.decode_bitmap(tagging.encode_bitmap(0)) == 0
+
+def test_boolean_queries_over_postings(db, user):
+    bob = User(username="bob", email="bob@example.com", hashed_password="x")
+    db.add(bob)
+    db.flush()
+    tasks = [Task(title=f"t{i}", user_id=user.id) for i in range(5)]
+    db.add_all(tasks)
+    db.flush()
+    t = [task.id for task in tasks]
+    for task_id, names in zip(t, (["a", "b"], ["a"], ["b", "c"], ["a", "b", "c"], [])):
+        tagging.set_tags(db, user.id, "task", task_id, names)
+    other = Task(title="bob's", user_id=bob.id)
+    db.add(other)
+    db.flush()
+    tagging.set_tags(db, bob.id, "task", other.id, ["a", "b"])
+    db.commit()
+
+    def ids(**terms):
+        return tagging.search(db, user.id, "task", limit=10, **terms)[0]
+
+    assert ids(all_tags=["a", "b"]) == [t[3], t[0]]
+    assert ids(any_tags=["c", "a"]) == [t[3], t[2], t[1], t[0]]
+    assert ids(all_tags=["a"], not_tags=["c"]) == [t[1], t[0]]
+    assert ids(not_tags=["a"]) == [t[4], t[2]]
+    assert ids(all_tags=["a", "missing"]) == []
+    assert tagging.search(db, user.id, "task", any_tags=["a", "b"], limit=2) == ([t[3], t[2]], 4)
+
+    # Retagging moves the bits and the usage counts
+    tagging.set_tags(db, user.id, "task", t[0], ["c"])
+    db.commit()
+    assert ids(all_tags=["a", "b"]) == [t[3]]
+    assert ids(all_tags=["c"]) == [t[3], t[2], t[0]]
+    counts = {row.tag_id: row.count for row in db.query(TagUsage).filter(TagUsage.user_id == user.id)}
+    assert sorted(counts.values()) == [2, 2, 3]
+
+    # Rows deleted without untag (a project cascade) are filtered out and pruned
+    db.query(Task).filter(Task.id == t[3]).delete()
+    db.commit()
+    assert ids(all_tags=["c"]) == [t[2], t[0]]
+    assert tagging.prune_taggings(db) == "removed 3 stale taggings"
+    postings = {row.tag_id: row.cardinality for row in db.query(TagPosting).filter(TagPosting.user_id == user.id)}
+    assert sorted(postings.values()) == [1, 1, 2]
+
+def test_entities_expose_their_tags(db, user):
+    idea, entry = Idea(title="i", description="d", user_id=user.id), JournalEntry(content="c", user_id=user.id)
+    db.add_all([idea, entry])
+    db.flush()
+    tagging.set_tags(db, user.id, "idea", idea.id, ["x", "y", "x", " "])
+    tagging.set_tags(db, user.id, "journal", entry.id, ["y"])
+    db.commit()
+    assert [tag.name for tag in idea.tags] == ["x", "y"]
+    assert [tag.name for tag in entry.tags] == ["y"]
@@ -0,0 +1,167 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from models.project import Project
+from models.task import Task
+from models.task_dependency import TaskDependency, TaskSchedule
+from services.task_graph import TaskGraph, critical_path, detach_tasks, load_graph, reschedule, update_schedule
+
+def chain_graph():
+    # 1 -> 2 -> 4 and 1 -> 3 -> 4
+    return TaskGraph({1: 2, 2: 3, 3: 1, 4: 4}, [(1, 2), (1, 3), (2, 4), (3, 4)])
+
+def test_critical_path_and_slack():
+    schedules = chain_graph().compute()
+    assert schedules[4].earliest_finish == 9
+    assert schedules[3].slack == 2
+    assert critical_path(schedules) == [1, 2, 4]
+
+def test_due_dates_limit_latest_finish():
+    graph = TaskGraph({1: 2, 2: 3}, [(1, 2)], deadlines={2: 4})
+    schedules = graph.compute()
+    assert schedules[2].latest_finish == 4
+    assert schedules[1].slack == -1
+
+def test_creates_cycle():
+    graph = chain_graph()
+    assert graph.creates_cycle(4, 1)
+    assert graph.creates_cycle(2, 2)
+    assert not graph.creates_cycle(3, 2)
+
+def random_dag(rng, size, edge_count):
+    durations = {node: rng.randint(1, 8) for node in range(size)}
+    edges = set()
+    while len(edges) < edge_count:
+        before, after = sorted(rng.sample(range(size), 2))
+        edges.add((before, after))
+    return durations, edges
+
+def test_incremental_updates_match_full_recompute():
+    rng = random.Random(7)
+    durations, edges = random_dag(rng, 300, 900)
+    graph = TaskGraph(durations, edges)
+    schedules = graph.compute()
+
+    for _ in range(50):
+        before, after = sorted(rng.sample(range(300), 2))
+        if (before, after) in edges:
+            graph.remove_edge(before, after)
+            edges.discard((before, after))
+        else:
+            graph.add_edge(before, after)
+            edges.add((before, after))
+        schedules = graph.compute(schedules, [after], [before])
+
+        node = rng.randrange(300)
+        graph.durations[node] = rng.randint(1, 8)
+        schedules = graph.compute(schedules, [node], [node])
+
+        full = TaskGraph(graph.durations, edges).compute()
+        assert {n: vars(s) for n, s in schedules.items()} == {n: vars(s) for n, s in full.items()}
+
+def test_large_project_incremental_update_touches_only_descendants():
+    rng = random.Random(1)
+    durations, edges = random_dag(rng, 10000, 30000)
+    graph = TaskGraph(durations, edges)
+    schedules = graph.compute()
+    # A leaf-level change has a tiny downstream subgraph
+    node = max(durations)
+    assert len(graph.descendants([node])) == 1
+    graph.durations[node] += 1
+    updated = graph.compute(schedules, [node], [node])
+    assert updated[node].earliest_finish == schedules[node].earliest_finish + 1
+
+def test_stored_schedule_follows_partial_updates(db, user, project, engine):
+    rng = random.Random(3)
+    project.start_date = datetime(2026, 1, 1)
+
+    def add_task():
+        task = Task(title="t", user_id=user.id, project_id=project.id, estimated_hours=rng.randint(1, 8))
+        db.add(task)
+        db.flush()
+        update_schedule(db, project.id, [task.id], [task.id])
+        return task
+
+    # Tasks without edges, then a chain-heavy graph built one edge at a time
+    tasks = [add_task() for _ in range(60)]
+    for _ in range(120):
+        before, after = sorted(rng.sample(range(60), 2))
+        if not db.query(TaskDependency).filter_by(task_id=tasks[after].id, depends_on_id=tasks[before].id).count():
+            db.add(TaskDependency(task_id=tasks[after].id, depends_on_id=tasks[before].id, project_id=project.id))
+            update_schedule(db, project.id, [tasks[after].id], [tasks[before].id])
+    for _ in range(40):
+        task = rng.choice(tasks)
+        if rng.random() < 0.5:
+            task.estimated_hours = rng.randint(1, 8)
+            update_schedule(db, project.id, [task.id], [task.id])
+        else:
+            task.due_date = project.start_date + timedelta(hours=rng.randint(5, 60))
+            update_schedule(db, project.id, backward_seeds=[task.id])
+    tasks.append(add_task())
+
+    db.flush()
+    expected = load_graph(db, project).compute()
+    stored = {row.task_id: row for row in db.query(TaskSchedule)}
+    assert stored.keys() == expected.keys()
+    for task_id, schedule in expected.items():
+        row = stored[task_id]
+        assert (row.earliest_start, row.latest_start, row.is_critical) == (schedule.earliest_start, schedule.latest_start, schedule.is_critical)
+
+    # A short task without edges is scheduled without reading the other tasks
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    loose = Project(title="Q", owner_id=user.id)
+    db.add(loose)
+    db.flush()
+    db.add(Task(title="long", user_id=user.id, project_id=loose.id, estimated_hours=100))
+    update_schedule(db, loose.id, full=True)
+    short = Task(title="short", user_id=user.id, project_id=loose.id, estimated_hours=1)
+    db.add(short)
+    db.flush()
+    del statements[:]
+    assert set(update_schedule(db, loose.id, [short.id], [short.id])) == {short.id}
+    assert not any("recursive" in statement.lower() for statement in statements)
+
+
+def test_stored_schedule_follows_deletes_and_moves(db, user):
+    rng = random.Random(5)
+    projects = [Project(title=title, owner_id=user.id, start_date=datetime(2026, 1, 1)) for title in "PQ"]
+    db.add_all(projects)
+    db.flush()
+    tasks = []
+    for i in range(80):
+        task = Task(title="t", user_id=user.id, project_id=projects[i % 2].id, estimated_hours=rng.randint(1, 8))
+        db.add(task)
+        tasks.append(task)
+    db.flush()
+    for _ in range(200):
+        before, after = sorted(rng.sample(range(80), 2))
+        if before % 2 == after % 2 and not db.query(TaskDependency).filter_by(task_id=tasks[after].id, depends_on_id=tasks[before].id).count():
+            db.add(TaskDependency(task_id=tasks[after].id, depends_on_id=tasks[before].id, project_id=tasks[after].project_id))
+    for project in projects:
+        update_schedule(db, project.id, full=True)
+
+    for _ in range(30):
+        task = tasks.pop(rng.randrange(len(tasks)))
+        old_project_id = task.project_id
+        detached = detach_tasks(db, [task.id])
+        if rng.random() < 0.5:
+            db.delete(task)
+            reschedule(db, old_project_id, detached.get(old_project_id))
+        else:
+            task.project_id = next(project.id for project in projects if project.id != old_project_id)
+            reschedule(db, old_project_id, detached.get(old_project_id))
+            reschedule(db, task.project_id, seeds=[task.id])
+            tasks.append(task)
+
+        # The bulk writes leave stale rows in the session
+        db.expire_all()
+        for project in projects:
+            expected = load_graph(db, project).compute()
+            stored = {row.task_id: row for row in db.query(TaskSchedule).filter_by(project_id=project.id)}
+            assert stored.keys() == expected.keys()
+            for task_id, schedule in expected.items():
+                row = stored[task_id]
+                assert (row.earliest_start, row.latest_start) == (schedule.earliest_start, schedule.latest_start)
@@ -78,3 +78,73 @@ def test_delete_task(client, auth_headers):
     # Verify task is deleted
     get_response = client.get(f"/api/tasks/{task_id}", headers=auth_headers)
     assert get_response.status_code == 404
+
+def test_get_tasks_conditional(client, auth_headers):
+    task_data = {
+        "title": "Test Task",
+        "description": "Test Description",
+        "priority": "high",
+        "status": "todo"
+    }
+    client.post("/api/tasks", json=task_data, headers=auth_headers)
+    
+    response = client.get("/api/tasks", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert "Last-Modified" in response.headers
+    
+    # Unchanged collection revalidates without a body
+    cached = client.get("/api/tasks", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    
+    # Any mutation invalidates the validator
+    client.post("/api/tasks", json=task_data, headers=auth_headers)
+    refreshed = client.get("/api/tasks", headers={**auth_headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+
+def test_bulk_update_and_delete_tasks(client, auth_headers):
+    ids = [
+        client.post("/api/tasks", json={"title": f"Task {i}", "status": "todo"}, headers=auth_headers).json()["id"]
+        for i in range(3)
+    ]
+    
+    response = client.post("/api/tasks/bulk", json={
+        "action": "update",
+        "ids": ids[:2],
+        "changes": {"status": "done", "priority": "high"}
+    }, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"action": "update", "affected": 2}
+    assert client.get(f"/api/tasks/{ids[0]}", headers=auth_headers).json()["status"] == "done"
+    assert client.get(f"/api/tasks/{ids[2]}", headers=auth_headers).json()["status"] == "todo"
+    
+    # Exactly one of ids or filter
+    response = client.post("/api/tasks/bulk", json={"action": "delete"}, headers=auth_headers)
+    assert response.status_code == 400
+    response = client.post("/api/tasks/bulk", json={"action": "delete", "filter": {"search": ""}}, headers=auth_headers)
+    assert response.status_code == 400
+    
+    response = client.post("/api/tasks/bulk", json={
+        "action": "delete",
+        "filter": {"status": "done"}
+    }, headers=auth_headers)
+    assert response.json()["affected"] == 2
+    assert client.get(f"/api/tasks/{ids[0]}", headers=auth_headers).status_code == 404
+
+def test_get_agenda(client, auth_headers):
+    now = datetime.utcnow().replace(hour=12)
+    for title, days, priority in [("Late", -1, "low"), ("Now low", 0, "low"), ("Now high", 0, "high"), ("Soon", 2, "medium"), ("Later", 30, "high")]:
+        client.post("/api/tasks", json={
+            "title": title,
+            "priority": priority,
+            "due_date": (now + timedelta(days=days)).isoformat()
+        }, headers=auth_headers)
+    
+    response = client.get("/api/tasks/agenda?days=7", headers=auth_headers)
+    assert response.status_code == 200
+    agenda = response.json()
+    assert [t["title"] for t in agenda["overdue"]] == ["Late"]
+    assert [t["title"] for t in agenda["today"]] == ["Now high", "Now low"]
+    assert [t["title"] for t in agenda["upcoming"]] == ["Soon"]
@@ -0,0 +1,60 @@
+import pytest
+from fastapi import HTTPException
+
+from models.user import User
+from auth.revocation import TokenRevocationCache, revocation_cache
+from auth.utils import create_access_token, get_current_principal, require_scope
+
+def test_revocation_cache_tracks_token_versions(db, user):
+    db.add(User(username="bob", email="bob@example.com", hashed_password="x", token_version=2))
+    db.commit()
+    alice, bob = db.query(User).order_by(User.id).all()
+
+    cache = TokenRevocationCache(refresh_interval=3600)
+    assert cache.is_stale()
+    cache.refresh_if_stale(db)
+    assert not cache.is_stale()
+
+    assert not cache.is_revoked(alice.id, 0)
+    assert cache.is_revoked(bob.id, 1)
+    assert not cache.is_revoked(bob.id, 2)
+
+    # Bumps from another worker only show up after the next reload
+    alice.token_version = 1
+    db.commit()
+    assert not cache.is_revoked(alice.id, 0)
+    cache.load(db)
+    assert cache.is_revoked(alice.id, 0)
+
+    cache.record(bob.id, 3)
+    assert cache.is_revoked(bob.id, 2)
+
+    # Users registered since the reload are looked up; deleted ones stay rejected
+    carol = User(username="carol", email="carol@example.com", hashed_password="x")
+    db.add(carol)
+    db.commit()
+    assert not cache.is_known(carol.id) and cache.is_revoked(carol.id, 0)
+    assert cache.lookup(db, carol.id) and not cache.is_revoked(carol.id, 0)
+    db.delete(alice)
+    db.commit()
+    cache.load(db)
+    assert cache.is_revoked(alice.id, 1)
+    assert not cache.lookup(db, alice.id)
+
+def test_principal_needs_an_existing_user_and_the_scope(db, user):
+    revocation_cache.clear()
+    read_only = create_access_token({"sub": "alice", "uid": user.id, "ver": 0, "scopes": ["read"]})
+    principal = get_current_principal(read_only, db)
+    assert principal.id == user.id
+    assert require_scope("read")(principal) is principal
+    with pytest.raises(HTTPException) as error:
+        require_scope("write")(principal)
+    assert error.value.status_code == 403
+
+    # A token of a user that no longer exists is rejected, even after a reload
+    db.delete(user)
+    db.commit()
+    revocation_cache.clear()
+    with pytest.raises(HTTPException) as error:
+        get_current_principal(read_only, db)
+    assert error.value.status_code == 401
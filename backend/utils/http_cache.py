@@ -0,0 +1,141 @@
+"""Conditional GET support (ETag / Last-Modified validators).
+
+Validators are computed with a single aggregate query (row count plus the
+newest ``updated_at``) so a matching ``If-None-Match``/``If-Modified-Since``
+request can be answered with ``304 Not Modified`` before any rows are loaded.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+from typing import Any, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        # Naive timestamps are written with datetime.utcnow() / CURRENT_TIMESTAMP
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from arbitrary validator parts."""
+    digest = blake2b("|".join(str(part) for part in parts).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def collection_validator(
+    db: Session,
+    model,
+    owner_column,
+    owner_id: int,
+    request: Optional[Request] = None,
+    related_modified: Optional[datetime] = None,
+) -> Tuple[str, Optional[datetime]]:
+    """Return ``(etag, last_modified)`` for all rows of ``model`` owned by ``owner_id``.
+
+    Uses ``count(*)`` and ``max(coalesce(updated_at, created_at))`` so inserts,
+    updates and deletes all change the validator. The request's query string is
+    folded into the ETag so differently filtered views get distinct tags.
+    ``related_modified`` is the newest change to data embedded from other
+    tables (e.g. project counters) and counts as a modification too.
+    """
+    timestamp = func.coalesce(model.updated_at, model.created_at)
+    count, last_modified = db.query(
+        func.count(model.id), func.max(timestamp)
+    ).filter(owner_column == owner_id).one()
+    last_modified = _as_utc(last_modified)
+    related_modified = _as_utc(related_modified)
+    if related_modified is not None and (last_modified is None or related_modified > last_modified):
+        last_modified = related_modified
+    etag = make_etag(
+        model.__tablename__,
+        owner_id,
+        count,
+        last_modified.isoformat() if last_modified else "",
+        related_modified.isoformat() if related_modified else "",
+        request.url.query if request is not None else "",
+    )
+    return etag, last_modified
+
+
+def entity_validator(
+    db: Session,
+    model,
+    *criteria,
+) -> Optional[Tuple[str, Optional[datetime]]]:
+    """Return ``(etag, last_modified)`` for a single row, or None if it does not exist.
+
+    Only the primary key and timestamps are selected; the row itself is not loaded.
+    """
+    row = db.query(model.id, model.created_at, model.updated_at).filter(*criteria).first()
+    if row is None:
+        return None
+    last_modified = _as_utc(row.updated_at or row.created_at)
+    etag = make_etag(
+        model.__tablename__,
+        row.id,
+        last_modified.isoformat() if last_modified else "",
+    )
+    return etag, last_modified
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison (RFC 7232 section 2.3.2): ignore the W/ prefix
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, last_modified: Optional[datetime]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = _as_utc(parsedate_to_datetime(header))
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime],
+) -> Optional[Response]:
+    """Attach validators to ``response`` and return a 304 if the client's copy is fresh.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since``.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = if_modified_since is not None and _not_modified_since(if_modified_since, last_modified)
+
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,63 @@
+"""Word counts and lexicon-based sentiment scores of journal text.
+
+The score is ``(positive - negative) / (positive + negative)`` over the words
+found in a small lexicon, in [-1, 1], with 0 for text without any of them. A
+negation ("not", "never", "don't", ...) up to three words before a word, in
+the same clause, flips it. Crude next to a trained model, but cheap enough to
+run on every save and good enough to show how a journal trends over weeks and
+months.
+"""
+import re
+from typing import Optional, Tuple
+
+_CLAUSE_END = ".,;:!?"
+# Words, and the punctuation that ends the reach of a negation
+_TOKEN = re.compile(r"[a-z']+|[.,;:!?]")
+
+POSITIVE = frozenset("""
+    accomplished amazing appreciate appreciated awesome beautiful best better blessed bright calm
+    celebrate cheerful comfortable confident content delighted determined eager easy energetic
+    enjoy enjoyed excellent excited fantastic fine fun glad good grateful great happy healthy hope
+    hopeful inspired joy kind laugh laughed love loved lovely lucky motivated nice optimistic peaceful
+    pleasant productive proud refreshed relaxed relieved rested satisfied smile smiled strong
+    success successful thankful thrilled wonderful
+""".split())
+
+NEGATIVE = frozenset("""
+    afraid angry annoyed anxious ashamed awful bad bored broken confused depressed difficult
+    disappointed disappointing down drained dread exhausted fail failed failure fear frustrated
+    frustrating guilty hard hate hated hopeless hurt irritated lonely lost miserable nervous
+    overwhelmed pain painful panic regret sad scared sick stressed stressful stuck terrible tired
+    ugly unhappy upset worried worry worse worst
+""".split())
+
+NEGATIONS = frozenset("not no never nothing nobody hardly without".split())
+
+_NEGATION_REACH = 3
+
+
+def analyze(text: Optional[str]) -> Tuple[int, float]:
+    """``(word_count, sentiment)`` of ``text``."""
+    tokens = _TOKEN.findall((text or "").lower())
+    words = 0
+    positive = negative = 0
+    negated_until = -1
+    for word in tokens:
+        if word in _CLAUSE_END:
+            negated_until = -1
+            continue
+        index = words
+        words += 1
+        if word in NEGATIONS or word.endswith("n't"):
+            negated_until = index + _NEGATION_REACH
+            continue
+        polarity = 1 if word in POSITIVE else -1 if word in NEGATIVE else 0
+        if polarity and index <= negated_until:
+            polarity = -polarity
+        if polarity > 0:
+            positive += 1
+        elif polarity < 0:
+            negative += 1
+    if not positive + negative:
+        return words, 0.0
+    return words, round((positive - negative) / (positive + negative), 4)
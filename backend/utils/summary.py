@@ -0,0 +1,46 @@
+"""Precomputed summaries of large text and JSON columns.
+
+Models keep an ``excerpt`` and ``size`` next to their bodies, updated by
+``@validates`` hooks whenever the body is assigned, so list endpoints can
+serve summaries without loading the bodies at all.
+"""
+import json
+import re
+from typing import Annotated, Any, List, Literal, Optional, Union
+
+from pydantic import Field
+
+EXCERPT_LENGTH = 200
+
+# ``?view=`` of list endpoints: full rows, or summaries without the bodies
+ListView = Literal["full", "summary"]
+
+
+def list_response(full: type, summary: type):
+    """``response_model`` of a list endpoint with a ``view`` parameter.
+
+    Rows are checked against the full schema first: in pydantic's default
+    "smart" mode a full row would also pass as a summary and could be
+    serialized as one.
+    """
+    return Annotated[Union[List[full], List[summary]], Field(union_mode="left_to_right")]
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def excerpt(text: Optional[str], length: int = EXCERPT_LENGTH) -> str:
+    """The start of ``text`` on one line, cut at a word boundary when possible."""
+    text = _WHITESPACE.sub(" ", text or "").strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    space = cut.rfind(" ")
+    if space > length // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def json_size(value: Any) -> int:
+    """Length of ``value`` serialized the way the JSON column stores it."""
+    return len(json.dumps(value)) if value is not None else 0
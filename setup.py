@@ -19,5 +19,10 @@ setup(
         "pandas>=2.0.0",
         "pydantic>=2.0.0",
         "fastapi>=0.100.0"
-    ]
+    ],
+    entry_points={
+        "console_scripts": [
+            "ipms-server=backend.server:main",
+        ]
+    }
 )